@@ -146,3 +146,56 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Astro Engine tuning
+# Timezone resolver: coordinates are rounded to this many decimals for the LRU key
+TZ_RESOLVER_PRECISION = int(os.environ.get('TZ_RESOLVER_PRECISION', '4'))
+TZ_RESOLVER_CACHE_SIZE = int(os.environ.get('TZ_RESOLVER_CACHE_SIZE', '8192'))
+# Keep timezone polygons in RAM (faster lookups, more memory per worker)
+TZ_RESOLVER_IN_MEMORY = os.environ.get('TZ_RESOLVER_IN_MEMORY', 'False') == 'True'
+
+# Position backend for AstroEngine: 'jpl' (DE421 via Skyfield), 'table' or 'analytic'
+# ('table' needs `python manage.py build_ephemeris_table` first, falls back to jpl)
+# ('analytic' is low precision, check it with `python manage.py check_ephemeris`)
+EPHEMERIS_BACKEND = os.environ.get('EPHEMERIS_BACKEND', 'jpl')
+EPHEMERIS_TABLE_DIR = os.environ.get('EPHEMERIS_TABLE_DIR', str(BASE_DIR / 'data' / 'ephemeris'))
+
+# Natal chart result cache (astrology/chart_cache.py)
+CHART_CACHE_SIZE = int(os.environ.get('CHART_CACHE_SIZE', '2048'))
+CHART_CACHE_TTL = int(os.environ.get('CHART_CACHE_TTL', str(6 * 3600)))
+# Coordinates are rounded to this many decimals (~0.1 m) before computing and keying
+CHART_CACHE_PRECISION = int(os.environ.get('CHART_CACHE_PRECISION', '6'))
+# Optional shared L2 between workers: name of an entry in CACHES (empty = off)
+CHART_CACHE_L2_ALIAS = os.environ.get('CHART_CACHE_L2_ALIAS', '')
+# Max records per POST /api/calculate-charts/ (batch charts, NDJSON response)
+CHART_BATCH_MAX_RECORDS = int(os.environ.get('CHART_BATCH_MAX_RECORDS', '100'))
+# Records per vectorized pass within a batch; each chunk is sent as soon as it is computed
+CHART_BATCH_CHUNK_SIZE = int(os.environ.get('CHART_BATCH_CHUNK_SIZE', '25'))
+# Backend for the weekly forecast scores (4-5 deg orbs, 'analytic' is plenty); empty = EPHEMERIS_BACKEND
+FORECAST_EPHEMERIS_BACKEND = os.environ.get('FORECAST_EPHEMERIS_BACKEND', '')
+# Seconds between checks of the shared interpretation version row (astrology/interpretations.py)
+INTERPRETATION_VERSION_CHECK = int(os.environ.get('INTERPRETATION_VERSION_CHECK', '30'))
+# AstroEngine.current_sky(): seconds a "now" snapshot (bodies, moon phase, aspects) is reused
+CURRENT_SKY_INTERVAL = int(os.environ.get('CURRENT_SKY_INTERVAL', '60'))
+# Refresh it from a background thread instead of on the first request after it goes stale
+CURRENT_SKY_BACKGROUND = os.environ.get('CURRENT_SKY_BACKGROUND', 'False') == 'True'
+# Build the geonames place index when the WSGI/ASGI app loads instead of on the first place request
+# (manage.py commands never build it unless they use it)
+GEO_INDEX_PRELOAD = os.environ.get('GEO_INDEX_PRELOAD', 'True') == 'True'
+# Coordinates further than this from any known place get no place label
+NEAREST_PLACE_MAX_KM = float(os.environ.get('NEAREST_PLACE_MAX_KM', 150))
+# Activity log (astrology/activity_log.py): rows are queued and bulk-written by a background thread
+ACTIVITY_LOG_ASYNC = os.environ.get('ACTIVITY_LOG_ASYNC', 'True') == 'True'
+# Max queued records per worker; past it the oldest are dropped
+ACTIVITY_LOG_QUEUE_SIZE = int(os.environ.get('ACTIVITY_LOG_QUEUE_SIZE', '10000'))
+# Flush every N records or T milliseconds, whichever comes first
+ACTIVITY_LOG_BATCH_SIZE = int(os.environ.get('ACTIVITY_LOG_BATCH_SIZE', '200'))
+ACTIVITY_LOG_FLUSH_MS = int(os.environ.get('ACTIVITY_LOG_FLUSH_MS', '1000'))
+# `manage.py archive_activity_logs`: rows older than this many days go to gzipped JSON-lines files
+ACTIVITY_LOG_RETENTION_DAYS = int(os.environ.get('ACTIVITY_LOG_RETENTION_DAYS', '90'))
+ACTIVITY_LOG_ARCHIVE_DIR = os.environ.get('ACTIVITY_LOG_ARCHIVE_DIR', str(BASE_DIR / 'data' / 'activity_archive'))
+# Dashboard unique visitors: exact DISTINCT up to this many days, HyperLogLog sketches beyond
+ACTIVITY_EXACT_VISITOR_DAYS = int(os.environ.get('ACTIVITY_EXACT_VISITOR_DAYS', '7'))
+# Rows per query when streaming the dashboard's CSV/NDJSON export
+ACTIVITY_EXPORT_CHUNK = int(os.environ.get('ACTIVITY_EXPORT_CHUNK', '2000'))
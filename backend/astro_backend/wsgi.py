@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'astro_backend.settings')
 
 application = get_wsgi_application()
+
+# Build the place index before the first request (settings.GEO_INDEX_PRELOAD)
+from astrology.geo_index import preload  # noqa: E402
+preload()
@@ -0,0 +1,442 @@
+"""
+Buffered writer for UserActivityLog.
+
+ActivityMiddleware used to INSERT one row per request on the response path,
+which on SQLite serializes every worker on the write lock. Records now go into
+a bounded in-process queue and a background thread writes them with
+bulk_create every ACTIVITY_LOG_BATCH_SIZE records or ACTIVITY_LOG_FLUSH_MS
+milliseconds, whichever comes first.
+
+When the queue is full the oldest record is dropped (and counted): losing a
+page view is better than blocking a request or growing without bound.
+Whatever is still queued is written at interpreter exit. A hard kill
+(SIGKILL, OOM) loses at most one flush interval of records.
+
+ACTIVITY_LOG_ASYNC=False writes synchronously like before (handy in shells/tests).
+
+Each flush also adds its records to DailyActivityRollup (per day and action,
+superusers excluded) and their IPs to the day's DailyVisitorSketch in the same
+transaction, so the admin dashboard sums/merges a few daily rows instead of
+scanning the log table.
+"""
+import atexit
+import csv
+import json
+import os
+import threading
+import time
+import zlib
+from collections import Counter, deque
+from datetime import date, datetime, time as dt_time, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .hyperloglog import HyperLogLog
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc) if settings.USE_TZ else datetime(1970, 1, 1)
+
+
+class ActivityLogger:
+    def __init__(self, queue_size=10000, batch_size=200, flush_ms=1000, async_mode=True):
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_ms / 1000.0
+        self.async_mode = async_mode
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._pid = None
+        self._stopping = False
+        # Counters
+        self.enqueued = 0
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+        self.flushes = 0
+
+    def log(self, **fields):
+        """Queue one UserActivityLog row (model field names as keywords)."""
+        fields.setdefault('timestamp', timezone.now())
+        if not self.async_mode:
+            self._write([fields])
+            return
+
+        self._ensure_thread()
+        with self._cond:
+            if len(self._queue) >= self.queue_size:
+                self._queue.popleft() # Drop oldest
+                self.dropped += 1
+            self._queue.append(fields)
+            self.enqueued += 1
+            if len(self._queue) >= self.batch_size:
+                self._cond.notify()
+
+    def _ensure_thread(self):
+        # Also restarts after a fork (gunicorn --preload): threads don't survive it
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._cond:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            if self._pid is not None and self._pid != os.getpid():
+                # Forked child: the parent's queue belongs to the parent
+                self._queue.clear()
+            self._pid = os.getpid()
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name='activity-log-writer', daemon=True)
+            self._thread.start()
+
+    def _take_batch(self):
+        batch = []
+        while self._queue and len(batch) < self.batch_size:
+            batch.append(self._queue.popleft())
+        return batch
+
+    def _run(self):
+        while True:
+            with self._cond:
+                deadline = time.monotonic() + self.flush_interval
+                while len(self._queue) < self.batch_size and not self._stopping:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = self._take_batch()
+                stopping = self._stopping
+            if batch:
+                self._write(batch)
+            if stopping:
+                return
+
+    def _write(self, batch):
+        from .models import UserActivityLog
+
+        close_old_connections()
+        try:
+            with transaction.atomic():
+                UserActivityLog.objects.bulk_create([UserActivityLog(**fields) for fields in batch])
+                update_rollups(batch)
+            ok = True
+        except Exception as e:
+            # Not retried, a broken DB would otherwise pin the queue at its cap
+            ok = False
+            print(f"Activity log flush failed ({len(batch)} records): {e}")
+        # flush() can run in a request thread next to the writer thread
+        with self._cond:
+            if ok:
+                self.written += len(batch)
+            else:
+                self.failed += len(batch)
+            self.flushes += 1
+
+    def flush(self):
+        """Write everything queued so far from the calling thread."""
+        while True:
+            with self._cond:
+                batch = self._take_batch()
+            if not batch:
+                return
+            self._write(batch)
+
+    def shutdown(self, timeout=5.0):
+        thread = self._thread
+        if thread is not None and self._pid == os.getpid():
+            with self._cond:
+                self._stopping = True
+                self._cond.notify()
+            thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+    def stats(self):
+        with self._cond:
+            return {
+                'queued': len(self._queue),
+                'enqueued': self.enqueued,
+                'dropped': self.dropped,
+                'written': self.written,
+                'failed': self.failed,
+                'flushes': self.flushes
+            }
+
+
+def local_date(ts):
+    return timezone.localdate(ts) if timezone.is_aware(ts) else ts.date()
+
+
+def update_rollups(records):
+    """Add a batch of log records (dicts of model fields) to the daily rollups."""
+    from django.contrib.auth.models import User
+    from .models import DailyActivityRollup
+
+    user_ids = {r.get('user_id') for r in records} - {None}
+    admins = set()
+    if user_ids:
+        admins = set(User.objects.filter(pk__in=user_ids, is_superuser=True).values_list('pk', flat=True))
+
+    records = [r for r in records if r.get('user_id') not in admins]
+    counts = Counter((local_date(r['timestamp']), r['action']) for r in records)
+    if not counts:
+        return
+    # Create missing rows first, then increment in SQL so concurrent workers add up
+    DailyActivityRollup.objects.bulk_create(
+        [DailyActivityRollup(date=d, action=a, count=0) for d, a in counts], ignore_conflicts=True)
+    for (d, a), n in counts.items():
+        DailyActivityRollup.objects.filter(date=d, action=a).update(count=F('count') + n)
+
+    ips = {}
+    for r in records:
+        if r.get('ip_address'):
+            ips.setdefault(local_date(r['timestamp']), set()).add(r['ip_address'])
+    if ips:
+        update_visitor_sketches(ips)
+
+
+def update_visitor_sketches(ips_by_day):
+    """Add {date: set of IPs} to the daily sketches. Call inside a transaction."""
+    from .models import DailyVisitorSketch
+
+    DailyVisitorSketch.objects.bulk_create(
+        [DailyVisitorSketch(date=d, sketch=HyperLogLog().to_bytes()) for d in ips_by_day],
+        ignore_conflicts=True)
+    # Row lock (no-op on SQLite, where the log insert already holds the write lock)
+    for row in DailyVisitorSketch.objects.select_for_update().filter(date__in=list(ips_by_day)):
+        hll = HyperLogLog.from_bytes(bytes(row.sketch))
+        hll.update(ips_by_day[row.date])
+        row.sketch = hll.to_bytes()
+        row.save(update_fields=['sketch'])
+
+
+def unique_visitors(logs, start, end, exact=False):
+    """
+    (count, is_exact) distinct IPs for the date range. Short closed ranges
+    (<= ACTIVITY_EXACT_VISITOR_DAYS days) and exact=True run the exact DISTINCT
+    over `logs` (already filtered to the range). Anything longer merges the
+    daily HyperLogLog sketches (~1.6% standard error).
+    """
+    from .models import DailyVisitorSketch
+
+    exact_days = getattr(settings, 'ACTIVITY_EXACT_VISITOR_DAYS', 7)
+    if exact or (start is not None and end is not None and (end - start).days <= exact_days):
+        return logs.values('ip_address').distinct().count(), True
+
+    merged = HyperLogLog()
+    sketches = filter_dates(DailyVisitorSketch.objects.all(), start, end)
+    for blob in sketches.values_list('sketch', flat=True):
+        merged.merge(HyperLogLog.from_bytes(bytes(blob)))
+    return merged.count(), False
+
+
+def timestamp_range(start_date=None, end_date=None):
+    """
+    'YYYY-MM-DD' strings (either may be empty/invalid = open) -> (start, end)
+    aware datetimes, end exclusive. Plain range filters can use the timestamp
+    index, timestamp__date lookups can't.
+    """
+    def parse(value):
+        try:
+            return date.fromisoformat(value) if value else None
+        except ValueError:
+            return None
+
+    def midnight(d):
+        dt = datetime.combine(d, dt_time.min)
+        return timezone.make_aware(dt) if settings.USE_TZ else dt
+
+    start, end = parse(start_date), parse(end_date)
+    return (midnight(start) if start else None,
+            midnight(end + timedelta(days=1)) if end else None)
+
+
+def filter_timestamp(qs, start, end, field='timestamp'):
+    if start is not None:
+        qs = qs.filter(**{f'{field}__gte': start})
+    if end is not None:
+        qs = qs.filter(**{f'{field}__lt': end})
+    return qs
+
+
+def filter_dates(qs, start, end, field='date'):
+    """Same range as filter_timestamp, for the per-day tables."""
+    if start is not None:
+        qs = qs.filter(**{f'{field}__gte': local_date(start)})
+    if end is not None:
+        qs = qs.filter(**{f'{field}__lt': local_date(end)})
+    return qs
+
+
+def rebuild_rollups(start_date=None, end_date=None):
+    """
+    Recompute DailyActivityRollup and DailyVisitorSketch from the log table for a date range.
+    Without a start date it begins at the oldest log still in the table.
+    """
+    from .models import UserActivityLog, DailyActivityRollup, DailyVisitorSketch
+
+    start, end = timestamp_range(start_date, end_date)
+    if start is None:
+        # Archived days have no logs left, keep their rollups
+        oldest = UserActivityLog.objects.order_by('timestamp').values_list('timestamp', flat=True).first()
+        if oldest is None:
+            return 0
+        start, _ = timestamp_range(local_date(oldest).isoformat())
+    logs = filter_timestamp(UserActivityLog.objects.exclude(user__is_superuser=True), start, end)
+    rows = (logs.annotate(day=TruncDate('timestamp')).values('day', 'action')
+            .annotate(n=Count('id')).order_by())
+
+    rollups = filter_dates(DailyActivityRollup.objects.all(), start, end)
+    sketches = filter_dates(DailyVisitorSketch.objects.all(), start, end)
+
+    with transaction.atomic():
+        rollups.delete()
+        created = DailyActivityRollup.objects.bulk_create(
+            [DailyActivityRollup(date=r['day'], action=r['action'], count=r['n']) for r in rows],
+            batch_size=500)
+
+        sketches.delete()
+        ips = {}
+        for day, ip in (logs.exclude(ip_address__isnull=True).annotate(day=TruncDate('timestamp'))
+                        .values_list('day', 'ip_address').distinct().iterator()):
+            ips.setdefault(day, set()).add(ip)
+        update_visitor_sketches(ips)
+    return len(created)
+
+
+# Columns of archived/exported log rows
+LOG_FIELDS = ('id', 'timestamp', 'user_id', 'user__username', 'action', 'path', 'method', 'ip_address', 'details')
+
+
+def log_record(row):
+    """values(*LOG_FIELDS) row -> JSON-ready dict."""
+    record = dict(row)
+    record['username'] = record.pop('user__username')
+    record['timestamp'] = record['timestamp'].isoformat()
+    return record
+
+
+def iter_log_chunks(qs, size=2000):
+    """
+    values(*LOG_FIELDS) rows of qs in (timestamp, id) order, `size` at a time.
+    Keyset, not OFFSET: each chunk is an index range scan however deep it is.
+    """
+    qs = qs.order_by('timestamp', 'id').values(*LOG_FIELDS)
+    last = None
+    while True:
+        chunk = qs
+        if last is not None:
+            ts, pk = last
+            chunk = chunk.filter(Q(timestamp__gt=ts) | Q(timestamp=ts, id__gt=pk))
+        rows = list(chunk[:size])
+        if not rows:
+            return
+        yield rows
+        last = rows[-1]['timestamp'], rows[-1]['id']
+
+
+EXPORT_COLUMNS = ('id', 'timestamp', 'user_id', 'username', 'action', 'path', 'method', 'ip_address', 'details')
+
+
+class _LineBuffer:
+    # csv.writer target that hands the formatted line straight back
+    def write(self, value):
+        return value
+
+
+def export_lines(qs, fmt='csv', chunk_size=2000):
+    """
+    Text lines (CSV with header, or NDJSON) for every log in qs. Rows are read
+    in keyset chunks, one short query each, so memory stays flat and no read
+    transaction stays open between chunks (SQLite writers are not held up).
+    """
+    writer = csv.writer(_LineBuffer())
+    if fmt == 'csv':
+        yield writer.writerow(EXPORT_COLUMNS)
+    for rows in iter_log_chunks(qs, size=chunk_size):
+        lines = []
+        for row in rows:
+            record = log_record(row)
+            if fmt == 'csv':
+                record['details'] = json.dumps(record['details'], ensure_ascii=False)
+                lines.append(writer.writerow([record[c] for c in EXPORT_COLUMNS]))
+            else:
+                lines.append(json.dumps(record, ensure_ascii=False) + '\n')
+        yield ''.join(lines)
+
+
+def gzip_stream(chunks, level=6):
+    """Compress an iterable of str chunks into a gzip byte stream on the fly."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31) # wbits 31 = gzip header
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def encode_cursor(log):
+    us = (log.timestamp - _EPOCH) // timedelta(microseconds=1)
+    return f"{us}-{log.pk}"
+
+
+def decode_cursor(value):
+    """'<epoch microseconds>-<id>' -> (timestamp, id), None when malformed."""
+    try:
+        us, pk = value.split('-')
+        return _EPOCH + timedelta(microseconds=int(us)), int(pk)
+    except (AttributeError, ValueError):
+        return None
+
+
+def keyset_page(qs, size=20, after=None, before=None, oldest=False):
+    """
+    One page of logs, newest first, keyed on (timestamp, id) instead of
+    COUNT + OFFSET so the cost doesn't grow with the table:
+      after=cursor  -> the page of older rows following that row
+      before=cursor -> the page of newer rows preceding it
+      oldest=True   -> the last page
+    Returns (rows, newer_cursor, older_cursor); a cursor is None at that end.
+    """
+    after, before = decode_cursor(after), decode_cursor(before)
+    if before:
+        ts, pk = before
+        rows = list(qs.filter(Q(timestamp__gt=ts) | Q(timestamp=ts, id__gt=pk))
+                    .order_by('timestamp', 'id')[:size + 1])
+        has_newer, has_older = len(rows) > size, True
+        rows = rows[:size][::-1]
+    elif oldest:
+        rows = list(qs.order_by('timestamp', 'id')[:size + 1])
+        has_newer, has_older = len(rows) > size, False
+        rows = rows[:size][::-1]
+    else:
+        if after:
+            ts, pk = after
+            qs = qs.filter(Q(timestamp__lt=ts) | Q(timestamp=ts, id__lt=pk))
+        rows = list(qs.order_by('-timestamp', '-id')[:size + 1])
+        has_newer, has_older = after is not None, len(rows) > size
+        rows = rows[:size]
+
+    newer = encode_cursor(rows[0]) if rows and has_newer else None
+    older = encode_cursor(rows[-1]) if rows and has_older else None
+    return rows, newer, older
+
+
+_logger = None
+_logger_lock = threading.Lock()
+
+
+def get_activity_logger():
+    global _logger
+    if _logger is None:
+        with _logger_lock:
+            if _logger is None:
+                _logger = ActivityLogger(
+                    queue_size=getattr(settings, 'ACTIVITY_LOG_QUEUE_SIZE', 10000),
+                    batch_size=getattr(settings, 'ACTIVITY_LOG_BATCH_SIZE', 200),
+                    flush_ms=getattr(settings, 'ACTIVITY_LOG_FLUSH_MS', 1000),
+                    async_mode=getattr(settings, 'ACTIVITY_LOG_ASYNC', True),
+                )
+                atexit.register(_logger.shutdown)
+    return _logger
@@ -0,0 +1,266 @@
+"""
+Low-precision analytic ephemeris: no kernel, no file I/O, pure NumPy.
+
+Meant for bulk / wide-orb scoring (weekly forecast, daily sky) where
+positions are compared against 4-5 degree orbs. Series used:
+  - Sun:     Meeus, Astronomical Algorithms ch. 25 (low accuracy solar coordinates)
+  - Moon:    Meeus ch. 47, main periodic terms only (truncated ELP-2000/82)
+  - Planets: JPL Keplerian elements + rates (Standish, valid 1800-2050),
+             heliocentric J2000 ecliptic, one light-time iteration + aberration
+
+Error budget vs DE421 apparent positions, 1900-2050 (degrees of longitude),
+enforced by `manage.py check_ephemeris --backend analytic`:
+"""
+import numpy as np
+
+ERROR_BUDGET_DEG = {
+    'Sun': 0.02,
+    'Moon': 0.1,
+    'Mercury': 0.05, 'Venus': 0.05, 'Mars': 0.1,
+    'Jupiter': 0.25, 'Saturn': 0.3,   # great inequality is not modelled
+    'Uranus': 0.1, 'Neptune': 0.05, 'Pluto': 0.05,
+}
+
+J2000 = 2451545.0
+AU_KM = 149597870.7
+LIGHT_DAYS_PER_AU = 0.0057755183
+ABERRATION_DEG = 20.49552 / 3600.0
+
+# Keplerian elements: a (au), e, I, L, long.peri, long.node (deg) and rates per Julian century
+ELEMENTS = {
+    'Mercury': ((0.38709927, 0.20563593, 7.00497902, 252.25032350, 77.45779628, 48.33076593),
+                (0.00000037, 0.00001906, -0.00594749, 149472.67411175, 0.16047689, -0.12534081)),
+    'Venus': ((0.72333566, 0.00677672, 3.39467605, 181.97909950, 131.60246718, 76.67984255),
+              (0.00000390, -0.00004107, -0.00078890, 58517.81538729, 0.00268329, -0.27769418)),
+    'EMB': ((1.00000261, 0.01671123, -0.00001531, 100.46457166, 102.93768193, 0.0),
+            (0.00000562, -0.00004392, -0.01294668, 35999.37244981, 0.32327364, 0.0)),
+    'Mars': ((1.52371034, 0.09339410, 1.84969142, -4.55343205, -23.94362959, 49.55953891),
+             (0.00001847, 0.00007882, -0.00813131, 19140.30268499, 0.44441088, -0.29257343)),
+    'Jupiter': ((5.20288700, 0.04838624, 1.30439695, 34.39644051, 14.72847983, 100.47390909),
+                (-0.00011607, -0.00013253, -0.00183714, 3034.74612775, 0.21252668, 0.20469106)),
+    'Saturn': ((9.53667594, 0.05386179, 2.48599187, 49.95424423, 92.59887831, 113.66242448),
+               (-0.00125060, -0.00050991, 0.00193609, 1222.49362201, -0.41897216, -0.28867794)),
+    'Uranus': ((19.18916464, 0.04725744, 0.77263783, 313.23810451, 170.95427630, 74.01692503),
+               (-0.00196176, -0.00004397, -0.00242939, 428.48202785, 0.40805281, 0.04240589)),
+    'Neptune': ((30.06992276, 0.00859048, 1.77004347, -55.12002969, 44.96476227, 131.78422574),
+                (0.00026291, 0.00005105, 0.00035372, 218.45945325, -0.32241464, -0.00508664)),
+    'Pluto': ((39.48211675, 0.24882730, 17.14001206, 238.92903833, 224.06891629, 110.30393684),
+              (-0.00031596, 0.00005170, 0.00004818, 145.20780515, -0.04062942, -0.01183482)),
+}
+
+# Moon longitude / distance terms (Meeus table 47.A): D, M, M', F, sum_l (1e-6 deg), sum_r (m)
+MOON_LR = np.array([
+    (0, 0, 1, 0, 6288774, -20905355),
+    (2, 0, -1, 0, 1274027, -3699111),
+    (2, 0, 0, 0, 658314, -2955968),
+    (0, 0, 2, 0, 213618, -569925),
+    (0, 1, 0, 0, -185116, 48888),
+    (0, 0, 0, 2, -114332, -3149),
+    (2, 0, -2, 0, 58793, 246158),
+    (2, -1, -1, 0, 57066, -152138),
+    (2, 0, 1, 0, 53322, -170733),
+    (2, -1, 0, 0, 45758, -204586),
+    (0, 1, -1, 0, -40923, -129620),
+    (1, 0, 0, 0, -34720, 108743),
+    (0, 1, 1, 0, -30383, 104755),
+    (2, 0, 0, -2, 15327, 10321),
+    (0, 0, 1, 2, -12528, 0),
+    (0, 0, 1, -2, 10980, 79661),
+    (4, 0, -1, 0, 10675, -34782),
+    (0, 0, 3, 0, 10034, -23210),
+    (4, 0, -2, 0, 8548, -21636),
+    (2, 1, -1, 0, -7888, 24208),
+    (2, 1, 0, 0, -6766, 30824),
+    (1, 0, -1, 0, -5163, -8379),
+    (1, 1, 0, 0, 4987, -16675),
+    (2, -1, 1, 0, 4036, -12831),
+    (2, 0, 2, 0, 3994, -10445),
+    (4, 0, 0, 0, 3861, -11650),
+    (2, 0, -3, 0, 3665, 14403),
+    (0, 1, -2, 0, -2689, -7003),
+    (2, 0, -1, 2, -2602, 0),
+    (2, -1, -2, 0, 2390, 10056),
+    (1, 0, 1, 0, -2348, 6322),
+    (2, -2, 0, 0, 2236, -9884),
+    (0, 1, 2, 0, -2120, 5751),
+    (0, 2, 0, 0, -2069, 0),
+    (2, -2, -1, 0, 2048, -4950),
+    (2, 0, 1, -2, -1773, 4130),
+    (2, 0, 0, 2, -1595, 0),
+    (4, -1, -1, 0, 1215, -3958),
+    (0, 0, 2, 2, -1110, 0),
+    (3, 0, -1, 0, -892, 3258),
+    (2, 1, 1, 0, -810, 2616),
+    (4, -1, -2, 0, 759, -1897),
+    (0, 2, -1, 0, -713, -2117),
+    (2, 2, -1, 0, -700, 2354),
+    (2, 1, -2, 0, 691, 0),
+    (2, -1, 0, -2, 596, 0),
+    (4, 0, 1, 0, 549, -1423),
+    (0, 0, 4, 0, 537, -1117),
+    (4, -1, 0, 0, 520, -1571),
+    (1, 0, -2, 0, -487, -1739),
+], dtype=float)
+
+# Moon latitude terms (Meeus table 47.B): D, M, M', F, sum_b (1e-6 deg)
+MOON_B = np.array([
+    (0, 0, 0, 1, 5128122),
+    (0, 0, 1, 1, 280602),
+    (0, 0, 1, -1, 277693),
+    (2, 0, 0, -1, 173237),
+    (2, 0, -1, 1, 55413),
+    (2, 0, -1, -1, 46271),
+    (2, 0, 0, 1, 32573),
+    (0, 0, 2, 1, 17198),
+    (2, 0, 1, -1, 9266),
+    (0, 0, 2, -1, 8822),
+    (2, -1, 0, -1, 8216),
+    (2, 0, -2, -1, 4324),
+    (2, 0, 1, 1, 4200),
+    (2, 1, 0, -1, -3359),
+    (2, -1, -1, 1, 2463),
+    (2, -1, 0, 1, 2211),
+    (2, -1, -1, -1, 2065),
+    (0, 1, -1, -1, -1870),
+], dtype=float)
+
+
+def _centuries(jd_tt):
+    return (np.asarray(jd_tt, dtype=float) - J2000) / 36525.0
+
+
+def general_precession(T):
+    """Accumulated precession in longitude since J2000 (deg)."""
+    return 1.3969713 * T + 0.0003086 * T * T
+
+
+def nutation_longitude(T):
+    """Nutation in longitude (deg), main terms only (~0.5 arcsec)."""
+    omega = np.radians(125.04452 - 1934.136261 * T)
+    L = np.radians(280.4665 + 36000.7698 * T)
+    Lm = np.radians(218.3165 + 481267.8813 * T)
+    return (-17.20 * np.sin(omega) - 1.32 * np.sin(2 * L)
+            - 0.23 * np.sin(2 * Lm) + 0.21 * np.sin(2 * omega)) / 3600.0
+
+
+def _heliocentric(name, T):
+    """Heliocentric J2000 ecliptic xyz (au) from the Keplerian elements, shape (3, ...)."""
+    base, rate = ELEMENTS[name]
+    a, e, inc, L, peri, node = (b + r * T for b, r in zip(base, rate))
+
+    M = np.radians((L - peri + 180.0) % 360.0 - 180.0)
+    # Kepler's equation, Newton iterations (e <= 0.25 converges fast)
+    E = M + e * np.sin(M)
+    for _ in range(6):
+        E = E - (E - e * np.sin(E) - M) / (1 - e * np.cos(E))
+
+    xp = a * (np.cos(E) - e)
+    yp = a * np.sqrt(1 - e * e) * np.sin(E)
+
+    w = np.radians(peri - node)
+    node = np.radians(node)
+    inc = np.radians(inc)
+    cw, sw, cn, sn, ci, si = np.cos(w), np.sin(w), np.cos(node), np.sin(node), np.cos(inc), np.sin(inc)
+
+    x = (cw * cn - sw * sn * ci) * xp + (-sw * cn - cw * sn * ci) * yp
+    y = (cw * sn + sw * cn * ci) * xp + (-sw * sn + cw * cn * ci) * yp
+    z = (sw * si) * xp + (cw * si) * yp
+    return np.array([x, y, z])
+
+
+def _spherical(xyz):
+    x, y, z = xyz
+    xy = np.hypot(x, y)
+    return np.degrees(np.arctan2(y, x)) % 360.0, np.degrees(np.arctan2(z, xy)), np.hypot(xy, z)
+
+
+def sun_position(T):
+    """Geocentric apparent Sun, J2000 ecliptic: (lon, lat, dist au)."""
+    L0 = 280.46646 + 36000.76983 * T + 0.0003032 * T * T
+    M = np.radians(357.52911 + 35999.05029 * T - 0.0001537 * T * T)
+    e = 0.016708634 - 0.000042037 * T - 0.0000001267 * T * T
+    C = ((1.914602 - 0.004817 * T - 0.000014 * T * T) * np.sin(M)
+         + (0.019993 - 0.000101 * T) * np.sin(2 * M)
+         + 0.000289 * np.sin(3 * M))
+    nu = M + np.radians(C)
+    R = 1.000001018 * (1 - e * e) / (1 + e * np.cos(nu))
+
+    # True longitude (mean equinox of date) + aberration, moved back to J2000
+    lon = (L0 + C - ABERRATION_DEG / R - general_precession(T)) % 360.0
+    return lon, np.zeros_like(lon), R
+
+
+def moon_position(T):
+    """Geocentric Moon, J2000 ecliptic: (lon, lat, dist au)."""
+    T2, T3, T4 = T * T, T * T * T, T * T * T * T
+    Lp = 218.3164477 + 481267.88123421 * T - 0.0015786 * T2 + T3 / 538841 - T4 / 65194000
+    D = 297.8501921 + 445267.1114034 * T - 0.0018819 * T2 + T3 / 545868 - T4 / 113065000
+    M = 357.5291092 + 35999.0502909 * T - 0.0001536 * T2 + T3 / 24490000
+    Mp = 134.9633964 + 477198.8675055 * T + 0.0087414 * T2 + T3 / 69699 - T4 / 14712000
+    F = 93.2720950 + 483202.0175233 * T - 0.0036539 * T2 - T3 / 3526000 + T4 / 863310000
+    A1 = np.radians(119.75 + 131.849 * T)
+    A2 = np.radians(53.09 + 479264.290 * T)
+    A3 = np.radians(313.45 + 481266.484 * T)
+    E = 1 - 0.002516 * T - 0.0000074 * T2
+
+    args = np.radians(np.stack([D, M, Mp, F]))  # (4, ...)
+
+    def series(table, coeff_col):
+        # Terms with M are scaled by E^|M| (eccentricity of Earth's orbit)
+        phase = np.tensordot(table[:, :4], args, axes=(1, 0))
+        shape = (-1,) + (1,) * np.ndim(T)
+        ecc = np.power(E, np.abs(table[:, 1]).reshape(shape))
+        return table[:, coeff_col].reshape(shape) * ecc, phase
+
+    coef, phase = series(MOON_LR, 4)
+    sum_l = np.sum(coef * np.sin(phase), axis=0)
+    coef, _ = series(MOON_LR, 5)
+    sum_r = np.sum(coef * np.cos(phase), axis=0)
+    coef, phase = series(MOON_B, 4)
+    sum_b = np.sum(coef * np.sin(phase), axis=0)
+
+    Lp_r, F_r, Mp_r = np.radians(Lp), np.radians(F), np.radians(Mp)
+    sum_l = sum_l + 3958 * np.sin(A1) + 1962 * np.sin(Lp_r - F_r) + 318 * np.sin(A2)
+    sum_b = (sum_b - 2235 * np.sin(Lp_r) + 382 * np.sin(A3) + 175 * np.sin(A1 - F_r)
+             + 175 * np.sin(A1 + F_r) + 127 * np.sin(Lp_r - Mp_r) - 115 * np.sin(Lp_r + Mp_r))
+
+    lon = (Lp + sum_l / 1e6 - general_precession(T)) % 360.0
+    lat = sum_b / 1e6
+    dist = (385000.56 + sum_r / 1000.0) / AU_KM
+    return lon, lat, dist
+
+
+def planet_position(name, T, earth):
+    """Geocentric apparent planet, J2000 ecliptic, given the Earth's heliocentric xyz."""
+    geo = _heliocentric(name, T) - earth
+    # One light-time iteration: planet where it was when the light left
+    tau = np.sqrt(np.sum(geo * geo, axis=0)) * LIGHT_DAYS_PER_AU
+    geo = _heliocentric(name, T - tau / 36525.0) - earth
+    lon, lat, dist = _spherical(geo)
+
+    # Annual aberration in longitude (Sun direction = -earth)
+    sun_lon = np.degrees(np.arctan2(-earth[1], -earth[0]))
+    lon = (lon - ABERRATION_DEG * np.cos(np.radians(sun_lon - lon)) / np.cos(np.radians(lat))) % 360.0
+    return lon, lat, dist
+
+
+def positions(jd_tt, of_date=False):
+    """
+    Geocentric apparent (lon, lat, dist) for every body, keyed by name.
+    Longitudes are J2000 ecliptic (same as the engine's default frame);
+    of_date=True returns true ecliptic and equinox of date (ecliptic_frame).
+    """
+    T = _centuries(jd_tt)
+    earth = _heliocentric('EMB', T)
+
+    result = {
+        'Sun': sun_position(T),
+        'Moon': moon_position(T),
+    }
+    for name in ('Mercury', 'Venus', 'Mars', 'Jupiter', 'Saturn', 'Uranus', 'Neptune', 'Pluto'):
+        result[name] = planet_position(name, T, earth)
+
+    if of_date:
+        shift = general_precession(T) + nutation_longitude(T)
+        result = {name: ((lon + shift) % 360.0, lat, dist) for name, (lon, lat, dist) in result.items()}
+    return result
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class AstrologyConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'astrology'
+
+    def ready(self):
+        # Keep the in-memory interpretation store in sync with admin edits
+        from . import signals  # noqa: F401
+
+        # The geo index is preloaded from wsgi.py/asgi.py, not here: ready() also
+        # runs for every manage.py command, which never needs it
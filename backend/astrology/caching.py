@@ -0,0 +1,111 @@
+"""
+Small in-process caches shared by the engine and the views.
+Each gunicorn worker keeps its own copy.
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Thread-safe bounded LRU mapping with hit/miss counters.
+    None is a valid cached value (e.g. "no timezone at this point").
+    ttl (seconds): entries older than this count as misses. None = never expire.
+    """
+
+    def __init__(self, maxsize=1024, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                value, expires = entry
+                if expires is None or expires > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_set(self, key, factory):
+        """Return the cached value or compute it with factory() and store it."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = factory()
+            self.set(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0
+        }
+
+
+class FileCache:
+    """
+    Parsed data files kept in memory, re-read only when the file's mtime changes
+    (one os.stat per access instead of open + parse).
+    """
+
+    def __init__(self, loader):
+        self.loader = loader
+        self._data = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def get(self, path):
+        mtime = os.stat(path).st_mtime_ns
+        entry = self._data.get(path)
+        if entry is not None and entry[0] == mtime:
+            return entry[1]
+        with self._lock:
+            entry = self._data.get(path)
+            if entry is None or entry[0] != mtime:
+                entry = (mtime, self.loader(path))
+                self._data[path] = entry
+                self.loads += 1
+            return entry[1]
+
+
+def _load_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+# Shared parsed JSON files (callers must treat the result as read-only)
+json_files = FileCache(_load_json)
@@ -0,0 +1,130 @@
+"""
+Result cache in front of AstroEngine.calculate_natal.
+
+The web form posts the same defaults ("12:00", 41.0, 28.0) for lots of users, so
+charts are keyed on what actually determines the output instead of the raw input:
+  - the UTC instant (after timezone/DST resolution)
+  - the local calendar date (the Sun cusp override reads it)
+  - lat/lon rounded to CHART_CACHE_PRECISION decimals (calculate_natal rounds
+    the same way before computing, so a hit is identical to a recompute)
+  - the position backend
+
+L1 is a per-worker LRU with TTL. L2 is an optional Django cache alias
+(CHART_CACHE_L2_ALIAS, e.g. a shared redis/memcached) so workers reuse each other's charts.
+Only the natal payload is cached; "now"-dependent parts (profection, career
+transits) are computed by the callers on every request.
+"""
+import copy
+import threading
+from django.conf import settings
+from django.core.cache import caches
+
+from .caching import LRUCache
+
+# Bump when the natal payload layout changes so old L2 entries are ignored
+KEY_VERSION = 2
+
+
+class ChartCache:
+    def __init__(self, maxsize=2048, ttl=6 * 3600, precision=6, l2_alias=None):
+        self.precision = precision
+        self.l1 = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.ttl = ttl
+        self.l2_alias = l2_alias or None
+        self.l2_hits = 0
+        self.l2_misses = 0
+        self.l2_errors = 0
+
+    def round_coords(self, lat, lon):
+        return round(float(lat), self.precision), round(float(lon), self.precision)
+
+    def key(self, dt_utc, local_date, lat, lon, backend):
+        # Plain string so it is a valid memcached key as well
+        return (f"natal:v{KEY_VERSION}:{backend}:{dt_utc.strftime('%Y%m%dT%H%M%S.%f')}:"
+                f"{local_date.isoformat()}:{lat:.{self.precision}f}:{lon:.{self.precision}f}")
+
+    @property
+    def l2(self):
+        return caches[self.l2_alias] if self.l2_alias else None
+
+    def _l2_get(self, key):
+        try:
+            value = self.l2.get(key)
+        except Exception as e:
+            # A dead cache server must not take chart calculation down with it
+            self.l2_errors += 1
+            print(f"Chart cache L2 get failed: {e}")
+            return None
+        if value is None:
+            self.l2_misses += 1
+        else:
+            self.l2_hits += 1
+        return value
+
+    def _l2_set(self, key, value):
+        try:
+            self.l2.set(key, value, timeout=self.ttl)
+        except Exception as e:
+            self.l2_errors += 1
+            print(f"Chart cache L2 set failed: {e}")
+
+    def _lookup(self, key):
+        chart = self.l1.get(key)
+        if chart is None and self.l2_alias:
+            chart = self._l2_get(key)
+            if chart is not None:
+                self.l1.set(key, chart)
+        return chart
+
+    def get(self, key):
+        """Private copy of the cached chart, or None (batch callers compute misses together)."""
+        chart = self._lookup(key)
+        return copy.deepcopy(chart) if chart is not None else None
+
+    def get_or_compute(self, key, compute):
+        """
+        Returns a private copy of the cached chart (callers enrich the dicts in place),
+        computing and storing it on a miss.
+        """
+        chart = self._lookup(key)
+        if chart is None:
+            chart = compute()
+            self.l1.set(key, chart)
+            if self.l2_alias:
+                self._l2_set(key, chart)
+        return copy.deepcopy(chart)
+
+    def clear(self):
+        self.l1.clear()
+        self.l2_hits = self.l2_misses = self.l2_errors = 0
+
+    def stats(self):
+        stats = {'l1': self.l1.stats(), 'l2': None}
+        if self.l2_alias:
+            total = self.l2_hits + self.l2_misses
+            stats['l2'] = {
+                'alias': self.l2_alias,
+                'hits': self.l2_hits,
+                'misses': self.l2_misses,
+                'errors': self.l2_errors,
+                'hit_rate': round(self.l2_hits / total, 4) if total else 0.0
+            }
+        return stats
+
+
+_chart_cache = None
+_chart_cache_lock = threading.Lock()
+
+
+def get_chart_cache():
+    global _chart_cache
+    if _chart_cache is None:
+        with _chart_cache_lock:
+            if _chart_cache is None:
+                _chart_cache = ChartCache(
+                    maxsize=getattr(settings, 'CHART_CACHE_SIZE', 2048),
+                    ttl=getattr(settings, 'CHART_CACHE_TTL', 6 * 3600),
+                    precision=getattr(settings, 'CHART_CACHE_PRECISION', 6),
+                    l2_alias=getattr(settings, 'CHART_CACHE_L2_ALIAS', None),
+                )
+    return _chart_cache
@@ -1,16 +1,23 @@
 from skyfield.api import load, wgs84, Star, utc
-from skyfield.framelib import ecliptic_frame
+from skyfield.framelib import ecliptic_frame, ecliptic_J2000_frame
 from skyfield import almanac
 from skyfield.data import hipparcos
 import numpy as np
 from datetime import datetime, timedelta
 import math
 import os
+import threading
+import time
 from django.conf import settings
 import json
-from timezonefinder import TimezoneFinder
 import pytz
 from .synastry_data import SYNASTRY_DATA, get_generic_text
+from .timezones import resolve_timezone, local_to_utc
+from .ephemeris_table import get_table
+from .chart_cache import get_chart_cache
+from .geo_index import get_geo_index
+from .caching import LRUCache, json_files
+from . import analytic_ephemeris
 
 # PLANET CONSTANTS
 PLANETS_LIST = [
@@ -24,10 +31,63 @@ SIGNS = [
     'Sagittarius', 'Capricorn', 'Aquarius', 'Pisces'
 ]
 
+# Skyfield segment names for the bodies we observe (DE421 has no Chiron)
+BODY_KEYS = {
+    'Sun': 'sun', 'Moon': 'moon', 'Mercury': 'mercury', 'Venus': 'venus',
+    'Mars': 'mars', 'Jupiter': 'jupiter barycenter', 'Saturn': 'saturn barycenter',
+    'Uranus': 'uranus barycenter', 'Neptune': 'neptune barycenter',
+    'Pluto': 'pluto barycenter'
+}
+BODY_NAMES = list(BODY_KEYS)
+
+# Position backends, selectable per call (default: settings.EPHEMERIS_BACKEND)
+# jpl   -> full Skyfield apparent positions from DE421
+# table -> interpolation from the precomputed table (build_ephemeris_table), ~0.01 deg
+# analytic -> closed-form series (analytic_ephemeris), no kernel needed, ~0.01-0.3 deg
+EPHEMERIS_BACKENDS = ('jpl', 'table', 'analytic')
+
+# Half-width (days) of the central difference used for longitude speeds
+SPEED_DELTA = 1.0 / 48.0
+
+# Rectification: transiting points that can activate the birth angles
+RECTIFY_BODIES = ['Jupiter', 'Saturn', 'Uranus', 'Neptune', 'Pluto']
+RECTIFY_ORB = 4.0
+# (birth angle, aspect angle, weight, key) - weights favour hard contacts
+RECTIFY_ASPECTS = (
+    ('asc', 0.0, 10, 'conj_asc'), ('asc', 180.0, 8, 'opp_asc'), ('asc', 90.0, 5, 'sqr_asc'),
+    ('mc', 0.0, 10, 'conj_mc'), ('mc', 180.0, 8, 'opp_mc'),
+)
+# Coarse -> fine search steps in seconds
+RECTIFY_STEPS = (600, 60, 10)
+
+# Planetary hours: sunrise/sunset tables are cached per (month, location rounded to this)
+SUN_EVENT_PRECISION = 2
+_sun_events_cache = LRUCache(maxsize=512)
+
+# Active aspects in the current sky: (name, exact angle, orb), first match wins
+SKY_ASPECTS = (
+    ('Conjunction', 0.0, 5.0), ('Opposition', 180.0, 5.0), ('Trine', 120.0, 5.0),
+    ('Square', 90.0, 5.0), ('Sextile', 60.0, 4.0),
+)
+MOON_PHASES = [
+    'New Moon', 'Waxing Crescent', 'First Quarter', 'Waxing Gibbous',
+    'Full Moon', 'Waning Gibbous', 'Last Quarter', 'Waning Crescent'
+]
+
+# Bodies scored by the daily/weekly transit forecast
+FORECAST_BODIES = ['Sun', 'Moon', 'Mars', 'Saturn', 'Jupiter', 'Venus']
+
 class AstroEngine:
     _instance = None
     _eph = None
     _ts = None
+    _earth = None
+    _bodies = None
+    # current_sky() snapshot, shared by all requests in the process
+    _sky = None
+    _sky_at = 0.0
+    _sky_lock = threading.Lock()
+    _sky_thread = None
 
     def __new__(cls):
         if cls._instance is None:
@@ -43,11 +103,18 @@ class AstroEngine:
                      
                 cls._eph = load(eph_path)
                 cls._ts = load.timescale()
+                cls._bind_bodies()
             except Exception as e:
                 print(f"CRITICAL ERROR loading ephemeris: {e}")
                 # Don't crash, but methods will fail
         return cls._instance
 
+    @classmethod
+    def _bind_bodies(cls):
+        # Resolve the segment chains once instead of on every chart
+        cls._earth = cls._eph['earth']
+        cls._bodies = [cls._eph[key] for key in BODY_KEYS.values()]
+
     @property
     def eph(self):
         return self._eph
@@ -56,9 +123,224 @@ class AstroEngine:
     def ts(self):
         return self._ts
 
-    def calculate_natal(self, date_str, time_str, lat, lon):
+    def calculate_positions(self, t, frame=None, backend=None, with_speed=False):
+        """
+        Apparent geocentric positions of every body in BODY_NAMES at t.
+        The Earth's barycentric state is computed once and shared by all bodies,
+        then the frame rotation and spherical conversion run as one NumPy pass.
+
+        Returns an array of shape (3, n_bodies): lon (deg), lat (deg), dist (au).
+        If t is a Time array the shape is (3, n_bodies, n_times).
+        The default frame is the J2000 ecliptic, same as ecliptic_latlon().
+
+        with_speed=True adds a 4th row: longitude speed in deg/day (negative =
+        retrograde), from a central difference over t +- SPEED_DELTA evaluated
+        in the same call as t itself.
+
+        backend='table' interpolates longitudes from the precomputed table
+        (lat/dist are NaN there). It falls back to 'jpl' for other frames,
+        instants outside the table, or when the table has not been built.
+
+        backend='analytic' uses the low-precision series in analytic_ephemeris
+        (see ERROR_BUDGET_DEG there). Only for wide-orb work like forecasts;
+        supports the default frame and ecliptic_frame, others fall back to 'jpl'.
+        """
+        backend = backend or getattr(settings, 'EPHEMERIS_BACKEND', 'jpl')
+        if backend not in EPHEMERIS_BACKENDS:
+            raise ValueError(f"Unknown ephemeris backend: {backend}")
+
+        if backend == 'table' and frame is None:
+            table = get_table()
+            if table is not None and table.covers(t.tt):
+                # The table stores speeds, no extra instants needed
+                lons, speeds = table.positions(t.tt)
+                missing = np.full_like(lons, np.nan)
+                rows = [lons, missing, missing, speeds] if with_speed else [lons, missing, missing]
+                return np.array(rows)
+
+        if not with_speed:
+            return self._positions(t, frame, backend)
+
+        # t - d, t, t + d as one Time array (whole/fraction kept so t itself is exact)
+        whole = np.atleast_1d(t.whole)
+        fraction = np.atleast_1d(t.tt_fraction)
+        n = len(whole)
+        t3 = self.ts.tt_jd(np.tile(whole, 3), np.concatenate(
+            [fraction - SPEED_DELTA, fraction, fraction + SPEED_DELTA]))
+        pos = self._positions(t3, frame, backend)
+
+        before, now, after = pos[..., :n], pos[..., n:2 * n], pos[..., 2 * n:]
+        speed = ((after[0] - before[0] + 180.0) % 360.0 - 180.0) / (2 * SPEED_DELTA)
+        result = np.concatenate([now, speed[None]])
+        return result if t.shape else result[..., 0]
+
+    def _positions(self, t, frame, backend):
+        if backend == 'analytic' and (frame is None or frame is ecliptic_frame):
+            pos = analytic_ephemeris.positions(t.tt, of_date=frame is ecliptic_frame)
+            # (n_bodies, 3[, n_times]) -> (3, n_bodies[, n_times])
+            return np.array([pos[name] for name in BODY_NAMES]).swapaxes(0, 1)
+
+        return self._positions_jpl(t, frame)
+
+    def retrograde_bodies(self, t, backend=None):
+        """Names of the bodies moving backwards in longitude at t."""
+        speeds = self.calculate_positions(t, backend=backend, with_speed=True)[3]
+        return [name for name, speed in zip(BODY_NAMES, speeds) if speed < 0]
+
+    def _positions_jpl(self, t, frame=None):
+        earth_at = self._earth.at(t)
+        xyz = np.stack([earth_at.observe(body).apparent().xyz.au for body in self._bodies])
+
+        R = (frame or ecliptic_J2000_frame).rotation_at(t)
+        if R.ndim == 2:
+            xyz = np.einsum('ij,bj...->bi...', R, xyz)
+        else:
+            # Frames of date rotate with time -> one matrix per instant
+            xyz = np.einsum('ijn,bjn->bin', R, xyz)
+
+        x, y, z = xyz[:, 0], xyz[:, 1], xyz[:, 2]
+        xy = np.hypot(x, y)
+        dist = np.hypot(xy, z)
+        lat_deg = np.degrees(np.arctan2(z, xy))
+        lon_deg = np.degrees(np.arctan2(y, x)) % 360.0
+        return np.array([lon_deg, lat_deg, dist])
+
+    def calculate_positions_batch(self, times, lat, lon, backend=None):
+        """
+        Positions and angles for many UTC instants in one vectorized call.
+        times: a Skyfield Time array or a sequence of UTC datetimes (naive = UTC).
+        lat/lon: scalars, or arrays with one entry per instant.
+
+        Returns a dict with 't', 'names', 'lon' (n_times x n_bodies matrix),
+        'ascendant_deg', 'midheaven_deg' and 'north_node' arrays.
+        backend: see calculate_positions.
+        """
+        if not hasattr(times, 'tt'):
+            times = self.ts.from_datetimes([
+                d if d.tzinfo else d.replace(tzinfo=utc) for d in times
+            ])
+        elif not times.shape:
+            times = self.ts.tt_jd(np.atleast_1d(times.tt))
+
+        lons = self.calculate_positions(times, backend=backend)[0].T
+        ac_deg, mc_deg = self._angles(times, lat, lon)
+
+        return {
+            't': times,
+            'names': BODY_NAMES,
+            'lon': lons,
+            'ascendant_deg': ac_deg,
+            'midheaven_deg': mc_deg,
+            'north_node': self.calculate_mean_node(times)
+        }
+
+    def local_times_to_utc(self, local_datetimes, lat, lon):
+        """
+        Vectorized version of calculate_natal's timezone handling for batch paths.
+        Converts naive local datetimes at (lat, lon) to a Skyfield Time array in
+        one searchsorted pass over the zone's transition table.
+        Returns (Time array, timezone display string).
+        """
+        t = local_to_utc(self.ts, resolve_timezone(lat, lon), local_datetimes, lon=lon)
+        return t, self.timezone_label(lat, lon)
+
+    def _angles(self, t, lat, lon):
+        """
+        Ascendant and MC in degrees. Works on a single Time or a Time array
+        (lat/lon may also be arrays), so batch callers get both in one pass.
+        """
+        # Local Sidereal Time = GAST (hours -> deg) + Longitude
+        lst_rad = np.radians((t.gast * 15.0 + lon) % 360)
+        lat_rad = np.radians(lat)
+        eps_rad = math.radians(23.4392911) # Obliquity of Ecliptic (approx J2000)
+
+        # tan(AC) = cos(LST) / - (sin(LST)*cos(Eps) + tan(Lat)*sin(Eps))
+        num = np.cos(lst_rad)
+        den = - ((np.sin(lst_rad) * math.cos(eps_rad)) + (np.tan(lat_rad) * math.sin(eps_rad)))
+        ac_deg = np.degrees(np.arctan2(num, den)) % 360
+
+        # tan(MC) = tan(LST) / cos(Eps)
+        mc_deg = np.degrees(np.arctan2(np.sin(lst_rad), np.cos(lst_rad) * math.cos(eps_rad))) % 360
+        return ac_deg, mc_deg
+
+    def calculate_natal(self, date_str, time_str, lat, lon, backend=None):
         """
         Full Natal Chart Calculation using NASA data + Precise Timezone.
+        backend: position backend, see calculate_positions.
+
+        Results are cached on the resolved UTC instant (see chart_cache), and
+        a fresh copy is returned on every call so callers can enrich it in place.
+        """
+        cache = get_chart_cache()
+        # Compute from the same rounded coordinates the cache key uses
+        lat, lon = cache.round_coords(lat, lon)
+        backend = backend or getattr(settings, 'EPHEMERIS_BACKEND', 'jpl')
+
+        dt, dt_utc, tz_display = self.resolve_birth_instant(date_str, time_str, lat, lon)
+        key = cache.key(dt_utc, dt.date(), lat, lon, backend)
+        return cache.get_or_compute(
+            key, lambda: self._natal_at(dt, dt_utc, tz_display, lat, lon, backend))
+
+    def calculate_natal_batch(self, records, backend=None, use_cache=True):
+        """
+        calculate_natal for many (date_str, time_str, lat, lon) records.
+
+        Every record is resolved to its UTC instant first. The timezone lookup
+        runs once per location (cached resolver), so records sharing a place
+        share it. Chart cache hits are served as usual. All misses are then
+        evaluated together: one Time array through calculate_positions /
+        _angles / calculate_mean_node instead of one ephemeris pass per chart.
+
+        Returns a list in input order of chart dicts, or of Exceptions for
+        records that could not be parsed/resolved, so one bad row doesn't fail
+        the rest.
+
+        use_cache=False skips the chart cache both ways (bulk jobs over unique
+        rows would only pay for the inserts and copies).
+        """
+        cache = get_chart_cache()
+        backend = backend or getattr(settings, 'EPHEMERIS_BACKEND', 'jpl')
+        results = [None] * len(records)
+        pending = [] # (index, key, dt, dt_utc, tz_display, lat, lon)
+
+        for i, (date_str, time_str, lat, lon) in enumerate(records):
+            try:
+                lat, lon = cache.round_coords(lat, lon)
+                if not (-90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0):
+                    raise ValueError("Coordinates out of range")
+                dt, dt_utc, tz_display = self.resolve_birth_instant(date_str, time_str, lat, lon)
+            except Exception as e:
+                results[i] = e
+                continue
+            key = chart = None
+            if use_cache:
+                key = cache.key(dt_utc, dt.date(), lat, lon, backend)
+                chart = cache.get(key)
+            if chart is not None:
+                results[i] = chart
+            else:
+                pending.append((i, key, dt, dt_utc, tz_display, lat, lon))
+
+        if not pending:
+            return results
+
+        t = self.ts.from_datetimes([p[3] for p in pending])
+        lats = np.array([p[5] for p in pending])
+        lons_obs = np.array([p[6] for p in pending])
+        # (4, n_bodies, n) and (n,) arrays, one evaluation for the whole batch
+        pos = self.calculate_positions(t, backend=backend, with_speed=True)
+        ac_deg, mc_deg = self._angles(t, lats, lons_obs)
+        nodes = self.calculate_mean_node(t)
+
+        for j, (i, key, dt, dt_utc, tz_display, lat, lon) in enumerate(pending):
+            chart = self._natal_chart(dt, t[j], tz_display, pos[0, :, j], pos[3, :, j],
+                                      ac_deg[j], mc_deg[j], nodes[j])
+            results[i] = cache.get_or_compute(key, lambda: chart) if use_cache else chart
+        return results
+
+    def resolve_birth_instant(self, date_str, time_str, lat, lon):
+        """
+        Local birth date/time -> (local naive datetime, aware UTC datetime, timezone label).
         """
         # Parse Time Input
         dt_str = f"{date_str} {time_str}"
@@ -66,15 +348,13 @@ class AstroEngine:
         dt = datetime.strptime(dt_str, "%Y/%m/%d %H:%M")
         
         # TIMEZONE CONVERSION (Precise Political Time)
-        # 1. Find Timezone Name from Coordinates
-        tf = TimezoneFinder()
-        tz_name = tf.timezone_at(lng=lon, lat=lat)
+        # 1. Find Timezone Name from Coordinates (process-wide cached resolver)
+        tz_name = resolve_timezone(lat, lon)
         
         if not tz_name:
             # Fallback (Ocean/Unknown) -> Use approximate LMT
             offset_hours = lon / 15.0
-            dt_utc = dt - timedelta(hours=offset_hours)
-            t = self.ts.from_datetime(dt_utc.replace(tzinfo=utc))
+            dt_utc = (dt - timedelta(hours=offset_hours)).replace(tzinfo=utc)
             tz_display = f"LMT (Approx {offset_hours:.1f}h)"
         else:
             # 2. Localize to that Timezone
@@ -95,32 +375,36 @@ class AstroEngine:
 
             # 3. Convert to UTC
             dt_utc = local_dt.astimezone(utc)
-            t = self.ts.from_datetime(dt_utc)
             tz_display = tz_name
-        
-        # Observer
-        observer = wgs84.latlon(lat, lon)
-        
+
+        return dt, dt_utc, tz_display
+
+    def _natal_at(self, dt, dt_utc, tz_display, lat, lon, backend):
+        """The uncached chart computation behind calculate_natal."""
+        t = self.ts.from_datetime(dt_utc)
+
         # 1. Calculate Planet Positions (Ecliptic Longitude)
-        earth = self.eph['earth']
+        # IMPORTANT: calculate_positions() matches ecliptic_latlon() output, all bodies in one pass
+        lons, lats, dists, speeds = self.calculate_positions(t, backend=backend, with_speed=True)
+        try:
+            # Skyfield t includes UT1 if we loaded standard timescale, giving GAST
+            ac_deg, mc_deg = self._angles(t, lat, lon)
+        except Exception as e:
+            print(f"ASC Calculation Failed: {e}")
+            ac_deg, mc_deg = None, None
+        return self._natal_chart(dt, t, tz_display, lons, speeds, ac_deg, mc_deg, self.calculate_mean_node(t))
+
+    def _natal_chart(self, dt, t, tz_display, lons, speeds, ac_deg, mc_deg, node_lon):
+        """
+        Builds the calculate_natal dict from already evaluated positions
+        (lons/speeds per BODY_NAMES, angles None if they failed), so the single
+        and batch paths produce the same layout.
+        """
         planets_data = []
-        
-        # Map Skyfield names
-        body_map = {
-            'Sun': 'sun', 'Moon': 'moon', 'Mercury': 'mercury', 'Venus': 'venus',
-            'Mars': 'mars', 'Jupiter': 'jupiter barycenter', 'Saturn': 'saturn barycenter',
-            'Uranus': 'uranus barycenter', 'Neptune': 'neptune barycenter', 
-            'Pluto': 'pluto barycenter'
-        }
-        
-        for name, key in body_map.items():
-            body = self.eph[key]
-            astrometric = earth.at(t).observe(body)
+
+        for idx, name in enumerate(BODY_NAMES):
             try:
-                # IMPORTANT: Use ecliptic_latlon() for 'Ecliptic of Date' (Tropical Zodiac)
-                # frame_latlon(ecliptic_frame) uses J2000 which is fixed/sidereal and causes drift.
-                p_lat, p_lon, p_dist = astrometric.apparent().ecliptic_latlon()
-                deg = p_lon.degrees
+                deg = float(lons[idx])
                 
                 sign_idx = int(deg / 30)
                 sign_name = SIGNS[sign_idx]
@@ -187,7 +471,8 @@ class AstroEngine:
                     'lon': deg,
                     'sign': sign_name,
                     'sign_lon': sign_deg,
-                    'speed': 1.0 # Todo: calculate speed for retro detection
+                    'speed': float(speeds[idx]), # deg/day
+                    'retrograde': bool(speeds[idx] < 0)
                 })
             except Exception as e:
                 print(f"Error calc {name}: {e}")
@@ -209,40 +494,8 @@ class AstroEngine:
         # 2. Precise Ascendant Calculation
         # Formula: tan(AC) = -cos(LST) / (sin(LST)*cos(Eps) + tan(Lat)*sin(Eps))
         try:
-            # A. Get Sidereal Time
-            # Skyfield t includes UT1 if we loaded standard timescale, giving GAST 
-            gast = t.gast # Greenwich Apparent Sidereal Time in hours
-            
-            # Convert to degrees (1 hr = 15 deg)
-            gast_deg = gast * 15.0
-            
-            # Local Sidereal Time = GAST + Longitude
-            lst_deg = (gast_deg + lon) % 360
-            
-            # Convert to Rad
-            lst_rad = math.radians(lst_deg)
-            lat_rad = math.radians(lat)
-            eps_rad = math.radians(23.4392911) # Obliquity of Ecliptic (approx J2000)
-
-            # B. Apply Formula
-            # Standard Formula: tan(AC) = cos(LST) / - (sin(LST)*cos(Eps) + tan(Lat)*sin(Eps))
-            # y = cos(LST)
-            # x = - (sin(LST)*cos(Eps) + tan(Lat)*sin(Eps))
-            # AC = atan2(y, x)
-            
-            num = math.cos(lst_rad)
-            den = - ((math.sin(lst_rad) * math.cos(eps_rad)) + (math.tan(lat_rad) * math.sin(eps_rad)))
-            
-            ac_rad = math.atan2(num, den)
-            ac_deg = math.degrees(ac_rad)
-            
-            # Normalize to 0-360
-            ac_deg = ac_deg % 360
-            
-            # C. Calculate MC (Midheaven)
-            # Formula: tan(MC) = tan(LST) / cos(Eps) -> atan2(sin(lst), cos(lst)*cos(eps))
-            mc_rad = math.atan2(math.sin(lst_rad), math.cos(lst_rad) * math.cos(eps_rad))
-            mc_deg = math.degrees(mc_rad) % 360
+            ac_deg = float(ac_deg)
+            mc_deg = float(mc_deg)
 
             # Determine Sign
             asc_idx = int(ac_deg / 30)
@@ -277,7 +530,7 @@ class AstroEngine:
             p['house'] = h
             
         # 2. Node Calc
-        node_lon = self.calculate_mean_node(t)
+        node_lon = float(node_lon)
         planets_data.append({
              'name': 'North Node', 'lon': node_lon,
              'sign': SIGNS[int(node_lon/30)], 'sign_lon': node_lon%30, 'house': 1 # approximate
@@ -298,29 +551,14 @@ class AstroEngine:
         """
         Fast calculation of only Ascendant and MC.
         Bypasses planet calculations for Rectification loops.
+        Accepts a Time array too, returning arrays in that case.
         """
         try:
-             # A. Get Sidereal Time
-            gast = t.gast
-            gast_deg = gast * 15.0
-            lst_deg = (gast_deg + lon) % 360
-            lst_rad = math.radians(lst_deg)
-            lat_rad = math.radians(lat)
-            eps_rad = math.radians(23.4392911) 
-
-            # B. Ascendant
-            num = math.cos(lst_rad)
-            den = - ((math.sin(lst_rad) * math.cos(eps_rad)) + (math.tan(lat_rad) * math.sin(eps_rad)))
-            ac_rad = math.atan2(num, den)
-            ac_deg = math.degrees(ac_rad) % 360
-            
-            # C. MC
-            mc_rad = math.atan2(math.sin(lst_rad), math.cos(lst_rad) * math.cos(eps_rad))
-            mc_deg = math.degrees(mc_rad) % 360
-            
-            # Sign
-            asc_idx = int(ac_deg / 30)
-            asc_sign = SIGNS[asc_idx]
+            ac_deg, mc_deg = self._angles(t, lat, lon)
+
+            # Sign (vectorized when t is a Time array)
+            asc_idx = (np.asarray(ac_deg) // 30).astype(int)
+            asc_sign = np.array(SIGNS)[asc_idx] if asc_idx.ndim else SIGNS[int(asc_idx)]
             
             return {
                 'ascendant_deg': ac_deg,
@@ -330,14 +568,115 @@ class AstroEngine:
         except Exception as e:
             return {'ascendant_deg': 0, 'midheaven_deg': 0, 'ascendant': 'Aries'}
 
+    def rectification_targets(self, event_dates, lat, lon):
+        """
+        Heavy planet + mean node longitudes at local noon of each event date.
+        Returns (n_events, n_points) array and the point names.
+        """
+        noons = [datetime(d.year, d.month, d.day, 12, 0) for d in event_dates]
+        t, _ = self.local_times_to_utc(noons, lat, lon)
+        batch = self.calculate_positions_batch(t, lat, lon)
+        cols = [BODY_NAMES.index(name) for name in RECTIFY_BODIES]
+        lons = np.column_stack([batch['lon'][:, cols], batch['north_node']])
+        return lons, RECTIFY_BODIES + ['North Node']
+
+    def _score_angles(self, asc, mc, targets):
+        """
+        Scores every candidate (asc, mc) against every target longitude at once.
+        asc/mc: (n,), targets: (m,). Returns score (n,), orb sum (n,) and the
+        hit mask (n, len(RECTIFY_ASPECTS), m).
+        """
+        dist = {}
+        for angle, values in (('asc', asc), ('mc', mc)):
+            d = np.abs(np.asarray(values)[:, None] - targets[None, :]) % 360
+            dist[angle] = np.minimum(d, 360 - d)
+
+        score = np.zeros(len(asc))
+        orb = np.zeros(len(asc))
+        hits = []
+        for angle, aspect, weight, _ in RECTIFY_ASPECTS:
+            off = np.abs(dist[angle] - aspect)
+            hit = off < RECTIFY_ORB
+            score += weight * hit.sum(axis=1)
+            orb += np.where(hit, off, 0.0).sum(axis=1)
+            hits.append(hit)
+        return score, orb, np.stack(hits, axis=1)
+
+    def rectify_birth_time(self, date_str, lat, lon, event_dates, top=3, windows=6):
+        """
+        Ranks birth times on date_str by heavy transits to the ASC/MC on the event dates.
+        Coarse pass every 10 min over the day, then the best `windows` are refined
+        to 1 min and 10 s. Equal scores go to the candidate with tighter aspects.
+
+        Returns up to `top` dicts (best first): 'dt' (local naive), 'score', 'orb',
+        'ascendant', 'ascendant_deg', 'midheaven_deg' and 'hits' as
+        (event index, point name, aspect key) tuples.
+        """
+        if not event_dates:
+            return []
+
+        day_start = datetime.strptime(date_str.replace('-', '/'), "%Y/%m/%d")
+        day = np.datetime64(day_start, 's')
+        targets, names = self.rectification_targets(event_dates, lat, lon)
+        flat = targets.ravel()
+
+        def evaluate(offsets):
+            # offsets: seconds after local midnight, any shape
+            t, _ = self.local_times_to_utc(day + offsets.ravel().astype('timedelta64[s]'), lat, lon)
+            angles = self.calculate_angles_light(t, lat, lon)
+            score, orb, hits = self._score_angles(angles['ascendant_deg'], angles['midheaven_deg'], flat)
+            return angles, score.reshape(offsets.shape), orb.reshape(offsets.shape), hits
+
+        # 1. Coarse: whole day, 10 min step
+        coarse = np.arange(0, 86400, RECTIFY_STEPS[0])
+        _, score, orb, _ = evaluate(coarse)
+        order = np.lexsort((orb, -score))[:windows]
+        best = coarse[order[score[order] > 0]]
+        if not len(best):
+            return []
+
+        # 2. Refine every window around its best point: +-10 min @ 1 min, then +-1 min @ 10 s
+        for prev_step, step in zip(RECTIFY_STEPS, RECTIFY_STEPS[1:]):
+            grid = best[:, None] + np.arange(-prev_step, prev_step + step, step)[None, :]
+            grid = np.clip(grid, 0, 86399)
+            _, score, orb, _ = evaluate(grid)
+            pick = np.lexsort((orb, -score), axis=-1)[:, 0]
+            best = grid[np.arange(len(grid)), pick]
+
+        # 3. Final ranking, windows that converged onto each other count once
+        best = np.unique(best)
+        angles, score, orb, hits = evaluate(best)
+        n_points = len(names)
+        results = []
+        taken = []
+        for i in np.lexsort((orb, -score)):
+            if len(results) == top:
+                break
+            offset = int(best[i])
+            if any(abs(offset - other) < RECTIFY_STEPS[0] for other in taken):
+                continue
+            taken.append(offset)
+            aspect_idx, target_idx = np.nonzero(hits[i])
+            found = sorted(
+                (int(j) // n_points, int(j) % n_points, int(a)) for a, j in zip(aspect_idx, target_idx))
+            results.append({
+                'dt': day_start + timedelta(seconds=offset),
+                'score': int(score[i]),
+                'orb': float(orb[i]),
+                'ascendant': str(angles['ascendant'][i]),
+                'ascendant_deg': float(angles['ascendant_deg'][i]),
+                'midheaven_deg': float(angles['midheaven_deg'][i]),
+                'hits': [(ev, names[pt], RECTIFY_ASPECTS[a][3]) for ev, pt, a in found]
+            })
+        return results
+
     def calculate_mean_node(self, t):
         """Calculates Mean North Node Lon."""
         jd = t.tt
         t_cen = (jd - 2451545.0) / 36525.0
         mn = 125.04452 - 1934.136261 * t_cen
-        mn = mn % 360.0
-        if mn < 0: mn += 360.0
-        return mn
+        # % already returns 0-360 (also for arrays of t)
+        return mn % 360.0
 
     def calculate_draconic(self, natal_planets, node_lon):
         """Draconic = Tropical - Node."""
@@ -484,92 +823,165 @@ class AstroEngine:
              
          return elements
 
-    def calculate_planetary_hours(self, date_str, lat, lon):
+    def calculate_forecast_scores(self, start_date, days=7, backend=None):
+        """
+        Transit scores for `days` consecutive days (12:00 UTC) from start_date,
+        all days x bodies evaluated as one array (ecliptic of date).
+        Returns unclamped 'total', 'love', 'career' int arrays of length days.
+        """
+        t = self.ts.utc(start_date.year, start_date.month, start_date.day + np.arange(days), 12, 0, 0)
+        lons = self.calculate_positions(t, frame=ecliptic_frame, backend=backend)[0]
+        pos = lons[[BODY_NAMES.index(name) for name in FORECAST_BODIES]].T  # (days, bodies)
+
+        # Pairwise separations (days, bodies, bodies), 0..180
+        sep = np.abs(pos[:, :, None] - pos[:, None, :]) % 360
+        sep = np.minimum(sep, 360 - sep)
+        trine = np.abs(sep - 120) < 5
+        sextile = np.abs(sep - 60) < 4
+        square = np.abs(sep - 90) < 5
+        opposition = np.abs(sep - 180) < 5
+
+        # General aspects, each pair once
+        pair_score = 8 * trine + 4 * sextile - 8 * square - 6 * opposition
+        upper = np.triu(np.ones(len(FORECAST_BODIES), dtype=bool), k=1)
+        total = 50 + pair_score[:, upper].sum(axis=1)
+
+        # Venus (love) and Saturn (career) rows against everything else
+        v = FORECAST_BODIES.index('Venus')
+        love = 50 + (15 * (trine | sextile)[:, v] - 10 * (square | opposition)[:, v]).sum(axis=1)
+        s = FORECAST_BODIES.index('Saturn')
+        career = 50 + (10 * (trine | sextile)[:, s] - 15 * square[:, s]).sum(axis=1)
+
+        return {'total': total, 'love': love, 'career': career}
+
+    def _sun_events(self, year, month, lat, lon):
+        """
+        Sunrise/sunset events for one UTC calendar month: (tt array, is_rise bool array).
+        One find_discrete search per month, cached per (month, location).
+        """
+        def search():
+            nxt = datetime(year + month // 12, month % 12 + 1, 1)
+            f = almanac.sunrise_sunset(self._eph, wgs84.latlon(lat, lon))
+            t_ev, codes = almanac.find_discrete(
+                self._ts.utc(year, month, 1), self._ts.utc(nxt.year, nxt.month, 1), f)
+            return np.asarray(t_ev.tt), np.asarray(codes) == 1
+
+        return _sun_events_cache.get_or_set((year, month, lat, lon), search)
+
+    def _sun_events_between(self, tt_start, tt_end, lat, lon):
+        """Concatenated cached months covering [tt_start, tt_end]."""
+        first = self._ts.tt_jd(tt_start).utc_datetime()
+        last = self._ts.tt_jd(tt_end).utc_datetime()
+        tts, rises = [], []
+        year, month = first.year, first.month
+        while (year, month) <= (last.year, last.month):
+            tt, rise = self._sun_events(year, month, lat, lon)
+            tts.append(tt)
+            rises.append(rise)
+            year, month = year + month // 12, month % 12 + 1
+        return np.concatenate(tts), np.concatenate(rises)
+
+    def timezone_label(self, lat, lon):
+        """Zone name shown to users, or the LMT fallback label over oceans."""
+        tz_name = resolve_timezone(lat, lon)
+        return tz_name if tz_name else f"LMT (Approx {lon / 15.0:.1f}h)"
+
+    def nearest_place(self, lat, lon, max_km=None):
+        """
+        Closest known city/district to lat/lon as a place dict plus 'label' and
+        'distance_km', or None past max_km (default NEAREST_PLACE_MAX_KM).
+        """
+        if max_km is None:
+            max_km = getattr(settings, 'NEAREST_PLACE_MAX_KM', 150)
+        index = get_geo_index()
+        place, km = index.nearest(float(lat), float(lon), max_km=max_km)
+        if place is None:
+            return None
+        result = index.place_dict(place)
+        result['label'] = index.place_label(place)
+        result['distance_km'] = round(km, 1)
+        return result
+
+    def calculate_planetary_hours(self, date_str, lat, lon, days=1):
+        """
+        Planetary hours for `days` local days starting at date_str (YYYY-MM-DD).
+        Each day runs sunrise -> sunset -> next sunrise, split into 12 + 12 hours.
+        Times are shown in the location's own timezone (LMT over oceans).
+        """
         try:
             # 1. Parse Date & Location
             dt = datetime.strptime(date_str, "%Y-%m-%d")
-            t0 = self._ts.utc(dt.year, dt.month, dt.day, 0, 0, 0)
-            t1 = self._ts.utc(dt.year, dt.month, dt.day, 23, 59, 59)
-            
-            # 2. Calculate Sunrise/Sunset
-            location = wgs84.latlon(lat, lon)
-            f = almanac.sunrise_sunset(self._eph, location)
-            
-            # Search window
-            search_start = self._ts.utc(dt.year, dt.month, dt.day, 3, 0)
-            search_end = self._ts.utc(dt.year, dt.month, dt.day + 1, 12, 0)
-            
-            t_ev, ev_codes = almanac.find_discrete(search_start, search_end, f)
-            
-            sr_today = None
-            ss_today = None
-            sr_tomorrow = None
-            
-            for t, code in zip(t_ev, ev_codes):
-                # Almanac: True(1)=Up (Rise), False(0)=Down (Set)
-                if code == 1: 
-                    if sr_today is None: sr_today = t
-                    else: sr_tomorrow = t; break
-                elif code == 0:
-                    if ss_today is None: ss_today = t
-            
-            # Fallback
-            if not sr_today or not ss_today or not sr_tomorrow:
-                sr_today = self._ts.utc(dt.year, dt.month, dt.day, 6, 0)
-                ss_today = self._ts.utc(dt.year, dt.month, dt.day, 18, 0)
-                sr_tomorrow = self._ts.utc(dt.year, dt.month, dt.day + 1, 6, 0)
-
-            # 3. Intervals
-            day_len = ss_today - sr_today
-            night_len = sr_tomorrow - ss_today
-            day_step = day_len / 12.0
-            night_step = night_len / 12.0
-            
+            dates = [dt + timedelta(days=i) for i in range(days + 1)]
+
+            # Local midnights -> UTC, the day window starts there (not at a fixed UTC hour)
+            t_mid, _ = self.local_times_to_utc(dates, lat, lon)
+            midnights = np.asarray(t_mid.tt)
+
+            # 2. Sunrise/Sunset from the cached monthly tables
+            # Rounded location: ~1 km moves sunrise by a few seconds at most
+            slat, slon = round(lat, SUN_EVENT_PRECISION), round(lon, SUN_EVENT_PRECISION)
+            ev_tt, ev_rise = self._sun_events_between(midnights[0], midnights[-1] + 2, slat, slon)
+            rises, sets = ev_tt[ev_rise], ev_tt[~ev_rise]
+
+            # First rise of each local day, the set after it and the next rise
+            def following(events, after):
+                idx = np.searchsorted(events, after, side='right')
+                found = idx < len(events)
+                if not len(events):
+                    return np.full(len(after), np.nan), found
+                return events[np.minimum(idx, len(events) - 1)], found
+
+            sr_today, ok_sr = following(rises, midnights[:-1])
+            ss_today, ok_ss = following(sets, sr_today)
+            sr_tomorrow, ok_next = following(rises, ss_today)
+            valid = (ok_sr & ok_ss & ok_next & (sr_today < midnights[1:])
+                     & (ss_today - sr_today < 1.0) & (sr_tomorrow - ss_today < 1.0))
+
+            # Fallback (polar day/night): 06:00 / 18:00 / 06:00 local
+            if not valid.all():
+                t6, _ = self.local_times_to_utc([d + timedelta(hours=6) for d in dates], lat, lon)
+                t18, _ = self.local_times_to_utc([d + timedelta(hours=18) for d in dates[:-1]], lat, lon)
+                sr_today = np.where(valid, sr_today, t6.tt[:-1])
+                ss_today = np.where(valid, ss_today, t18.tt)
+                sr_tomorrow = np.where(valid, sr_tomorrow, t6.tt[1:])
+
+            # 3. Intervals: 13 boundaries for the day hours, 13 for the night hours
+            k = np.arange(13) / 12.0
+            day_edges = sr_today[:, None] + (ss_today - sr_today)[:, None] * k
+            night_edges = ss_today[:, None] + (sr_tomorrow - ss_today)[:, None] * k
+            edges = np.concatenate([day_edges, night_edges], axis=1)  # (days, 26)
+
+            # All boundaries -> local wall clock in one pass
+            tz_name = resolve_timezone(lat, lon)
+            local_tz = pytz.timezone(tz_name) if tz_name else None
+            utc_edges = self._ts.tt_jd(edges.ravel()).utc_datetime()
+            if local_tz:
+                labels = [d.astimezone(local_tz).strftime("%H:%M") for d in utc_edges]
+            else:
+                labels = [(d + timedelta(hours=lon / 15.0)).strftime("%H:%M") for d in utc_edges]
+            labels = np.array(labels).reshape(edges.shape)
+
             # 4. Rulers (Chaldean Descending: Sat, Jup, Mar, Sun, Ven, Mer, Moo)
             chaldean = ['Saturn', 'Jupiter', 'Mars', 'Sun', 'Venus', 'Mercury', 'Moon']
             
             # Day Ruler (0=Mon(Moon)... 6=Sun(Sun))
             # Rulers: Mon:Moon, Tue:Mars, Wed:Merc, Thu:Jup, Fri:Ven, Sat:Sat, Sun:Sun
             weekday_rulers = {0:'Moon', 1:'Mars', 2:'Mercury', 3:'Jupiter', 4:'Venus', 5:'Saturn', 6:'Sun'}
-            first_ruler = weekday_rulers[dt.weekday()]
-            start_idx = chaldean.index(first_ruler)
-            
+
             hours = []
-            
-            # Day Hours
-            curr = sr_today
-            for i in range(12):
-                ruler = chaldean[(start_idx + i) % 7]
-                nxt = self._ts.tt_jd(curr.tt + day_step)
-                
-                # Apply UTC+3 for display
-                s_local = curr.utc_datetime() + timedelta(hours=3)
-                e_local = nxt.utc_datetime() + timedelta(hours=3)
-                
-                hours.append({
-                    'start': s_local.strftime("%H:%M"),
-                    'end': e_local.strftime("%H:%M"),
-                    'planet': ruler, # Renamed from ruler to planet for frontend consistency
-                    'type': 'Day'
-                })
-                curr = nxt
-                
-            # Night Hours
-            curr = ss_today
-            for i in range(12):
-                ruler = chaldean[(start_idx + 12 + i) % 7]
-                nxt = self._ts.tt_jd(curr.tt + night_step)
-                
-                s_local = curr.utc_datetime() + timedelta(hours=3)
-                e_local = nxt.utc_datetime() + timedelta(hours=3)
-                
-                hours.append({
-                    'start': s_local.strftime("%H:%M"),
-                    'end': e_local.strftime("%H:%M"),
-                    'planet': ruler, # Renamed from ruler to planet
-                    'type': 'Night'
-                })
-                curr = nxt
+            for d in range(days):
+                day = dates[d]
+                start_idx = chaldean.index(weekday_rulers[day.weekday()])
+                for i in range(24):
+                    # Day Hours 0-11 (edges 0..12), Night Hours 12-23 (edges 13..25)
+                    col = i if i < 12 else i + 1
+                    hours.append({
+                        'date': day.strftime("%Y-%m-%d"),
+                        'start': str(labels[d, col]),
+                        'end': str(labels[d, col + 1]),
+                        'planet': chaldean[(start_idx + i) % 7], # Renamed from ruler to planet for frontend consistency
+                        'type': 'Day' if i < 12 else 'Night'
+                    })
 
             return hours
 
@@ -577,6 +989,108 @@ class AstroEngine:
             print(f"Error calculating hours: {e}")
             return []
 
+    def compute_sky(self, t):
+        """
+        Bodies (ecliptic of date, with speeds), lunar phase and active aspects at t,
+        all from one calculate_positions pass.
+        """
+        pos = self.calculate_positions(t, frame=ecliptic_frame, with_speed=True)
+        lons, speeds = pos[0], pos[3]
+
+        bodies = {}
+        for idx, name in enumerate(BODY_NAMES):
+            lon = float(lons[idx])
+            bodies[name] = {
+                'lon': lon,
+                'sign': SIGNS[int(lon / 30) % 12],
+                'sign_lon': lon % 30,
+                'speed': float(speeds[idx]),
+                'retrograde': bool(speeds[idx] < 0)
+            }
+
+        # Moon - Sun elongation: 0 new, 180 full
+        elongation = float((lons[BODY_NAMES.index('Moon')] - lons[BODY_NAMES.index('Sun')]) % 360)
+        moon_phase = {
+            'angle': elongation,
+            'illumination': (1 - math.cos(math.radians(elongation))) / 2,
+            'name': MOON_PHASES[int((elongation + 22.5) % 360 // 45)]
+        }
+
+        # Every pair at once, reported in BODY_NAMES order (i < j)
+        sep = np.abs(lons[:, None] - lons[None, :]) % 360
+        sep = np.minimum(sep, 360 - sep)
+        aspects = []
+        for i, j in zip(*np.nonzero(np.triu(np.ones_like(sep, dtype=bool), k=1))):
+            for aspect, angle, orb in SKY_ASPECTS:
+                if abs(sep[i, j] - angle) <= orb:
+                    aspects.append({
+                        'p1': BODY_NAMES[i],
+                        'p2': BODY_NAMES[j],
+                        'aspect': aspect,
+                        'orb': round(float(abs(sep[i, j] - angle)), 2),
+                        'separation': float(sep[i, j])
+                    })
+                    break
+
+        return {
+            'utc_time': t.utc_strftime('%Y-%m-%d %H:%M:%S'),
+            'bodies': bodies,
+            'moon_phase': moon_phase,
+            'aspects': aspects
+        }
+
+    def current_sky(self):
+        """
+        The sky "now", shared by every request in the process (read-only dict).
+        Recomputed at most every CURRENT_SKY_INTERVAL seconds; concurrent callers
+        on a stale snapshot wait for a single recomputation instead of each doing one.
+        With CURRENT_SKY_BACKGROUND a daemon thread keeps it fresh so requests never wait.
+        """
+        interval = getattr(settings, 'CURRENT_SKY_INTERVAL', 60)
+        sky = AstroEngine._sky
+        if getattr(settings, 'CURRENT_SKY_BACKGROUND', False):
+            self._start_sky_refresher(interval)
+            # The thread owns freshness, serve whatever it last produced
+            if sky is not None:
+                return sky
+
+        if sky is not None and time.monotonic() - AstroEngine._sky_at < interval:
+            return sky
+        with AstroEngine._sky_lock:
+            # Another request may have refreshed it while we waited
+            if AstroEngine._sky is None or time.monotonic() - AstroEngine._sky_at >= interval:
+                self._refresh_sky()
+            return AstroEngine._sky
+
+    def _refresh_sky(self):
+        sky = self.compute_sky(self.ts.now())
+        AstroEngine._sky = sky
+        AstroEngine._sky_at = time.monotonic()
+
+    def _start_sky_refresher(self, interval):
+        if AstroEngine._sky_thread is not None:
+            return
+        with AstroEngine._sky_lock:
+            if AstroEngine._sky_thread is not None:
+                return
+
+            def run():
+                while True:
+                    try:
+                        with AstroEngine._sky_lock:
+                            self._refresh_sky()
+                    except Exception as e:
+                        print(f"Current sky refresh failed: {e}")
+                    time.sleep(interval)
+
+            AstroEngine._sky_thread = threading.Thread(target=run, name='current-sky', daemon=True)
+            AstroEngine._sky_thread.start()
+
+    def current_heavy_positions(self):
+        """Jupiter/Saturn longitudes (ecliptic of date) from the shared current_sky()."""
+        bodies = self.current_sky()['bodies']
+        return {name: bodies[name]['lon'] for name in ('Jupiter', 'Saturn')}
+
     def calculate_career(self, natal_data):
         """
         Generates a detailed career analysis based on MC (10th House), Saturn, and North Node.
@@ -589,8 +1103,8 @@ class AstroEngine:
                  # Fallback
                  data_path = os.path.join(os.path.dirname(__file__), '../../data/career_interpretations.json')
 
-            with open(data_path, 'r', encoding='utf-8') as f:
-                career_db = json.load(f)
+            # Parsed once, re-read only if the file changes (shared, read-only)
+            career_db = json_files.get(data_path)
 
             # 1. Identify Key Indicators
             # MC (Midheaven) - logic: Use 10th House Sign
@@ -628,14 +1142,9 @@ class AstroEngine:
             
             # 1. Get Current Date Transits
             now = datetime.now()
-            t_now = self.ts.now()
             
-            # 2. Get Positions of Transit Jupiter & Saturn
-            planets_map = {
-                'Jupiter': self.eph['jupiter barycenter'],
-                'Saturn': self.eph['saturn barycenter']
-            }
-            earth = self.eph['earth']
+            # 2. Get Positions of Transit Jupiter & Saturn (shared snapshot, they barely move in a day)
+            transit_lons = self.current_heavy_positions()
             
             transit_impacts = []
             
@@ -648,11 +1157,7 @@ class AstroEngine:
             natal_saturn_lon = saturn['lon'] if saturn else 0
             
             # Check Transits
-            for p_name, p_body in planets_map.items():
-                astrometric = earth.at(t_now).observe(p_body)
-                _, lon, _ = astrometric.apparent().frame_latlon(ecliptic_frame)
-                t_lon = lon.degrees
-                
+            for p_name, t_lon in transit_lons.items():
                 # Check Aspect to Natal MC (Career Point)
                 diff_mc = abs(t_lon - mc_lon) % 360
                 if diff_mc > 180: diff_mc = 360 - diff_mc
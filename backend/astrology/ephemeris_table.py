@@ -0,0 +1,112 @@
+"""
+Precomputed ephemeris table (built by `manage.py build_ephemeris_table`).
+
+Stores apparent geocentric ecliptic longitudes (J2000 ecliptic, same frame as
+AstroEngine.calculate_positions) and daily speeds for every body in BODY_NAMES.
+Files are opened with np.load(mmap_mode='r'), so all gunicorn workers share
+the same pages through the OS page cache.
+
+Layout of the table directory:
+    planets.npy  float32 (n_rows, n_bodies, 2) -> [lon deg, speed deg/day], fixed step
+    moon.npy     float32 (n_rows, 2)           -> Moon only, at a finer step
+    meta.json    start_jd (TT), steps, body order
+
+Positions between rows use cubic Hermite interpolation on (lon, speed), which
+stays well under 0.01 deg for every body at the default steps (1 d / 0.25 d).
+"""
+import json
+import os
+import threading
+import numpy as np
+from django.conf import settings
+
+PLANETS_FILE = 'planets.npy'
+MOON_FILE = 'moon.npy'
+META_FILE = 'meta.json'
+
+
+def default_table_dir():
+    return getattr(settings, 'EPHEMERIS_TABLE_DIR', os.path.join(settings.BASE_DIR, 'data', 'ephemeris'))
+
+
+def _hermite(lon0, lon1, v0, v1, u, step):
+    """Cubic Hermite between two (lon, speed) samples. u in [0, 1], step in days."""
+    # Unwrap across 0/360 so 359 -> 1 interpolates through 0
+    lon1 = lon0 + ((lon1 - lon0 + 180.0) % 360.0 - 180.0)
+    m0 = v0 * step
+    m1 = v1 * step
+    u2 = u * u
+    u3 = u2 * u
+
+    lon = ((2 * u3 - 3 * u2 + 1) * lon0 + (u3 - 2 * u2 + u) * m0
+           + (-2 * u3 + 3 * u2) * lon1 + (u3 - u2) * m1)
+    speed = ((6 * u2 - 6 * u) * lon0 + (3 * u2 - 4 * u + 1) * m0
+             + (-6 * u2 + 6 * u) * lon1 + (3 * u2 - 2 * u) * m1) / step
+    return lon % 360.0, speed
+
+
+class EphemerisTable:
+    def __init__(self, path):
+        with open(os.path.join(path, META_FILE), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+
+        self.path = path
+        self.bodies = meta['bodies']
+        self.start_jd = meta['start_jd']
+        self.step = meta['step']
+        self.moon_step = meta['moon_step']
+        self.planets = np.load(os.path.join(path, PLANETS_FILE), mmap_mode='r')
+        self.moon = np.load(os.path.join(path, MOON_FILE), mmap_mode='r')
+        self.moon_idx = self.bodies.index('Moon')
+        # Last usable instant: interpolation needs the next row too
+        self.end_jd = self.start_jd + (len(self.planets) - 1) * self.step
+
+    def covers(self, jd_tt):
+        jd_tt = np.asarray(jd_tt)
+        return bool(np.all((jd_tt >= self.start_jd) & (jd_tt < self.end_jd)))
+
+    def _lookup(self, rows, jd_tt, step):
+        x = (jd_tt - self.start_jd) / step
+        i = np.floor(x).astype(int)
+        u = x - i
+        a = np.asarray(rows[i], dtype=float)
+        b = np.asarray(rows[i + 1], dtype=float)
+        return a, b, u
+
+    def positions(self, jd_tt):
+        """
+        Interpolated (lon, speed) for all bodies at TT Julian date(s).
+        Shapes: (n_bodies,) for a scalar jd, (n_bodies, n_times) for an array.
+        """
+        scalar = np.ndim(jd_tt) == 0
+        jd_tt = np.atleast_1d(np.asarray(jd_tt, dtype=float))
+
+        a, b, u = self._lookup(self.planets, jd_tt, self.step)
+        # a/b: (n_times, n_bodies, 2) -> interpolate every body at once
+        lon, speed = _hermite(a[..., 0], b[..., 0], a[..., 1], b[..., 1], u[:, None], self.step)
+
+        ma, mb, mu = self._lookup(self.moon, jd_tt, self.moon_step)
+        lon[:, self.moon_idx], speed[:, self.moon_idx] = _hermite(
+            ma[:, 0], mb[:, 0], ma[:, 1], mb[:, 1], mu, self.moon_step)
+
+        lon, speed = lon.T, speed.T
+        if scalar:
+            return lon[:, 0], speed[:, 0]
+        return lon, speed
+
+
+_table = None
+_table_lock = threading.Lock()
+
+
+def get_table():
+    """Process-wide table, or None when it has not been built."""
+    global _table
+    if _table is None:
+        with _table_lock:
+            if _table is None:
+                path = default_table_dir()
+                if not os.path.exists(os.path.join(path, META_FILE)):
+                    return None
+                _table = EphemerisTable(path)
+    return _table
@@ -0,0 +1,294 @@
+"""
+In-memory geonames index for the place pickers.
+
+geonamescache parses its ~34k city JSON on every GeonamesCache() call, so the
+country/province/city endpoints build everything once per process instead:
+  - countries:  [{'code', 'name'}] sorted by name
+  - provinces:  country -> ((admin1 code, name), ...) sorted by name
+  - cities:     (country, admin1) -> city tuples, by population and by name
+                (country, None)   -> the whole country
+
+  - places:     geonames cities + TR_DATA districts for the search box, with a
+                sorted list of accent-folded names for prefix lookups and a
+                1-degree lat/lon grid for nearest-place lookups
+
+City tuples are (name, lat, lon, population) to keep the index compact. Place
+tuples add (country code, province name).
+"""
+import heapq
+import math
+import threading
+import unicodedata
+from bisect import bisect_left
+import geonamescache
+from django.conf import settings
+
+from .turkey_data import PROVINCE_NAMES, TR_DATA
+
+NAME, LAT, LON, POP, COUNTRY, PROVINCE = range(6)
+
+# Prefixes up to this length match thousands of names, so their top results
+# are computed once at build time. Longer ones are a short bisect range.
+SEARCH_PREFIX_CACHE = 3
+SEARCH_MAX_RESULTS = 20
+
+# Curated district and geonames city closer than this (degrees) are the same place
+TR_MERGE_DISTANCE = 0.3
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = EARTH_RADIUS_KM * math.pi / 180.0
+# Nearest-place search radius starts here and grows x4 until something is found
+NEAREST_START_KM = 50.0
+
+# Letters NFKD does not decompose. Dotless/dotted i all fold to "i" so
+# "istanbul", "Istanbul" and "İstanbul" (and "igdir" / "Iğdır") match.
+_FOLD_TABLE = str.maketrans({
+    'ı': 'i', 'İ': 'i', 'ł': 'l', 'Ł': 'l', 'ø': 'o', 'Ø': 'o', 'đ': 'd', 'Đ': 'd',
+    'ß': 'ss', 'æ': 'ae', 'Æ': 'ae', 'œ': 'oe', 'Œ': 'oe', '-': ' ', "'": ' ', '’': ' ',
+})
+
+
+def fold(text):
+    """Lowercase, accent-free, single-spaced form used for search keys and queries."""
+    text = unicodedata.normalize('NFKD', text.translate(_FOLD_TABLE))
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return ' '.join(text.casefold().split())
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dlat, dlon = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dlat / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _lon_cell(lon):
+    # Wrap into -180..179 so the antimeridian neighbours share an index space
+    return (math.floor(lon) + 180) % 360 - 180
+
+
+def city_dict(c):
+    return {'name': c[NAME], 'lat': c[LAT], 'lon': c[LON], 'pop': c[POP]}
+
+
+class GeoIndex:
+    def __init__(self):
+        gc = geonamescache.GeonamesCache()
+
+        self.countries = sorted(
+            ({'code': code, 'name': details['name']} for code, details in gc.get_countries().items()),
+            key=lambda x: x['name'])
+
+        groups = {}
+        for c in gc.get_cities().values():
+            city = (c['name'], c['latitude'], c['longitude'], c.get('population', 0))
+            admin = c.get('admin1code', '')
+            groups.setdefault((c['countrycode'], admin), []).append(city)
+            groups.setdefault((c['countrycode'], None), []).append(city)
+
+        self._by_name = {}
+        self._by_pop = {}
+        for key, cities in groups.items():
+            self._by_name[key] = tuple(sorted(cities, key=lambda x: x[NAME]))
+            self._by_pop[key] = tuple(sorted(cities, key=lambda x: x[POP], reverse=True))
+
+        # Province name = its most populated city (no admin1 names in geonamescache)
+        provinces = {}
+        admin_names = {}
+        for (country, admin), cities in self._by_pop.items():
+            if admin:
+                provinces.setdefault(country, []).append((admin, cities[0][NAME]))
+                admin_names[(country, admin)] = cities[0][NAME]
+        provinces['TR'] = list(PROVINCE_NAMES.items()) # Official names
+        self.provinces = {
+            country: tuple(sorted(items, key=lambda x: x[1])) for country, items in provinces.items()
+        }
+
+        self.country_names = {c['code']: c['name'] for c in self.countries}
+        self._build_places(gc.get_cities().values(), admin_names)
+        self._build_search()
+        self._build_grid()
+
+    def _build_places(self, geonames_cities, admin_names):
+        """
+        One list for search/lookup: geonames cities plus the curated TR districts.
+        A district takes over the geonames city it duplicates (same folded name,
+        within TR_MERGE_DISTANCE) along with its population, which TR_DATA lacks.
+        TR_DATA plate codes are not geonames admin1 codes, so provinces are
+        stored by name.
+        """
+        tr_cities = {}
+        places = []
+        for c in geonames_cities:
+            country, admin = c['countrycode'], c.get('admin1code', '')
+            place = (c['name'], c['latitude'], c['longitude'], c.get('population', 0),
+                     country, admin_names.get((country, admin), ''))
+            if country == 'TR':
+                tr_cities.setdefault(fold(c['name']), []).append(place)
+            else:
+                places.append(place)
+
+        merged = set()
+        for code, province in TR_DATA.items():
+            for d in province['districts']:
+                # "Merkez" is the provincial capital itself
+                name = province['name'] if d['name'] == 'Merkez' else d['name']
+                pop = 0
+                for city in tr_cities.get(fold(name), ()):
+                    if (abs(city[LAT] - d['lat']) < TR_MERGE_DISTANCE and
+                            abs(city[LON] - d['lon']) < TR_MERGE_DISTANCE):
+                        pop = max(pop, city[POP])
+                        merged.add(city)
+                places.append((name, d['lat'], d['lon'], pop, 'TR', province['name']))
+
+        for cities in tr_cities.values():
+            places.extend(c for c in cities if c not in merged)
+        self.places = places
+
+    def _build_search(self):
+        # Every word start is a key: "york" finds "New York City"
+        keys = []
+        for i, place in enumerate(self.places):
+            words = fold(place[NAME]).split()
+            for w in range(len(words)):
+                keys.append((' '.join(words[w:]), i))
+        keys.sort()
+        self._search_keys = [k for k, _ in keys]
+        self._search_ids = [i for _, i in keys]
+
+        # Global rank: most populated first, then by name
+        order = sorted(range(len(self.places)), key=lambda i: (-self.places[i][POP], self.places[i][NAME]))
+        self._rank = [0] * len(order)
+        for rank, i in enumerate(order):
+            self._rank[i] = rank
+
+        self._top = {}
+        for length in range(1, SEARCH_PREFIX_CACHE + 1):
+            start = 0
+            while start < len(keys):
+                prefix = self._search_keys[start][:length]
+                if len(prefix) < length:
+                    start += 1
+                    continue
+                end = bisect_left(self._search_keys, prefix + '\uffff', start)
+                self._top[prefix] = self._best(start, end, SEARCH_MAX_RESULTS)
+                start = end
+
+    def _best(self, start, end, limit):
+        ids = set(self._search_ids[start:end])
+        return tuple(heapq.nsmallest(limit, ids, key=self._rank.__getitem__))
+
+    def search(self, query, limit=10):
+        """Place tuples whose name (or a later word of it) starts with query, by population."""
+        q = fold(query)
+        limit = min(limit, SEARCH_MAX_RESULTS)
+        if not q or limit <= 0:
+            return []
+        if len(q) <= SEARCH_PREFIX_CACHE:
+            ids = self._top.get(q, ())[:limit]
+        else:
+            start = bisect_left(self._search_keys, q)
+            end = bisect_left(self._search_keys, q + '\uffff', start)
+            ids = self._best(start, end, limit)
+        return [self.places[i] for i in ids]
+
+    def _build_grid(self):
+        self._grid = {}
+        for i, place in enumerate(self.places):
+            cell = (math.floor(place[LAT]), _lon_cell(place[LON]))
+            self._grid.setdefault(cell, []).append(i)
+
+    def _scan(self, lat, lon, radius_km):
+        """Closest place among the cells that can hold anything within radius_km."""
+        dlat = radius_km / KM_PER_DEGREE
+        rows = range(math.floor(max(-90.0, lat - dlat)), math.floor(min(90.0, lat + dlat)) + 1)
+        # Degrees of longitude shrink towards the poles, widen the band accordingly
+        cos_edge = math.cos(math.radians(min(90.0, abs(lat) + dlat)))
+        dlon = radius_km / (KM_PER_DEGREE * cos_edge) if cos_edge > 1e-9 else 360.0
+        if dlon >= 180.0:
+            cols = range(-180, 180)
+        else:
+            cols = {_lon_cell(x) for x in range(math.floor(lon - dlon), math.floor(lon + dlon) + 1)}
+
+        best, best_km = None, None
+        for row in rows:
+            for col in cols:
+                for i in self._grid.get((row, col), ()):
+                    place = self.places[i]
+                    km = haversine_km(lat, lon, place[LAT], place[LON])
+                    if best_km is None or km < best_km:
+                        best, best_km = place, km
+        return best, best_km
+
+    def nearest(self, lat, lon, max_km=None):
+        """
+        (place tuple, distance in km) closest to lat/lon, or (None, None) when
+        nothing is within max_km. Widens the searched grid window until the
+        best hit is inside it, so the answer is exact.
+        """
+        limit = max_km if max_km is not None else math.pi * EARTH_RADIUS_KM
+        radius = min(NEAREST_START_KM, limit)
+        while True:
+            place, km = self._scan(lat, lon, radius)
+            if place is not None and km <= radius:
+                return (place, km) if km <= limit else (None, None)
+            if radius >= limit:
+                return None, None
+            radius = min(radius * 4, limit)
+
+    def place_label(self, p):
+        # Only the TR provinces are real names; elsewhere they are the admin area's biggest city
+        parts = [p[NAME]]
+        if p[COUNTRY] == 'TR' and p[PROVINCE] and p[PROVINCE] != p[NAME]:
+            parts.append(p[PROVINCE])
+        parts.append(self.country_names.get(p[COUNTRY], p[COUNTRY]))
+        return ', '.join(parts)
+
+    def place_dict(self, p):
+        return {
+            'name': p[NAME], 'province': p[PROVINCE], 'country': p[COUNTRY],
+            'country_name': self.country_names.get(p[COUNTRY], p[COUNTRY]),
+            'lat': p[LAT], 'lon': p[LON], 'pop': p[POP]
+        }
+
+    def cities(self, country, admin=None, limit=None, min_pop=0):
+        """
+        City tuples sorted by name. With limit, the `limit` most populated ones
+        (still returned in name order); min_pop drops smaller places.
+        """
+        key = (country, admin or None)
+        if limit is None:
+            cities = self._by_name.get(key, ())
+            if min_pop:
+                cities = [c for c in cities if c[POP] >= min_pop]
+            return list(cities)
+
+        top = []
+        for c in self._by_pop.get(key, ()):
+            if len(top) == limit or c[POP] < min_pop:
+                break
+            top.append(c)
+        top.sort(key=lambda x: x[NAME])
+        return top
+
+    def province_list(self, country):
+        return [{'code': code, 'name': name} for code, name in self.provinces.get(country, ())]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_geo_index():
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = GeoIndex()
+    return _index
+
+
+def preload():
+    """Called from wsgi.py/asgi.py so the first request does not pay for the build."""
+    if getattr(settings, 'GEO_INDEX_PRELOAD', True):
+        get_geo_index()
@@ -0,0 +1,74 @@
+"""
+HyperLogLog distinct counter for the unique-visitor stats.
+
+One sketch per day is stored as a blob of 2**p one-byte registers
+(p=12 -> 4 KB). Sketches of different days merge with a register-wise max, so a
+date range costs one pass over a few KB per day instead of a DISTINCT over the
+log table.
+
+Error: standard error is 1.04 / sqrt(2**p), so about 1.6% at p=12. Results are
+within ~3.3% about 95% of the time. Below ~2.5 * 2**p (10k) distinct values the
+linear-counting correction applies and small counts are close to exact.
+"""
+import hashlib
+import numpy as np
+
+DEFAULT_PRECISION = 12
+
+
+def _hash64(value):
+    digest = hashlib.blake2b(str(value).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+
+class HyperLogLog:
+    def __init__(self, p=DEFAULT_PRECISION, registers=None):
+        self.p = p
+        self.m = 1 << p
+        if registers is None:
+            self.registers = bytearray(self.m)
+        else:
+            if len(registers) != self.m:
+                raise ValueError(f"Expected {self.m} registers for p={p}, got {len(registers)}")
+            self.registers = bytearray(registers)
+
+    @classmethod
+    def from_bytes(cls, data):
+        # Precision is implied by the blob size
+        p = len(data).bit_length() - 1
+        return cls(p=p, registers=data)
+
+    def to_bytes(self):
+        return bytes(self.registers)
+
+    def add(self, value):
+        x = _hash64(value)
+        idx = x >> (64 - self.p)
+        rest = x & ((1 << (64 - self.p)) - 1)
+        # Position of the first 1 bit in the remaining 64-p bits
+        rank = (64 - self.p) - rest.bit_length() + 1
+        if rank > self.registers[idx]:
+            self.registers[idx] = rank
+
+    def update(self, values):
+        for value in values:
+            self.add(value)
+
+    def merge(self, other):
+        if other.p != self.p:
+            raise ValueError("Cannot merge sketches of different precision")
+        merged = np.maximum(np.frombuffer(self.registers, dtype=np.uint8),
+                            np.frombuffer(other.registers, dtype=np.uint8))
+        self.registers = bytearray(merged.tobytes())
+        return self
+
+    def count(self):
+        regs = np.frombuffer(self.registers, dtype=np.uint8)
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / float(np.sum(np.ldexp(1.0, -regs.astype(np.int64))))
+        zeros = int(np.count_nonzero(regs == 0))
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting for small cardinalities
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
@@ -0,0 +1,132 @@
+# Natal / Draconic interpretation texts
+# Every (planet, sign) text is synthesized once at import: 11 planets x 12 signs x 2 languages
+# per chart type, so enriching a chart is a dict lookup instead of string formatting.
+
+# Planet archetypes
+ARCHETYPES = {
+    'en': {
+        'Sun': "The Sun represents your ego, core identity, and life force. It is the 'Hero' within you.",
+        'Moon': "The Moon governs your emotions, instincts, and the subconscious. It represents your inner world.",
+        'Mercury': "Mercury rules communication, intellect, and how you process information.",
+        'Venus': "Venus is the planet of love, beauty, values, and how you attract relationships.",
+        'Mars': "Mars represents your drive, action, passion, and how you assert yourself.",
+        'Jupiter': "Jupiter is the seeker of expansion, luck, philosophy, and abundance.",
+        'Saturn': "Saturn represents discipline, structure, karma, and life's hard lessons.",
+        'Uranus': "Uranus acts as the awakener, ruling innovation, rebellion, and sudden change.",
+        'Neptune': "Neptune involves dreams, intuition, illusion, and spiritual transcendence.",
+        'Pluto': "Pluto governs transformation, power, regeneration, and the cycle of rebirth.",
+        'North Node': "The North Node points to your karmic destiny and the qualities you must develop."
+    },
+    'tr': {
+        'Sun': "Güneş, egonuzu, temel kimliğinizi ve yaşam gücünüzü temsil eder. O, içinizdeki 'Kahraman'dır.",
+        'Moon': "Ay, duygularınızı, içgüdülerinizi ve bilinçaltınızı yönetir. İç dünyanızın aynasıdır.",
+        'Mercury': "Merkür, iletişimi, zekayı ve bilgiyi nasıl işlediğinizi yönetir.",
+        'Venus': "Venüs aşkın, güzelliğin, değerlerin ve ilişkileri nasıl çektiğinizin gezegenidir.",
+        'Mars': "Mars, dürtülerinizi, eylemlerinizi, tutkunuzu ve kendinizi nasıl ortaya koyduğunuzu temsil eder.",
+        'Jupiter': "Jüpiter, genişlemenin, şansın, felsefenin ve bolluğun arayıcısıdır.",
+        'Saturn': "Satürn, disiplini, yapıyı, karmayı ve hayatın zorlu derslerini temsil eder.",
+        'Uranus': "Uranüs, yeniliği, isyanı ve ani değişimleri yöneten uyanışçıdır.",
+        'Neptune': "Neptün hayalleri, sezgiyi, illüzyonu ve ruhsal aşkınlığı içerir.",
+        'Pluto': "Plüton, dönüşümü, gücü, yenilenmeyi ve yeniden doğuş döngüsünü yönetir.",
+        'North Node': "Kuzey Ay Düğümü, karmik kaderinizi ve bu hayatta geliştirmeniz gereken nitelikleri işaret eder."
+    }
+}
+
+SIGNS_MEANING = {
+    'en': {
+        'Aries': "In Aries, this energy is expressed impulsively, dynamically, and with great courage. You take initiative and lead with fire.",
+        'Taurus': "In Taurus, this energy is grounded, seeking stability, comfort, and tangible results. You move with deliberate patience.",
+        'Gemini': "In Gemini, this energy manifests through curiosity, adaptability, and social connection. You thrive on variety and intellect.",
+        'Cancer': "In Cancer, this energy is filtered through deep emotion, protection, and nurturing sensitivity. You value security above all.",
+        'Leo': "In Leo, this energy shines dramatically. You express it with warmth, creativity, and a need for recognition or applause.",
+        'Virgo': "In Virgo, this energy is analytical and service-oriented. You seek perfection, order, and practical utility in this area.",
+        'Libra': "In Libra, this energy seeks balance, harmony, and relationship. You express it through diplomacy and an aesthetic eye.",
+        'Scorpio': "In Scorpio, this energy is intense, magnetic, and transformative. You seek depth and are not afraid of the shadows.",
+        'Sagittarius': "In Sagittarius, this energy is adventurous and philosophical. You express it through a quest for truth and freedom.",
+        'Capricorn': "In Capricorn, this energy is disciplined and ambitious. You express it through hard work, structure, and long-term goals.",
+        'Aquarius': "In Aquarius, this energy is unconventional and innovative. You express it through rebellion against the norm and humanitarian ideals.",
+        'Pisces': "In Pisces, this energy is compassionate and mystical. You express it through boundaries mental expansion and spiritual connection."
+    },
+    'tr': {
+        'Aries': "Koç burcunda bu enerji dürtüsel, dinamik ve büyük bir cesaretle ifade edilir. İnisiyatif alır ve ateşle liderlik edersiniz.",
+        'Taurus': "Boğa burcunda bu enerji topraklanmıştır; istikrar, konfor ve somut sonuçlar arar. Kasıtlı bir sabırla hareket edersiniz.",
+        'Gemini': "İkizler burcunda bu enerji merak, uyum yeteneği ve sosyal bağlantı yoluyla tezahür eder. Çeşitlilik ve zeka ile beslenirsiniz.",
+        'Cancer': "Yengeç burcunda bu enerji derin duygu, koruma ve besleyici hassasiyetle filtrelenir. Güvenliğe her şeyden çok değer verirsiniz.",
+        'Leo': "Aslan burcunda bu enerji dramatik bir şekilde parlar. Onu sıcaklık, yaratıcılık ve takdir edilme ihtiyacıyla ifade edersiniz.",
+        'Virgo': "Başak burcunda bu enerji analitik ve hizmet odaklıdır. Bu alanda mükemmellik, düzen ve pratik yarar ararsınız.",
+        'Libra': "Terazi burcunda bu enerji denge, uyum ve ilişki arar. Onu diplomasi ve estetik bir gözle ifade edersiniz.",
+        'Scorpio': "Akrep burcunda bu enerji yoğun, manyetik ve dönüştürücüdür. Derinlik ararsınız ve gölgelerden korkmazsınız.",
+        'Sagittarius': "Yay burcunda bu enerji maceracı ve felsefidir. Onu hakikat ve özgürlük arayışıyla ifade edersiniz.",
+        'Capricorn': "Oğlak burcunda bu enerji disiplinli ve hırslıdır. Onu çok çalışmak, yapı kurmak ve uzun vadeli hedeflerle ifade edersiniz.",
+        'Aquarius': "Kova burcunda bu enerji gelenek dışı ve yenilikçidir. Onu norma isyan ve insani ideallerle ifade edersiniz.",
+        'Pisces': "Balık burcunda bu enerji şefkatli ve mistiktir. Onu sınırsız zihinsel genişleme ve ruhsal bağlantı ile ifade edersiniz."
+    }
+}
+
+# Sign Translations for Synthesis
+SIGN_NAMES_TR = {
+    'Aries': 'Koç', 'Taurus': 'Boğa', 'Gemini': 'İkizler', 'Cancer': 'Yengeç',
+    'Leo': 'Aslan', 'Virgo': 'Başak', 'Libra': 'Terazi', 'Scorpio': 'Akrep',
+    'Sagittarius': 'Yay', 'Capricorn': 'Oğlak', 'Aquarius': 'Kova', 'Pisces': 'Balık'
+}
+
+# Lucky color / stone by Sun sign
+LUCKY_GEMS = {
+    'Aries': {'color': 'Red', 'stone': 'Ruby'}, 'Taurus': {'color': 'Green', 'stone': 'Emerald'},
+    'Gemini': {'color': 'Yellow', 'stone': 'Agate'}, 'Cancer': {'color': 'Silver', 'stone': 'Moonstone'},
+    'Leo': {'color': 'Gold', 'stone': 'Peridot'}, 'Virgo': {'color': 'Navy', 'stone': 'Sapphire'},
+    'Libra': {'color': 'Blue', 'stone': 'Opal'}, 'Scorpio': {'color': 'Black', 'stone': 'Topaz'},
+    'Sagittarius': {'color': 'Purple', 'stone': 'Turquoise'}, 'Capricorn': {'color': 'Brown', 'stone': 'Garnet'},
+    'Aquarius': {'color': 'Cyan', 'stone': 'Amethyst'}, 'Pisces': {'color': 'Sea Green', 'stone': 'Aquamarine'}
+}
+
+
+def _natal_texts(planet, sign):
+    # Generate English
+    base_en = ARCHETYPES['en'].get(planet, "")
+    mod_en = SIGNS_MEANING['en'].get(sign, "")
+    synth_en = f"{base_en} {mod_en} This placement suggests that this aspect of your personality is colored by the qualities of {sign}."
+
+    # Generate Turkish
+    base_tr = ARCHETYPES['tr'].get(planet, "")
+    mod_tr = SIGNS_MEANING['tr'].get(sign, "")
+    sign_tr = SIGN_NAMES_TR.get(sign, sign)
+    synth_tr = f"{base_tr} {mod_tr} Bu yerleşim, karakterinizin bu yönünün {sign_tr} burcunun özellikleriyle şekillendiğini gösterir."
+
+    return {'en': synth_en, 'tr': synth_tr}
+
+
+def _draconic_texts(planet, sign):
+    # English
+    base_en = ARCHETYPES['en'].get(planet, "")
+    mod_en = SIGNS_MEANING['en'].get(sign, "")
+    synth_en = f"In your Draconic Soul Chart: {base_en} {mod_en} This indicates your higher self's intent."
+
+    # Turkish
+    base_tr = ARCHETYPES['tr'].get(planet, "")
+    mod_tr = SIGNS_MEANING['tr'].get(sign, "")
+    synth_tr = f"Drakonik Ruh Haritanızda: {base_tr} {mod_tr} Bu, yüksek benliğinizin niyetini gösterir."
+
+    return {'en': synth_en, 'tr': synth_tr}
+
+
+NATAL_TEXTS = {
+    (planet, sign): _natal_texts(planet, sign)
+    for planet in ARCHETYPES['en'] for sign in SIGNS_MEANING['en']
+}
+DRACONIC_TEXTS = {
+    (planet, sign): _draconic_texts(planet, sign)
+    for planet in ARCHETYPES['en'] for sign in SIGNS_MEANING['en']
+}
+
+
+def natal_texts(planet, sign):
+    """{'en': ..., 'tr': ...} for a natal placement. Shared dict, do not modify."""
+    texts = NATAL_TEXTS.get((planet, sign))
+    return texts if texts is not None else _natal_texts(planet, sign)
+
+
+def draconic_texts(planet, sign):
+    """{'en': ..., 'tr': ...} for a draconic placement. Shared dict, do not modify."""
+    texts = DRACONIC_TEXTS.get((planet, sign))
+    return texts if texts is not None else _draconic_texts(planet, sign)
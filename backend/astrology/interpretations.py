@@ -0,0 +1,142 @@
+"""
+Process-wide in-memory copy of the interpretation tables.
+
+Both tables are small and read on every chart, so they are loaded once into
+dicts and served without touching the database:
+  - aspects: (sorted planet pair, aspect type) -> {'en': ..., 'tr': ...}
+  - planets: (planet, sign, house)             -> {'en': ..., 'tr': ...}  (house 0 = generic)
+
+Both dicts live in one (aspects, planets) snapshot tuple that is replaced as a
+whole, so readers never see a half-loaded or missing store.
+
+Invalidation: post_save/post_delete on either model (see signals.py) marks the
+local copy stale and bumps the one-row InterpretationVersion table. Every
+process compares against that row at most every INTERPRETATION_VERSION_CHECK
+seconds and reloads when it moved, so edits from the admin in one worker or
+from `manage.py import_data` reach all workers without a shared cache.
+"""
+import threading
+import time
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+VERSION_ROW = 1
+
+
+def _pair_key(p1, p2, aspect_type):
+    # "Sun Trine Moon" and "Moon Trine Sun" are the same row
+    a, b = sorted((p1, p2))
+    return (a, b, aspect_type)
+
+
+class InterpretationStore:
+    def __init__(self, check_interval=30):
+        self.check_interval = check_interval
+        self._snapshot = None # (aspects, planets)
+        self._stale = False
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def _shared_version(self):
+        from .models import InterpretationVersion
+
+        try:
+            return InterpretationVersion.objects.filter(pk=VERSION_ROW).values_list('version', flat=True).first() or 0
+        except Exception as e:
+            print(f"Interpretation version check failed: {e}")
+            return self._version
+
+    def _load(self):
+        from .models import PlanetInterpretation, AspectInterpretation
+
+        aspects = {}
+        # Same row the old filter(...).first() returned: lowest id wins
+        rows = AspectInterpretation.objects.order_by('id').values_list(
+            'planet_1', 'planet_2', 'aspect_type', 'text_en', 'text_tr')
+        for p1, p2, aspect_type, text_en, text_tr in rows:
+            aspects.setdefault(_pair_key(p1, p2, aspect_type), {'en': text_en, 'tr': text_tr})
+
+        planets = {}
+        rows = PlanetInterpretation.objects.values_list('planet', 'sign', 'house', 'text_en', 'text_tr')
+        for planet, sign, house, text_en, text_tr in rows:
+            planets[(planet, sign, house)] = {'en': text_en, 'tr': text_tr}
+
+        # One reference swap, readers see either the old or the new pair
+        self._snapshot = (aspects, planets)
+        self.loads += 1
+
+    def _current(self):
+        """The (aspects, planets) snapshot, reloaded first when stale."""
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return snapshot
+        with self._lock:
+            now = time.monotonic()
+            if self._snapshot is None or now - self._checked_at >= self.check_interval:
+                version = self._shared_version()
+                if self._snapshot is None or self._stale or version != self._version:
+                    self._load()
+                    self._stale = False
+                    self._version = version
+                self._checked_at = now
+            return self._snapshot
+
+    def aspect_texts(self, p1, p2, aspect_type):
+        """{'en': ..., 'tr': ...} for the pair in either order, or None."""
+        aspects, _ = self._current()
+        return aspects.get(_pair_key(p1, p2, aspect_type))
+
+    def planet_texts(self, planet, sign, house=0):
+        """House-specific text, falling back to the generic (house 0) one, or None."""
+        _, planets = self._current()
+        return planets.get((planet, sign, house)) or planets.get((planet, sign, 0))
+
+    def invalidate(self):
+        """Mark the local copy stale and tell the other workers to reload."""
+        with self._lock:
+            # Keep serving the old snapshot until the next read reloads it
+            self._stale = True
+            self._checked_at = 0.0
+        bump_version()
+
+    def stats(self):
+        aspects, planets = self._snapshot or ({}, {})
+        return {
+            'aspects': len(aspects),
+            'planets': len(planets),
+            'version': self._version,
+            'loads': self.loads
+        }
+
+
+def bump_version():
+    """+1 on the shared version row, creating it on the first change."""
+    from .models import InterpretationVersion
+
+    try:
+        if not InterpretationVersion.objects.filter(pk=VERSION_ROW).update(version=F('version') + 1):
+            try:
+                with transaction.atomic():
+                    InterpretationVersion.objects.create(pk=VERSION_ROW, version=1)
+            except IntegrityError:
+                # Another process created it in between
+                InterpretationVersion.objects.filter(pk=VERSION_ROW).update(version=F('version') + 1)
+    except Exception as e:
+        print(f"Interpretation version bump failed: {e}")
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_interpretation_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = InterpretationStore(
+                    check_interval=getattr(settings, 'INTERPRETATION_VERSION_CHECK', 30))
+    return _store
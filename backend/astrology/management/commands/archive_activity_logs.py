@@ -0,0 +1,153 @@
+from django.core.management.base import BaseCommand
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from astrology.models import UserActivityLog
+from astrology.activity_log import iter_log_chunks, log_record, timestamp_range, local_date
+from datetime import timedelta
+import glob
+import gzip
+import json
+import os
+import time
+
+DELETE_CHUNK = 500 # Stay under SQLite's bound-parameter limit
+
+
+def day_path(out_dir, day):
+    return os.path.join(out_dir, f"{day:%Y}", f"{day:%m}", f"activity-{day.isoformat()}.jsonl.gz")
+
+
+def part_paths(path):
+    """Batch part files of a day file, in write order."""
+    parts = [p for p in glob.glob(glob.escape(path) + '.part-*') if not p.endswith('.tmp')]
+    return sorted(parts, key=lambda p: int(p.rsplit('-', 1)[1]))
+
+
+def read_lines(path):
+    if os.path.exists(path):
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            yield from f
+
+
+def archived_ids(path):
+    """Ids already in a day file and its parts (rows a crashed run wrote but didn't delete)."""
+    ids = set()
+    for p in [path] + part_paths(path):
+        ids.update(json.loads(line)['id'] for line in read_lines(p))
+    return ids
+
+
+def write_part(path, n, records):
+    """One batch of a day as its own complete file (tmp + rename), fsynced before the rows are deleted."""
+    part = f"{path}.part-{n}"
+    with open(part + '.tmp', 'wb') as out:
+        with gzip.GzipFile(fileobj=out, mode='wb') as gz:
+            gz.write(''.join(json.dumps(r, ensure_ascii=False) + '\n' for r in records).encode('utf-8'))
+        out.flush()
+        os.fsync(out.fileno())
+    os.replace(part + '.tmp', part)
+
+
+def compact(path):
+    """
+    Folds the day's part files into the day file: one rewrite + rename per day
+    and run, instead of per batch. Ids seen earlier are dropped, so redoing it
+    after a crash (parts left behind, or removed only partly) is harmless.
+    """
+    parts = part_paths(path)
+    if not parts:
+        return
+    seen = set()
+    with open(path + '.tmp', 'wb') as out:
+        with gzip.GzipFile(fileobj=out, mode='wb') as gz:
+            for p in [path] + parts:
+                for line in read_lines(p):
+                    pk = json.loads(line)['id']
+                    if pk not in seen:
+                        seen.add(pk)
+                        gz.write(line.encode('utf-8'))
+        out.flush()
+        os.fsync(out.fileno())
+    os.replace(path + '.tmp', path)
+    for p in parts:
+        os.remove(p)
+
+
+def leftover_days(out_dir):
+    """Day files with part files from an interrupted run."""
+    paths = set()
+    for root, _, files in os.walk(out_dir):
+        for name in files:
+            if '.jsonl.gz.part-' in name and not name.endswith('.tmp'):
+                paths.add(os.path.join(root, name.split('.part-')[0]))
+    return sorted(paths)
+
+
+class Command(BaseCommand):
+    help = 'Moves UserActivityLog rows older than N days into gzipped JSON-lines files (one per day) and deletes them'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None,
+                            help='Keep this many days (default: settings.ACTIVITY_LOG_RETENTION_DAYS)')
+        parser.add_argument('--out', default=None, help='Archive directory (default: settings.ACTIVITY_LOG_ARCHIVE_DIR)')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Rows read, written and deleted per batch')
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would be archived')
+
+    def handle(self, *args, **options):
+        days = options['days'] if options['days'] is not None else getattr(settings, 'ACTIVITY_LOG_RETENTION_DAYS', 90)
+        out_dir = options['out'] or settings.ACTIVITY_LOG_ARCHIVE_DIR
+        # Whole days only, so each day's file is complete once written
+        cutoff_day = timezone.localdate() - timedelta(days=days)
+        cutoff, _ = timestamp_range(cutoff_day.isoformat())
+        old_logs = UserActivityLog.objects.filter(timestamp__lt=cutoff)
+
+        if options['dry_run']:
+            self.stdout.write(f"{old_logs.count()} rows before {cutoff_day} would be archived to {out_dir}")
+            return
+
+        started = time.time()
+        # Parts of a run that died: finish merging them before anything else
+        for path in leftover_days(out_dir):
+            compact(path)
+
+        archived = 0
+        skipped = 0
+        days_touched = {} # day -> (path, ids in the archive, parts written)
+        for rows in iter_log_chunks(old_logs, size=options['batch_size']):
+            by_day = {}
+            for row in rows:
+                by_day.setdefault(local_date(row['timestamp']), []).append(log_record(row))
+
+            # One part file per day and batch, merged into the day file at the end.
+            # Rows already archived are from a run that died before deleting them.
+            for day, records in by_day.items():
+                if day not in days_touched:
+                    path = day_path(out_dir, day)
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    days_touched[day] = [path, archived_ids(path), 0]
+                path, known, n = days_touched[day]
+                new_records = [r for r in records if r['id'] not in known]
+                skipped += len(records) - len(new_records)
+                if new_records:
+                    write_part(path, n, new_records)
+                    known.update(r['id'] for r in new_records)
+                    days_touched[day][2] = n + 1
+
+            # Delete only after the batch is safely on disk
+            ids = [row['id'] for row in rows]
+            with transaction.atomic():
+                for i in range(0, len(ids), DELETE_CHUNK):
+                    UserActivityLog.objects.filter(id__in=ids[i:i + DELETE_CHUNK]).delete()
+            archived += len(rows)
+            self.stdout.write(f"  {archived} rows archived...")
+
+        for path, _, _ in days_touched.values():
+            compact(path)
+
+        elapsed = time.time() - started
+        if skipped:
+            self.stdout.write(f"  {skipped} rows were already in the archive (interrupted run), not written again")
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {archived} rows from {len(days_touched)} days before {cutoff_day} "
+            f"to {out_dir} in {elapsed:.1f}s. Daily rollups are kept."))
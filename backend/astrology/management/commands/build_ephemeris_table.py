@@ -0,0 +1,101 @@
+from django.core.management.base import BaseCommand
+from astrology.engine import AstroEngine, BODY_NAMES, SPEED_DELTA
+from astrology.ephemeris_table import default_table_dir, PLANETS_FILE, MOON_FILE, META_FILE
+import numpy as np
+import json
+import os
+import time
+
+CHUNK = 2000
+
+
+def _wrap(diff):
+    return (diff + 180.0) % 360.0 - 180.0
+
+
+class Command(BaseCommand):
+    help = 'Precomputes ecliptic longitudes and daily speeds (DE421) into a memory-mapped .npy table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=int, default=1900, help='First year (DE421 starts mid 1899)')
+        parser.add_argument('--end', type=int, default=2050, help='Last year included (DE421 ends 2053)')
+        parser.add_argument('--step', type=float, default=1.0, help='Planet step in days')
+        parser.add_argument('--moon-step', type=float, default=0.25, help='Moon step in days')
+        parser.add_argument('--out', default=None, help='Output directory (default: settings.EPHEMERIS_TABLE_DIR)')
+
+    def handle(self, *args, **options):
+        engine = AstroEngine()
+        ts = engine.ts
+        out_dir = options['out'] or default_table_dir()
+        os.makedirs(out_dir, exist_ok=True)
+
+        start_jd = float(ts.utc(options['start'], 1, 1).tt)
+        end_jd = float(ts.utc(options['end'] + 1, 1, 1).tt)
+        step = options['step']
+        moon_step = options['moon_step']
+
+        started = time.time()
+        self.stdout.write(f"Sampling {len(BODY_NAMES)} bodies every {step} d, {options['start']}-{options['end']}...")
+        planets = self._sample(start_jd, end_jd, step, self._all_bodies(engine))
+
+        self.stdout.write(f"Sampling the Moon every {moon_step} d...")
+        moon_body = engine.eph['moon']
+        moon = self._sample(start_jd, end_jd, moon_step, self._single_body(engine, moon_body))[:, 0, :]
+
+        # Write next to the target and rename, so running workers keep their old mapping
+        for name, arr in ((PLANETS_FILE, planets), (MOON_FILE, moon)):
+            tmp = os.path.join(out_dir, name + '.tmp.npy')
+            np.save(tmp, arr.astype(np.float32))
+            os.replace(tmp, os.path.join(out_dir, name))
+
+        meta = {
+            'bodies': BODY_NAMES,
+            'start_jd': start_jd,
+            'step': step,
+            'moon_step': moon_step,
+            'frame': 'ecliptic J2000 (apparent, geocentric)',
+            'columns': ['lon_deg', 'speed_deg_per_day'],
+        }
+        with open(os.path.join(out_dir, META_FILE), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+
+        size_mb = (planets.size + moon.size) * 4 / 1e6
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {out_dir} ({size_mb:.1f} MB) in {time.time() - started:.1f}s"
+        ))
+
+    def _sample(self, start_jd, end_jd, step, evaluate):
+        # One extra row at the end so the last day can still be interpolated
+        n_rows = int(np.floor((end_jd - start_jd) / step)) + 2
+        jd_all = start_jd + np.arange(n_rows) * step
+        chunks = []
+        for i in range(0, n_rows, CHUNK):
+            chunks.append(evaluate(jd_all[i:i + CHUNK]))
+        return np.concatenate(chunks)
+
+    def _with_speed(self, ts, jd, lon_at):
+        """
+        lon_at(Time) -> (n_bodies, n) longitudes; returns (n, n_bodies, 2) [lon, speed].
+        Same central difference as calculate_positions(with_speed=True), for the
+        Moon-only rows where evaluating every body would be wasted work.
+        """
+        n = len(jd)
+        # t - d, t, t + d evaluated as one Time array
+        t = ts.tt_jd(np.concatenate([jd - SPEED_DELTA, jd, jd + SPEED_DELTA]))
+        lons = lon_at(t)
+        before, now, after = lons[:, :n], lons[:, n:2 * n], lons[:, 2 * n:]
+        speed = _wrap(after - before) / (2 * SPEED_DELTA)
+        return np.stack([now.T, speed.T], axis=-1)
+
+    def _all_bodies(self, engine):
+        def evaluate(jd):
+            # Rows 0 and 3: lon and speed -> (n, n_bodies, 2)
+            pos = engine.calculate_positions(engine.ts.tt_jd(jd), backend='jpl', with_speed=True)
+            return np.stack([pos[0].T, pos[3].T], axis=-1)
+        return evaluate
+
+    def _single_body(self, engine, body):
+        def lon_at(t):
+            _, lon, _ = engine._earth.at(t).observe(body).apparent().ecliptic_latlon()
+            return lon.degrees[None, :]
+        return lambda jd: self._with_speed(engine.ts, jd, lon_at)
@@ -0,0 +1,187 @@
+from django.core.management.base import BaseCommand, CommandError
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
+from datetime import datetime
+import csv
+import json
+import os
+import time
+
+# Per worker process, set by _init_worker
+_engine = None
+
+
+def _init_worker():
+    # Spawned workers start without Django; forked ones already have it (setup is idempotent)
+    import django
+    django.setup()
+    from astrology.engine import AstroEngine
+    global _engine
+    _engine = AstroEngine() # Ephemeris loaded once per worker
+
+
+def _compute_chunk(first_row, rows, backend, default_time=None):
+    """One chunk of CSV rows -> NDJSON lines, in row order."""
+    parsed = []
+    for row in rows:
+        try:
+            date_str = (row.get('date') or '').replace('-', '/')
+            # No invented birth time: an empty one is that row's error unless --default-time
+            time_str = row.get('time') or default_time
+            if not time_str:
+                raise ValueError("time is required (or pass --default-time)")
+            parsed.append((date_str, time_str, float(row['lat']), float(row['lon'])))
+        except (KeyError, TypeError, ValueError) as e:
+            parsed.append(e)
+
+    valid = [i for i, p in enumerate(parsed) if not isinstance(p, Exception)]
+    # Every row is a new chart: caching them would only cost memory and copies
+    charts = dict(zip(valid, _engine.calculate_natal_batch([parsed[i] for i in valid], backend=backend,
+                                                           use_cache=False)))
+
+    lines = []
+    errors = 0
+    for i, row in enumerate(rows):
+        result = charts.get(i, parsed[i])
+        record = {'row': first_row + i, 'id': row.get('id')}
+        if isinstance(result, Exception):
+            record['error'] = str(result)
+            errors += 1
+        else:
+            record['chart'] = result
+        lines.append(json.dumps(record, default=float))
+    return lines, errors
+
+
+class Command(BaseCommand):
+    help = 'Computes natal charts for a CSV (id,date,time,lat,lon) into NDJSON with a process pool, resumable'
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help='CSV with a header row: date (YYYY-MM-DD), time (HH:MM), lat, lon, optional id')
+        parser.add_argument('output', help='NDJSON output, one line per input row in input order')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Worker processes (default: all cores)')
+        parser.add_argument('--chunk-size', type=int, default=500, help='Rows per task (one vectorized batch)')
+        parser.add_argument('--default-time', default=None,
+                            help='HH:MM used for rows with an empty time (default: such rows are errors)')
+        parser.add_argument('--backend', default=None, help='Position backend (default: settings.EPHEMERIS_BACKEND)')
+        parser.add_argument('--checkpoint', default=None, help='Checkpoint file (default: <output>.checkpoint)')
+        parser.add_argument('--restart', action='store_true', help='Ignore an existing checkpoint and start over')
+
+    def handle(self, *args, **options):
+        checkpoint_path = options['checkpoint'] or options['output'] + '.checkpoint'
+        chunk_size = max(1, options['chunk_size'])
+        workers = max(1, options['workers'])
+
+        if options['default_time']:
+            try:
+                datetime.strptime(options['default_time'], '%H:%M')
+            except ValueError:
+                raise CommandError(f"--default-time must be HH:MM, got {options['default_time']!r}")
+        if not os.path.isfile(options['input']):
+            raise CommandError(f"Input {options['input']} does not exist")
+        # A checkpoint only fits the exact input file it was written for
+        st = os.stat(options['input'])
+        source = {'input': os.path.abspath(options['input']), 'input_size': st.st_size,
+                  'input_mtime_ns': st.st_mtime_ns}
+
+        state = dict(source, rows_done=0, output_bytes=0)
+        if not options['restart'] and os.path.exists(checkpoint_path):
+            with open(checkpoint_path, encoding='utf-8') as f:
+                saved = json.load(f)
+            changed = [key for key in source if saved.get(key) != source[key]]
+            if changed:
+                raise CommandError(
+                    f"Checkpoint {checkpoint_path} was written for a different input ({', '.join(changed)} differ), "
+                    f"use --restart to start over")
+            if saved['rows_done'] and (not os.path.exists(options['output'])
+                                       or os.path.getsize(options['output']) < saved['output_bytes']):
+                raise CommandError(
+                    f"Checkpoint {checkpoint_path} is after row {saved['rows_done']} but {options['output']} "
+                    f"is missing or shorter than checkpointed, use --restart to start over")
+            state = saved
+            self.stdout.write(f"Resuming after row {state['rows_done']} (checkpoint {checkpoint_path})")
+
+        with open(options['input'], newline='', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            missing = {'date', 'lat', 'lon'} - set(reader.fieldnames or ())
+            if missing:
+                raise CommandError(f"Input is missing columns: {', '.join(sorted(missing))}")
+            # Rows already in the output
+            for _ in islice(reader, state['rows_done']):
+                pass
+
+            with open(options['output'], 'r+b' if state['rows_done'] else 'wb') as out:
+                # Drop anything written after the last checkpoint (a chunk cut off mid-way)
+                out.truncate(state['output_bytes'])
+                out.seek(state['output_bytes'])
+                self._run(reader, out, state, checkpoint_path, chunk_size, workers,
+                          options['backend'], options['default_time'])
+
+        # Finished: a later run with the same paths starts fresh instead of resuming at EOF
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+
+    def _run(self, reader, out, state, checkpoint_path, chunk_size, workers, backend, default_time):
+        started = time.time()
+        start_rows = state['rows_done']
+        errors = 0
+        next_row = start_rows
+        next_chunk = 0 # next chunk index to write
+        submitted = 0
+        done = {} # chunk index -> (rows, lines, errors), finished out of order
+        in_flight = {}
+        last_report = started
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            exhausted = False
+            while True:
+                # Keep every worker busy without reading the whole file
+                while not exhausted and len(in_flight) < workers * 2:
+                    rows = list(islice(reader, chunk_size))
+                    if not rows:
+                        exhausted = True
+                        break
+                    future = pool.submit(_compute_chunk, next_row, rows, backend, default_time)
+                    in_flight[future] = (submitted, len(rows))
+                    submitted += 1
+                    next_row += len(rows)
+
+                if not in_flight:
+                    break
+
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    index, n_rows = in_flight.pop(future)
+                    lines, chunk_errors = future.result()
+                    done[index] = (n_rows, lines, chunk_errors)
+
+                # Write in input order, checkpoint after each chunk is on disk
+                while next_chunk in done:
+                    n_rows, lines, chunk_errors = done.pop(next_chunk)
+                    out.write(''.join(line + '\n' for line in lines).encode('utf-8'))
+                    out.flush()
+                    os.fsync(out.fileno())
+                    state['rows_done'] += n_rows
+                    state['output_bytes'] = out.tell()
+                    self._save_checkpoint(checkpoint_path, state)
+                    errors += chunk_errors
+                    next_chunk += 1
+
+                now = time.time()
+                if now - last_report >= 5:
+                    rate = (state['rows_done'] - start_rows) / (now - started)
+                    self.stdout.write(f"  {state['rows_done']} rows, {rate:.0f} rows/s")
+                    last_report = now
+
+        elapsed = time.time() - started
+        processed = state['rows_done'] - start_rows
+        rate = processed / elapsed if elapsed else 0.0
+        self.stdout.write(self.style.SUCCESS(
+            f"Done: {processed} rows ({errors} errors) in {elapsed:.1f}s with {workers} workers, "
+            f"{rate:.0f} rows/s. Total in output: {state['rows_done']}."))
+
+    def _save_checkpoint(self, path, state):
+        tmp = path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp, path)
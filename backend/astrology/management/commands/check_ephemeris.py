@@ -0,0 +1,64 @@
+from django.core.management.base import BaseCommand, CommandError
+from astrology.engine import AstroEngine, BODY_NAMES
+from astrology.analytic_ephemeris import ERROR_BUDGET_DEG
+from astrology.ephemeris_table import get_table
+import numpy as np
+
+# The table is plain interpolation of DE421, so it gets one tight budget for all bodies
+TABLE_BUDGET_DEG = 0.01
+
+
+def _wrap(diff):
+    return (diff + 180.0) % 360.0 - 180.0
+
+
+class Command(BaseCommand):
+    help = 'Compares a fast ephemeris backend (analytic/table) against DE421 and fails if it is over budget'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--backend', choices=['analytic', 'table'], default='analytic')
+        parser.add_argument('--samples', type=int, default=2000, help='Random instants to check')
+        parser.add_argument('--start', type=int, default=1900, help='First year')
+        parser.add_argument('--end', type=int, default=2050, help='Last year included')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        engine = AstroEngine()
+        ts = engine.ts
+        backend = options['backend']
+
+        if backend == 'table':
+            # calculate_positions silently falls back to jpl without a table, which would always "pass"
+            if get_table() is None:
+                raise CommandError("No ephemeris table found, run build_ephemeris_table first.")
+            budget = {name: TABLE_BUDGET_DEG for name in BODY_NAMES}
+        else:
+            budget = ERROR_BUDGET_DEG
+
+        start_jd = float(ts.utc(options['start'], 1, 1).tt)
+        end_jd = float(ts.utc(options['end'] + 1, 1, 1).tt)
+        rng = np.random.default_rng(options['seed'])
+        t = ts.tt_jd(np.sort(rng.uniform(start_jd, end_jd, options['samples'])))
+
+        if backend == 'table' and not get_table().covers(t.tt):
+            raise CommandError("The table does not cover the requested years.")
+
+        fast = engine.calculate_positions(t, backend=backend)[0]
+        ref = engine.calculate_positions(t, backend='jpl')[0]
+        err = np.abs(_wrap(fast - ref))
+
+        self.stdout.write(f"{backend} vs jpl, {options['samples']} instants, {options['start']}-{options['end']}")
+        self.stdout.write(f"{'Body':<10}{'max':>10}{'mean':>10}{'budget':>10}")
+        failed = []
+        for idx, name in enumerate(BODY_NAMES):
+            worst = err[idx].max()
+            line = f"{name:<10}{worst:>10.4f}{err[idx].mean():>10.4f}{budget[name]:>10.3f}"
+            if worst > budget[name]:
+                failed.append(name)
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+
+        if failed:
+            raise CommandError(f"Over the error budget: {', '.join(failed)}")
+        self.stdout.write(self.style.SUCCESS("All bodies within budget."))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from astrology.activity_log import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the DailyActivityRollup rows from UserActivityLog (all days or a date range)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First day, YYYY-MM-DD (default: oldest log)')
+        parser.add_argument('--end', help='Last day, YYYY-MM-DD (default: newest log)')
+
+    def handle(self, *args, **options):
+        # Needed once after migrating (old logs) and after changing superuser flags
+        rows = rebuild_rollups(options['start'], options['end'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} daily rollup rows."))
@@ -1,6 +1,6 @@
 
 import json
-from .models import UserActivityLog
+from .activity_log import get_activity_logger
 
 class ActivityMiddleware:
     def __init__(self, get_response):
@@ -55,9 +55,10 @@ class ActivityMiddleware:
         elif request.path.startswith('/api/'): should_log = True
         
         if should_log and not request.path.endswith('.js') and not request.path.endswith('.css'):
+            # Queued, written in batches by a background thread (activity_log.py)
             try:
-                UserActivityLog.objects.create(
-                    user=user,
+                get_activity_logger().log(
+                    user_id=user.pk if user else None,
                     action=action,
                     path=request.path,
                     method=request.method,
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:35
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def backfill_rollups(apps, schema_editor):
+    # Same as `manage.py rebuild_activity_rollups`, for the logs written so far
+    UserActivityLog = apps.get_model('astrology', 'UserActivityLog')
+    DailyActivityRollup = apps.get_model('astrology', 'DailyActivityRollup')
+    rows = (UserActivityLog.objects.exclude(user__is_superuser=True)
+            .annotate(day=TruncDate('timestamp')).values('day', 'action')
+            .annotate(n=Count('id')).order_by())
+    DailyActivityRollup.objects.bulk_create(
+        [DailyActivityRollup(date=r['day'], action=r['action'], count=r['n']) for r in rows],
+        batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('astrology', '0007_alter_useractivitylog_timestamp'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyActivityRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('action', models.CharField(max_length=255)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='useractivitylog',
+            index=models.Index(fields=['timestamp'], name='astrology_u_timesta_96f7ac_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='useractivitylog',
+            index=models.Index(fields=['action', 'timestamp'], name='astrology_u_action_b749fb_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='useractivitylog',
+            index=models.Index(fields=['user', 'timestamp'], name='astrology_u_user_id_074bea_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='dailyactivityrollup',
+            unique_together={('date', 'action')},
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:38
+
+import hashlib
+
+from django.db import migrations, models
+from django.db.models.functions import TruncDate
+
+# Frozen copy of astrology.hyperloglog's add/to_bytes (blake2b 64-bit hash, p=12),
+# so later changes to that module can't change what this migration writes
+HLL_P = 12
+
+
+def hll_add(registers, value):
+    x = int.from_bytes(hashlib.blake2b(str(value).encode('utf-8'), digest_size=8).digest(), 'big')
+    idx = x >> (64 - HLL_P)
+    rest = x & ((1 << (64 - HLL_P)) - 1)
+    rank = (64 - HLL_P) - rest.bit_length() + 1
+    if rank > registers[idx]:
+        registers[idx] = rank
+
+
+def backfill_sketches(apps, schema_editor):
+    # Same as `manage.py rebuild_activity_rollups`, for the logs written so far
+    UserActivityLog = apps.get_model('astrology', 'UserActivityLog')
+    DailyVisitorSketch = apps.get_model('astrology', 'DailyVisitorSketch')
+    sketches = {}
+    rows = (UserActivityLog.objects.exclude(user__is_superuser=True).exclude(ip_address__isnull=True)
+            .annotate(day=TruncDate('timestamp')).values_list('day', 'ip_address').distinct())
+    for day, ip in rows.iterator():
+        hll_add(sketches.setdefault(day, bytearray(1 << HLL_P)), ip)
+    DailyVisitorSketch.objects.bulk_create(
+        [DailyVisitorSketch(date=day, sketch=bytes(registers)) for day, registers in sketches.items()],
+        batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('astrology', '0008_activity_rollups_and_log_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyVisitorSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('sketch', models.BinaryField()),
+            ],
+        ),
+        migrations.RunPython(backfill_sketches, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 class PlanetInterpretation(models.Model):
     PLANETS = [
@@ -47,6 +48,16 @@ class AspectInterpretation(models.Model):
     def __str__(self):
         return f"{self.planet_1} {self.aspect_type} {self.planet_2}"
 
+class InterpretationVersion(models.Model):
+    """
+    Single row (pk=1) bumped on every interpretation change, so every process
+    (web workers, manage.py import_data) sees edits made by any other one.
+    """
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"Interpretations v{self.version}"
+
 class Celebrity(models.Model):
     name = models.CharField(max_length=100)
     birth_date = models.CharField(max_length=10, help_text="YYYY/MM/DD")
@@ -109,10 +120,48 @@ class UserActivityLog(models.Model):
     path = models.CharField(max_length=255)
     method = models.CharField(max_length=10)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Request time, set by the logger (rows are written later in batches)
+    timestamp = models.DateTimeField(default=timezone.now)
     
     # Optional: Additional meta data (e.g., duration on page, JSON details)
     details = models.JSONField(default=dict, blank=True)
 
+    class Meta:
+        # Dashboard range filters / per-action and per-user lookups
+        indexes = [
+            models.Index(fields=['timestamp']),
+            models.Index(fields=['action', 'timestamp']),
+            models.Index(fields=['user', 'timestamp']),
+        ]
+
     def __str__(self):
         return f"{self.user} - {self.action} - {self.timestamp}"
+
+
+class DailyActivityRollup(models.Model):
+    """
+    Request count per day (TIME_ZONE) and action, superusers excluded.
+    Kept up to date by the activity logger at every flush; rebuild with
+    `python manage.py rebuild_activity_rollups`.
+    """
+    date = models.DateField()
+    action = models.CharField(max_length=255)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('date', 'action')
+
+    def __str__(self):
+        return f"{self.date} - {self.action}: {self.count}"
+
+
+class DailyVisitorSketch(models.Model):
+    """
+    HyperLogLog sketch (astrology/hyperloglog.py) of the distinct IPs seen per
+    day, superusers excluded. Maintained with DailyActivityRollup.
+    """
+    date = models.DateField(unique=True)
+    sketch = models.BinaryField()
+
+    def __str__(self):
+        return f"{self.date} visitors sketch"
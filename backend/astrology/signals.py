@@ -0,0 +1,12 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import PlanetInterpretation, AspectInterpretation
+from .interpretations import get_interpretation_store
+
+
+@receiver([post_save, post_delete], sender=PlanetInterpretation)
+@receiver([post_save, post_delete], sender=AspectInterpretation)
+def invalidate_interpretations(sender, **kwargs):
+    # Admin edits / import_data -> every worker reloads its in-memory copy
+    get_interpretation_store().invalidate()
@@ -1,3 +1,1072 @@
-from django.test import TestCase
+from datetime import date, datetime, timedelta
+from io import StringIO
+import csv
+import gzip
+import importlib
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+import pytz
+from django.core.cache import caches
+from django.core.management import CommandError, call_command
+from django.contrib.auth.models import User
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from skyfield.api import load
+
+from .activity_log import EXPORT_COLUMNS, ActivityLogger, keyset_page
+from . import chart_cache
+from .chart_cache import ChartCache
+from .engine import RECTIFY_STEPS, AstroEngine
+from .geo_index import GeoIndex, fold, haversine_km
+from .hyperloglog import HyperLogLog
+from .interpretations import InterpretationStore
+from .models import AspectInterpretation, DailyActivityRollup, DailyVisitorSketch, InterpretationVersion, PlanetInterpretation, UserActivityLog
+from .views import calculate_charts, custom_admin_dashboard, custom_admin_export, get_cities, nearest_place, search_places
+from .timezones import get_zone_table, local_to_utc, naive_to_seconds
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def _pytz_utc(tz, dt):
+    # The policy AstroEngine.resolve_birth_instant applies with localize()
+    try:
+        local = tz.localize(dt, is_dst=None)
+    except pytz.AmbiguousTimeError:
+        local = tz.localize(dt, is_dst=False)
+    except pytz.NonExistentTimeError:
+        local = tz.localize(dt + timedelta(hours=1), is_dst=True)
+    return local.astimezone(pytz.utc).replace(tzinfo=None)
+
+
+class LocalToUtcTests(SimpleTestCase):
+    # Plain DST, 30-minute DST shift, southern hemisphere, zone that dropped DST
+    ZONES = ('Europe/Istanbul', 'America/New_York', 'Australia/Lord_Howe',
+             'America/Sao_Paulo', 'Asia/Tehran', 'Europe/London')
+
+    def _around_transitions(self, tz):
+        """Wall-clock times from 2 h before to 2 h after every transition 1970-2030."""
+        times = []
+        for utc_t in tz._utc_transition_times[1:]:
+            if not 1970 <= utc_t.year <= 2030:
+                continue
+            local = utc_t + tz.utcoffset(utc_t + timedelta(hours=12)) # Wall time on the new side
+            for minutes in range(-180, 181, 15):
+                times.append(local.replace(second=0, microsecond=0) + timedelta(minutes=minutes))
+        return times
+
+    def test_matches_pytz_localize_across_gaps_and_overlaps(self):
+        ts = load.timescale()
+        for name in self.ZONES:
+            tz = pytz.timezone(name)
+            times = self._around_transitions(tz)
+            self.assertTrue(times, name)
+
+            expected = np.array([(_pytz_utc(tz, dt) - EPOCH).total_seconds() for dt in times])
+            got = get_zone_table(name).to_utc_seconds(naive_to_seconds(times))
+            mismatches = [times[i] for i in np.nonzero(got != expected)[0]]
+            self.assertEqual(mismatches, [], name)
+
+            # Same instants through the Skyfield Time conversion
+            t = local_to_utc(ts, name, times)
+            ref = ts.utc([_pytz_utc(tz, dt).replace(tzinfo=pytz.utc) for dt in times])
+            self.assertLess(np.max(np.abs(t.tt - ref.tt)) * 86400.0, 1e-3, name)
+
+    def test_overlap_takes_standard_time(self):
+        # 2021-11-07 01:30 happens twice in New York: EDT (05:30 UTC) then EST (06:30 UTC)
+        tz = pytz.timezone('America/New_York')
+        dt = datetime(2021, 11, 7, 1, 30)
+        standard = tz.localize(dt, is_dst=False).astimezone(pytz.utc).replace(tzinfo=None)
+        summer = tz.localize(dt, is_dst=True).astimezone(pytz.utc).replace(tzinfo=None)
+        self.assertNotEqual(standard, summer)
+
+        got = get_zone_table('America/New_York').to_utc_seconds(naive_to_seconds([dt]))
+        self.assertEqual(got[0], (standard - EPOCH).total_seconds())
+
+    def test_gap_moves_forward_one_hour(self):
+        # 2021-03-14 02:30 does not exist in New York; localize(03:30, is_dst=True) -> 07:30 UTC
+        dt = datetime(2021, 3, 14, 2, 30)
+        got = get_zone_table('America/New_York').to_utc_seconds(naive_to_seconds([dt]))
+        self.assertEqual(got[0], (datetime(2021, 3, 14, 7, 30) - EPOCH).total_seconds())
+
+    def test_gap_longer_than_an_hour(self):
+        # Samoa skipped 2011-12-30 entirely
+        tz = pytz.timezone('Pacific/Apia')
+        times = [datetime(2011, 12, 30, h) for h in range(24)]
+        expected = [(_pytz_utc(tz, dt) - EPOCH).total_seconds() for dt in times]
+        got = get_zone_table('Pacific/Apia').to_utc_seconds(naive_to_seconds(times))
+        self.assertEqual(list(got), expected)
+
+
+@override_settings(EPHEMERIS_BACKEND='analytic')
+class RectifyBirthTimeTests(SimpleTestCase):
+    # Istanbul, three events; the analytic backend needs no DE421
+    ARGS = ('1990/05/15', 41.0082, 28.9784, [date(2010, 3, 1), date(2015, 7, 20), date(2020, 11, 5)])
+
+    def setUp(self):
+        # Bare instance with the builtin timescale, skips the ephemeris load in __new__
+        self.engine = object.__new__(AstroEngine)
+        self.engine._ts = load.timescale()
+
+    def test_pinned_candidates(self):
+        results = self.engine.rectify_birth_time(*self.ARGS, top=10, windows=12)
+        got = [(r['dt'], r['score'], round(r['orb'], 3), r['ascendant']) for r in results]
+        self.assertEqual(got, [
+            (datetime(1990, 5, 15, 17, 8, 50), 55, 16.12, 'Libra'),
+            (datetime(1990, 5, 15, 9, 48, 40), 53, 12.516, 'Cancer'),
+            (datetime(1990, 5, 15, 5, 10, 0), 50, 10.156, 'Taurus'),
+            (datetime(1990, 5, 15, 9, 31, 20), 47, 15.247, 'Cancer'),
+            # Equal scores: tighter orb first
+            (datetime(1990, 5, 15, 8, 18, 50), 38, 4.095, 'Cancer'),
+            (datetime(1990, 5, 15, 7, 29, 20), 38, 9.587, 'Gemini'),
+        ])
+        self.assertIn((1, 'Uranus', 'opp_asc'), results[0]['hits'])
+
+    def test_ordering_and_dedupe(self):
+        results = self.engine.rectify_birth_time(*self.ARGS, top=10, windows=12)
+        keys = [(-r['score'], r['orb']) for r in results]
+        self.assertEqual(keys, sorted(keys))
+
+        offsets = [(r['dt'] - datetime(1990, 5, 15)).total_seconds() for r in results]
+        for i, a in enumerate(offsets):
+            # Refined down to the last step
+            self.assertEqual(a % RECTIFY_STEPS[-1], 0)
+            for b in offsets[i + 1:]:
+                self.assertGreaterEqual(abs(a - b), RECTIFY_STEPS[0])
+
+        self.assertEqual(self.engine.rectify_birth_time(*self.ARGS, top=3, windows=12), results[:3])
+
+    def test_refinement_beats_coarse_grid(self):
+        date_str, lat, lon, events = self.ARGS
+        best = self.engine.rectify_birth_time(*self.ARGS)[0]
+
+        coarse = [datetime(1990, 5, 15) + timedelta(seconds=int(s)) for s in range(0, 86400, RECTIFY_STEPS[0])]
+        t, _ = self.engine.local_times_to_utc(coarse, lat, lon)
+        angles = self.engine.calculate_angles_light(t, lat, lon)
+        targets, _ = self.engine.rectification_targets(events, lat, lon)
+        score, orb, _ = self.engine._score_angles(angles['ascendant_deg'], angles['midheaven_deg'], targets.ravel())
+
+        top_score = score.max()
+        self.assertGreaterEqual(best['score'], top_score)
+        if best['score'] == top_score:
+            self.assertLessEqual(best['orb'], orb[score == top_score].min())
+
+    def test_no_events(self):
+        self.assertEqual(self.engine.rectify_birth_time('1990/05/15', 41.0, 29.0, []), [])
+
+
+@override_settings(EPHEMERIS_BACKEND='analytic', CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'charts': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'chart-cache-tests'},
+})
+class ChartCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.engine = object.__new__(AstroEngine)
+        self.engine._ts = load.timescale()
+        self.cache = self._use(ChartCache())
+        self.computed = 0
+        natal_at = self.engine._natal_at
+
+        def counting(*args):
+            self.computed += 1
+            return natal_at(*args)
+
+        self.engine._natal_at = counting
+        caches['charts'].clear()
+
+    def _use(self, cache):
+        patcher = mock.patch('astrology.engine.get_chart_cache', return_value=cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return cache
+
+    def _chart(self, lat=41.0082, lon=28.9784):
+        return self.engine.calculate_natal('1990/05/15', '10:30', lat, lon)
+
+    def test_l1_hit(self):
+        first = self._chart()
+        second = self._chart()
+        self.assertEqual(first, second)
+        self.assertEqual(self.computed, 1)
+        self.assertEqual(self.cache.l1.stats()['hits'], 1)
+
+        self.engine.calculate_natal('1990/05/15', '10:31', 41.0082, 28.9784)
+        self.assertEqual(self.computed, 2)
+
+    def test_returned_chart_is_a_private_copy(self):
+        chart = self._chart()
+        sun = chart['planets'][0]['lon']
+        chart['planets'][0]['lon'] = -1
+        chart['planets'].append({'name': 'Intruder'})
+        again = self._chart()
+        self.assertEqual(again['planets'][0]['lon'], sun)
+        self.assertNotIn('Intruder', [p['name'] for p in again['planets']])
+
+    def test_coordinates_rounded_before_keying(self):
+        self._chart(41.0082, 28.9784)
+        # Differs below the 6th decimal: same key, same chart
+        self._chart(41.00820004, 28.97839996)
+        self.assertEqual(self.computed, 1)
+        self._chart(41.0083, 28.9784)
+        self.assertEqual(self.computed, 2)
+
+        self.assertEqual(ChartCache(precision=2).round_coords('41.0082', 28.9784), (41.01, 28.98))
+
+    def test_l2_shared_between_workers(self):
+        self.cache.l2_alias = 'charts'
+        first = self._chart()
+        # Another worker: empty L1, same L2
+        other = self._use(ChartCache(l2_alias='charts'))
+        self.assertEqual(self._chart(), first)
+        self.assertEqual(self.computed, 1)
+        self.assertEqual((other.l2_hits, other.l2_misses), (1, 0))
+        # Promoted to L1: no second L2 read
+        self._chart()
+        self.assertEqual(other.l2_hits, 1)
+
+    def test_l2_failure_falls_back_to_computing(self):
+        self.cache.l2_alias = 'charts'
+        broken = mock.Mock(get=mock.Mock(side_effect=ConnectionError('down')),
+                           set=mock.Mock(side_effect=ConnectionError('down')))
+        with mock.patch.object(ChartCache, 'l2', new_callable=mock.PropertyMock, return_value=broken):
+            chart = self._chart()
+        self.assertEqual(chart['planets'][0]['name'], 'Sun')
+        self.assertEqual(self.cache.l2_errors, 2)
+
+    def test_key_version_bump_misses(self):
+        self.cache.l2_alias = 'charts'
+        self._chart()
+        self.cache.clear() # L1 only, the L2 entry stays
+        with mock.patch.object(chart_cache, 'KEY_VERSION', chart_cache.KEY_VERSION + 1):
+            self._chart()
+        # Old L2 entry ignored under the new version
+        self.assertEqual(self.computed, 2)
+        self.assertEqual((self.cache.l2_hits, self.cache.l2_misses), (0, 1))
+
+    def test_key_fields(self):
+        from datetime import timezone as dt_timezone
+        key = self.cache.key(datetime(1990, 5, 15, 7, 30, tzinfo=dt_timezone.utc), date(1990, 5, 15),
+                             41.0082, 28.9784, 'analytic')
+        self.assertEqual(key, f"natal:v{chart_cache.KEY_VERSION}:analytic:19900515T073000.000000:"
+                              f"1990-05-15:41.008200:28.978400")
+
+
+class KeysetPageTests(TestCase):
+    def setUp(self):
+        # 11 rows on 4 timestamps, so pages split inside runs of equal timestamps
+        base = timezone.now().replace(microsecond=0)
+        for i, minutes in enumerate([0, 0, 0, 1, 1, 2, 2, 2, 2, 3, 3]):
+            UserActivityLog.objects.create(action=f'a{i}', path='/', method='GET',
+                                           timestamp=base - timedelta(minutes=minutes))
+        self.newest_first = list(UserActivityLog.objects.order_by('-timestamp', '-id').values_list('id', flat=True))
+
+    def test_walk_forward(self):
+        qs = UserActivityLog.objects.all()
+        seen = []
+        rows, newer, older = keyset_page(qs, size=3)
+        self.assertIsNone(newer)
+        while True:
+            seen.extend(r.id for r in rows)
+            if older is None:
+                break
+            rows, newer, older = keyset_page(qs, size=3, after=older)
+            self.assertIsNotNone(newer)
+        self.assertEqual(seen, self.newest_first)
+
+    def test_oldest_then_walk_backward(self):
+        qs = UserActivityLog.objects.all()
+        rows, newer, older = keyset_page(qs, size=3, oldest=True)
+        self.assertIsNone(older)
+        self.assertEqual([r.id for r in rows], self.newest_first[-3:])
+
+        pages = [[r.id for r in rows]]
+        while newer is not None:
+            rows, newer, older = keyset_page(qs, size=3, before=newer)
+            self.assertIsNotNone(older)
+            pages.insert(0, [r.id for r in rows])
+        self.assertEqual([pk for page in pages for pk in page], self.newest_first)
+
+    def test_back_and_forth_returns_same_page(self):
+        qs = UserActivityLog.objects.all()
+        first, _, older = keyset_page(qs, size=4)
+        second, newer, _ = keyset_page(qs, size=4, after=older)
+        again, newer_again, _ = keyset_page(qs, size=4, before=newer)
+        self.assertEqual(again, first)
+        self.assertIsNone(newer_again)
+
+    def test_malformed_cursor_is_first_page(self):
+        qs = UserActivityLog.objects.all()
+        rows, newer, _ = keyset_page(qs, size=3, after='garbage')
+        self.assertEqual([r.id for r in rows], self.newest_first[:3])
+        self.assertIsNone(newer)
+
+
+class ArchiveActivityLogsTests(TestCase):
+    def setUp(self):
+        self.out = tempfile.TemporaryDirectory()
+        self.addCleanup(self.out.cleanup)
+        now = timezone.now()
+        self.old = [
+            UserActivityLog.objects.create(action='Old', path=f'/old/{i}', method='GET', ip_address='10.0.0.1',
+                                           details={'i': i}, timestamp=now - timedelta(days=120 + i % 2))
+            for i in range(7)
+        ]
+        self.recent = UserActivityLog.objects.create(action='Recent', path='/', method='GET', timestamp=now)
+
+    def _archived(self, parts=False):
+        records = []
+        for root, _, files in os.walk(self.out.name):
+            for name in files:
+                if not name.endswith('.jsonl.gz'):
+                    # Batch parts only exist while a run is unfinished
+                    self.assertTrue(parts and '.jsonl.gz.part-' in name, name)
+                with gzip.open(os.path.join(root, name), 'rt', encoding='utf-8') as f:
+                    records.extend(json.loads(line) for line in f)
+        return records
+
+    def _archive(self, **options):
+        call_command('archive_activity_logs', days=90, out=self.out.name, batch_size=3, stdout=StringIO(), **options)
+
+    def test_round_trip(self):
+        self._archive()
+
+        records = {r['id']: r for r in self._archived()}
+        self.assertEqual(sorted(records), sorted(log.id for log in self.old))
+        for log in self.old:
+            record = records[log.id]
+            self.assertEqual(record['path'], log.path)
+            self.assertEqual(record['details'], log.details)
+            self.assertEqual(record['ip_address'], '10.0.0.1')
+            self.assertEqual(datetime.fromisoformat(record['timestamp']), log.timestamp)
+
+        # Archived rows are gone, newer ones stay
+        self.assertEqual(list(UserActivityLog.objects.values_list('id', flat=True)), [self.recent.id])
+
+        # Nothing left to archive on a second run
+        self._archive()
+        self.assertEqual(len(self._archived()), len(self.old))
+
+    def test_rerun_after_crash_before_delete(self):
+        # First batch reaches the archive, then the delete fails
+        with mock.patch('django.db.models.query.QuerySet.delete', side_effect=RuntimeError('crash')):
+            with self.assertRaises(RuntimeError):
+                self._archive()
+        self.assertEqual(len(self._archived(parts=True)), 3)
+        self.assertEqual(UserActivityLog.objects.count(), len(self.old) + 1)
+
+        self._archive()
+        ids = [r['id'] for r in self._archived()]
+        self.assertEqual(sorted(ids), sorted(log.id for log in self.old))
+        self.assertEqual(UserActivityLog.objects.count(), 1)
+
+    def test_rerun_after_crash_while_merging(self):
+        # Day file already rewritten, parts not yet removed
+        with mock.patch('astrology.management.commands.archive_activity_logs.os.remove',
+                        side_effect=RuntimeError('crash')):
+            with self.assertRaises(RuntimeError):
+                self._archive()
+        self.assertGreater(len(self._archived(parts=True)), len(self.old))
+
+        self._archive()
+        ids = [r['id'] for r in self._archived()]
+        self.assertEqual(sorted(ids), sorted(log.id for log in self.old))
+
+    def test_later_run_adds_to_day_file(self):
+        self._archive()
+        day = self.old[0].timestamp
+        late = UserActivityLog.objects.create(action='Old', path='/late', method='GET', timestamp=day)
+        self._archive()
+        ids = [r['id'] for r in self._archived()]
+        self.assertEqual(sorted(ids), sorted([log.id for log in self.old] + [late.id]))
+
+    def test_dry_run_keeps_rows(self):
+        self._archive(dry_run=True)
+        self.assertEqual(UserActivityLog.objects.count(), len(self.old) + 1)
+        self.assertEqual(self._archived(), [])
+
+
+class HyperLogLogTests(SimpleTestCase):
+    def _ips(self, seed, n):
+        rng = random.Random(seed)
+        return {f"10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(256)}" for _ in range(n)}
+
+    def test_count_within_error_bound(self):
+        for n in (500, 5000, 50000):
+            ips = self._ips(n, n)
+            hll = HyperLogLog()
+            hll.update(ips)
+            # 3 standard errors
+            bound = 3 * 1.04 / hll.m ** 0.5
+            self.assertLess(abs(hll.count() - len(ips)) / len(ips), bound, n)
+
+    def test_merge_is_union(self):
+        a, b = self._ips(1, 20000), self._ips(2, 20000)
+        left, right, union = HyperLogLog(), HyperLogLog(), HyperLogLog()
+        left.update(a)
+        right.update(b)
+        union.update(a | b)
+        self.assertEqual(left.merge(right).to_bytes(), union.to_bytes())
+        self.assertEqual(left.count(), union.count())
+
+        with self.assertRaises(ValueError):
+            HyperLogLog(p=10).merge(HyperLogLog(p=12))
+
+    def test_bytes_round_trip(self):
+        for p in (10, 12, 14):
+            hll = HyperLogLog(p=p)
+            hll.update(self._ips(p, 3000))
+            blob = hll.to_bytes()
+            self.assertEqual(len(blob), 1 << p)
+            copy = HyperLogLog.from_bytes(blob)
+            self.assertEqual(copy.p, p)
+            self.assertEqual(copy.to_bytes(), blob)
+            self.assertEqual(copy.count(), hll.count())
+
+    def test_migration_copy_matches(self):
+        # 0009 backfills with its own frozen add(), it must write the same registers
+        migration = importlib.import_module('astrology.migrations.0009_dailyvisitorsketch')
+        ips = self._ips(9, 5000)
+        registers = bytearray(1 << migration.HLL_P)
+        for ip in ips:
+            migration.hll_add(registers, ip)
+        hll = HyperLogLog()
+        hll.update(ips)
+        self.assertEqual(bytes(registers), hll.to_bytes())
+
+    def test_add_is_idempotent(self):
+        hll = HyperLogLog()
+        hll.update(['1.2.3.4'] * 100)
+        self.assertEqual(hll.count(), 1)
+
+
+class ExactVisitorsToggleTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser('root', 'root@example.com', 'pw')
+
+    def _dashboard(self, query):
+        request = RequestFactory().get('/custom-admin/', query)
+        request.user = self.admin
+        return custom_admin_dashboard(request).content.decode()
+
+    def test_estimate_links_to_exact_count(self):
+        html = self._dashboard({})
+        self.assertIn('&asymp;', html)
+        self.assertIn('?exact_visitors=1', html)
+
+    def test_pagination_keeps_exact_count(self):
+        for i in range(45):
+            UserActivityLog.objects.create(action='Page View', path='/', method='GET', ip_address='10.0.0.1')
+        _, _, older = keyset_page(UserActivityLog.objects.all(), size=20)
+        html = self._dashboard({'exact_visitors': '1', 'after': older})
+        links = re.findall(r'href="(\?[^"]+)"', html)
+        # Newest, Newer, Older, Oldest
+        self.assertEqual(len([link for link in links if 'start_date' in link]), 4)
+        for link in links:
+            if 'start_date' in link:
+                self.assertIn('exact_visitors=1', link)
+
+    def test_exact_count_keeps_toggle(self):
+        html = self._dashboard({'exact_visitors': '1'})
+        self.assertNotIn('&asymp;', html)
+        self.assertIn('name="exact_visitors" value="1"', html)
+
+
+class ActivityLoggerTests(SimpleTestCase):
+    def _logger(self, **kwargs):
+        logger = ActivityLogger(**kwargs)
+        logger.batches = []
+        logger._write = logger.batches.append # No DB, just record the batches
+        self.addCleanup(logger.shutdown, 1.0)
+        return logger
+
+    def test_shutdown_flushes_queue(self):
+        logger = self._logger(batch_size=1000, flush_ms=60000)
+        for i in range(5):
+            logger.log(action=f'a{i}')
+        logger.shutdown(1.0)
+        self.assertEqual([f['action'] for batch in logger.batches for f in batch], [f'a{i}' for i in range(5)])
+        self.assertEqual(logger.stats()['queued'], 0)
+
+    def test_restart_after_shutdown_keeps_queue(self):
+        logger = self._logger(batch_size=1000, flush_ms=60000)
+        logger.log(action='first')
+        logger.shutdown(1.0)
+        # Queued while no writer runs (e.g. at exit), then the thread restarts
+        logger._queue.append({'action': 'pending'})
+        logger.log(action='second')
+        self.assertEqual([f['action'] for f in logger._queue], ['pending', 'second'])
+
+    def test_forked_child_drops_parent_queue(self):
+        logger = self._logger(batch_size=1000, flush_ms=60000)
+        logger.log(action='parent')
+        # As seen from a child process: the writer thread and pid are the parent's
+        logger._pid = -1
+        logger._thread = None
+        logger.log(action='child')
+        self.assertEqual([f['action'] for f in logger._queue], ['child'])
+
+    def test_drops_oldest_when_full(self):
+        logger = self._logger(queue_size=3, batch_size=1000, flush_ms=60000)
+        for i in range(5):
+            logger.log(action=f'a{i}')
+        stats = logger.stats()
+        self.assertEqual((stats['queued'], stats['enqueued'], stats['dropped']), (3, 5, 2))
+        self.assertEqual([f['action'] for f in logger._queue], ['a2', 'a3', 'a4'])
+
+
+class BulkChartsCheckpointTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.input = os.path.join(tmp.name, 'people.csv')
+        self.output = os.path.join(tmp.name, 'charts.ndjson')
+        self.checkpoint = self.output + '.checkpoint'
+        with open(self.input, 'w', encoding='utf-8') as f:
+            f.write('id,date,time,lat,lon\n1,1990-05-15,10:00,41.0,29.0\n2,1991-06-16,11:00,41.0,29.0\n')
+
+    def _write_checkpoint(self, **changes):
+        st = os.stat(self.input)
+        state = {'input': os.path.abspath(self.input), 'input_size': st.st_size,
+                 'input_mtime_ns': st.st_mtime_ns, 'rows_done': 2, 'output_bytes': 4}
+        state.update(changes)
+        with open(self.checkpoint, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+
+    def _run(self, **options):
+        call_command('bulk_charts', self.input, self.output, workers=1, stdout=StringIO(), **options)
+
+    def test_bad_default_time(self):
+        with self.assertRaisesMessage(CommandError, 'HH:MM'):
+            self._run(default_time='noon')
+
+    def test_checkpoint_for_other_input(self):
+        self._write_checkpoint(input_size=1)
+        with self.assertRaisesMessage(CommandError, 'input_size'):
+            self._run()
+
+    def test_checkpoint_without_output(self):
+        self._write_checkpoint()
+        with self.assertRaisesMessage(CommandError, 'is missing'):
+            self._run()
+
+    def test_finished_run_removes_checkpoint(self):
+        # Both rows already done: resumes at the end, trims the partial tail, finishes
+        with open(self.output, 'wb') as f:
+            f.write(b'a\nb\npartial')
+        self._write_checkpoint()
+        self._run()
+        self.assertFalse(os.path.exists(self.checkpoint))
+        with open(self.output, 'rb') as f:
+            self.assertEqual(f.read(), b'a\nb\n')
+
+
+class InterpretationStoreTests(TestCase):
+    def setUp(self):
+        PlanetInterpretation.objects.create(planet='Sun', sign='Leo', house=0, text_en='generic', text_tr='genel')
+        PlanetInterpretation.objects.create(planet='Sun', sign='Leo', house=5, text_en='fifth', text_tr='beşinci')
+        AspectInterpretation.objects.create(planet_1='Sun', planet_2='Moon', aspect_type='Trine',
+                                            text_en='flow', text_tr='akış')
+
+    def test_lookups(self):
+        store = InterpretationStore(check_interval=3600)
+        self.assertEqual(store.planet_texts('Sun', 'Leo', 5)['en'], 'fifth')
+        # Falls back to the generic text
+        self.assertEqual(store.planet_texts('Sun', 'Leo', 7)['en'], 'generic')
+        self.assertEqual(store.aspect_texts('Moon', 'Sun', 'Trine')['tr'], 'akış')
+        self.assertIsNone(store.aspect_texts('Sun', 'Moon', 'Square'))
+        self.assertEqual(store.loads, 1)
+
+    def test_invalidate_then_read(self):
+        store = InterpretationStore(check_interval=3600)
+        self.assertEqual(store.planet_texts('Sun', 'Leo')['en'], 'generic')
+        before = store._snapshot
+
+        # No signal: the copy is served until invalidated
+        PlanetInterpretation.objects.filter(house=0).update(text_en='edited')
+        self.assertEqual(store.planet_texts('Sun', 'Leo')['en'], 'generic')
+
+        store.invalidate()
+        self.assertEqual(store.planet_texts('Sun', 'Leo')['en'], 'edited')
+        # A new snapshot replaced the old one, which was left untouched
+        self.assertIsNot(store._snapshot, before)
+        self.assertEqual(before[1][('Sun', 'Leo', 0)]['en'], 'generic')
+
+    def test_other_process_sees_change(self):
+        # Two stores stand in for two workers; only the version row connects them
+        web, admin = InterpretationStore(check_interval=0), InterpretationStore(check_interval=0)
+        self.assertEqual(web.aspect_texts('Sun', 'Moon', 'Trine')['en'], 'flow')
+
+        AspectInterpretation.objects.filter(aspect_type='Trine').update(text_en='changed')
+        self.assertEqual(web.aspect_texts('Sun', 'Moon', 'Trine')['en'], 'flow')
+        admin.invalidate()
+        self.assertEqual(web.aspect_texts('Sun', 'Moon', 'Trine')['en'], 'changed')
+        self.assertEqual(web.loads, 2)
+
+    def test_save_bumps_version_row(self):
+        version = InterpretationVersion.objects.get(pk=1).version # Rows from setUp bumped it
+        PlanetInterpretation.objects.filter(house=5).first().save()
+        self.assertEqual(InterpretationVersion.objects.get(pk=1).version, version + 1)
+
+    def test_readers_never_see_missing_snapshot(self):
+        # Reload mechanics only, no DB from the threads
+        store = InterpretationStore(check_interval=0)
+        loads = iter(range(1000000))
+
+        def fake_load():
+            n = next(loads)
+            store._snapshot = ({('Moon', 'Sun', 'Trine'): {'en': str(n)}}, {('Sun', 'Leo', 0): {'en': str(n)}})
+            store.loads += 1
+
+        store._load = fake_load
+        store._shared_version = lambda: store.loads
+        errors = []
+
+        def read():
+            try:
+                for _ in range(2000):
+                    store.aspect_texts('Sun', 'Moon', 'Trine')['en']
+                    store.planet_texts('Sun', 'Leo')['en']
+            except Exception as e:
+                errors.append(e)
+
+        readers = [threading.Thread(target=read) for _ in range(4)]
+        for t in readers:
+            t.start()
+        for _ in range(300):
+            store._stale = True
+        for t in readers:
+            t.join()
+        self.assertEqual(errors, [])
+        self.assertGreater(store.loads, 1)
+
+
+def _bare_engine(test):
+    """Installs an AstroEngine singleton with the builtin timescale (no DE421) for one test."""
+    engine = object.__new__(AstroEngine)
+    engine._ts = load.timescale()
+    saved = AstroEngine._instance
+    AstroEngine._instance = engine
+    test.addCleanup(setattr, AstroEngine, '_instance', saved)
+    return engine
+
+
+@override_settings(EPHEMERIS_BACKEND='analytic')
+class CalculateChartsViewTests(TestCase):
+    def setUp(self):
+        _bare_engine(self)
+
+    def _post(self, body):
+        request = RequestFactory().post('/api/calculate-charts/', json.dumps(body), content_type='application/json')
+        response = calculate_charts(request)
+        if response.streaming:
+            return response, [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        return response, json.loads(response.content)
+
+    def test_mixed_batch(self):
+        response, lines = self._post({'lang': 'tr', 'records': [
+            {'date': '1990-05-15', 'time': '10:30', 'lat': 41.01, 'lon': 28.97},
+            {'date': 'not a date', 'time': '10:30', 'lat': 41.01, 'lon': 28.97},
+            {'date': '1990-05-15', 'time': '10:30'},
+            {'date': '1990-05-15', 'time': '10:30', 'lat': 'north', 'lon': 28.97},
+            {'date': '1985-01-02', 'time': '23:15', 'lat': 39.93, 'lon': 32.86, 'lang': 'en'},
+        ]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual([line['index'] for line in lines], [0, 1, 2, 3, 4])
+        self.assertEqual([('chart' in line, 'error' in line) for line in lines],
+                         [(True, False), (False, True), (False, True), (False, True), (True, False)])
+        self.assertIn('lat and lon are required', lines[2]['error'])
+        self.assertEqual(lines[0]['chart']['planets'][0]['name'], 'Sun')
+
+    def test_plain_list_body(self):
+        response, lines = self._post([{'date': '1990/05/15', 'time': '10:30', 'lat': 41.01, 'lon': 28.97}])
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('chart', lines[0])
+
+    @override_settings(CHART_BATCH_CHUNK_SIZE=2)
+    def test_computed_in_chunks_while_streaming(self):
+        record = {'date': '1990-05-15', 'time': '10:30', 'lat': 41.0, 'lon': 29.0}
+        request = RequestFactory().post('/api/calculate-charts/', json.dumps([record] * 5),
+                                        content_type='application/json')
+        with mock.patch.object(AstroEngine, 'calculate_natal_batch', autospec=True,
+                               side_effect=AstroEngine.calculate_natal_batch) as batch:
+            response = calculate_charts(request)
+            # Only the first chunk before the response exists
+            self.assertEqual(batch.call_count, 1)
+            stream = iter(response.streaming_content)
+            next(stream)
+            next(stream)
+            self.assertEqual(batch.call_count, 1)
+            next(stream)
+            self.assertEqual(batch.call_count, 2)
+            rest = list(stream)
+        self.assertEqual(batch.call_count, 3)
+        self.assertEqual(len(rest), 2)
+        self.assertEqual([len(call.args[1]) for call in batch.call_args_list], [2, 2, 1])
+
+    @override_settings(CHART_BATCH_CHUNK_SIZE=2)
+    def test_chunk_failures(self):
+        record = {'date': '1990-05-15', 'time': '10:30', 'lat': 41.0, 'lon': 29.0}
+        real = AstroEngine.calculate_natal_batch
+        calls = []
+
+        def second_chunk_fails(engine, records, backend=None):
+            calls.append(records)
+            if len(calls) == 2:
+                raise RuntimeError('boom')
+            return real(engine, records, backend)
+
+        with mock.patch.object(AstroEngine, 'calculate_natal_batch', autospec=True, side_effect=second_chunk_fails):
+            response, lines = self._post([record] * 5)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([line.get('error') for line in lines], [None, None, 'boom', 'boom', None])
+
+        # Failing before the first line: still a JSON error
+        with mock.patch.object(AstroEngine, 'calculate_natal_batch', side_effect=RuntimeError('no ephemeris')):
+            response, body = self._post([record])
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(body, {'error': 'no ephemeris'})
+
+    @override_settings(CHART_BATCH_MAX_RECORDS=2)
+    def test_too_many_records(self):
+        record = {'date': '1990-05-15', 'time': '10:30', 'lat': 41.0, 'lon': 29.0}
+        response, body = self._post({'records': [record] * 3})
+        self.assertEqual(response.status_code, 413)
+        self.assertIn('At most 2', body['error'])
+
+    def test_bad_bodies(self):
+        factory = RequestFactory()
+        response = calculate_charts(factory.post('/api/calculate-charts/', 'nope', content_type='application/json'))
+        self.assertEqual(response.status_code, 400)
+        response, body = self._post({'records': 'x'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(calculate_charts(factory.get('/api/calculate-charts/')).status_code, 405)
+
+
+@override_settings(EPHEMERIS_BACKEND='analytic')
+class BulkChartsChunkTests(TestCase):
+    def setUp(self):
+        from .management.commands import bulk_charts
+        self.module = bulk_charts
+        patcher = mock.patch.object(bulk_charts, '_engine', _bare_engine(self))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    ROWS = [
+        {'id': 'a', 'date': '1990-05-15', 'time': '10:30', 'lat': '41.0', 'lon': '29.0'},
+        {'id': 'b', 'date': '1990-05-15', 'time': '', 'lat': '41.0', 'lon': '29.0'},
+        {'id': 'c', 'date': '1990-05-15', 'time': '10:30', 'lat': 'x', 'lon': '29.0'},
+    ]
+
+    def test_missing_time_is_an_error(self):
+        lines, errors = self.module._compute_chunk(10, self.ROWS, None)
+        records = [json.loads(line) for line in lines]
+        self.assertEqual(errors, 2)
+        self.assertEqual([(r['row'], r['id']) for r in records], [(10, 'a'), (11, 'b'), (12, 'c')])
+        self.assertIn('chart', records[0])
+        self.assertIn('time is required', records[1]['error'])
+
+    def test_bypasses_chart_cache(self):
+        from .chart_cache import get_chart_cache
+        cache = get_chart_cache()
+        with mock.patch.object(cache, 'get') as get, mock.patch.object(cache, 'get_or_compute') as get_or_compute:
+            lines, errors = self.module._compute_chunk(0, self.ROWS[:1], None)
+        self.assertEqual(errors, 0)
+        get.assert_not_called()
+        get_or_compute.assert_not_called()
+
+    def test_default_time(self):
+        lines, errors = self.module._compute_chunk(0, self.ROWS, None, default_time='10:30')
+        records = [json.loads(line) for line in lines]
+        self.assertEqual(errors, 1)
+        self.assertEqual(records[1]['chart'], records[0]['chart'])
+
+
+def _fixture_index(places):
+    """GeoIndex over a hand-made place list instead of geonamescache."""
+    index = object.__new__(GeoIndex)
+    index.places = places
+    index.country_names = {'TR': 'Turkey', 'US': 'United States', 'FJ': 'Fiji', 'AQ': 'Antarctica'}
+    index._by_name, index._by_pop = {}, {}
+    groups = {}
+    for p in places:
+        groups.setdefault((p[4], None), []).append(p[:4])
+    for key, cities in groups.items():
+        index._by_name[key] = tuple(sorted(cities, key=lambda x: x[0]))
+        index._by_pop[key] = tuple(sorted(cities, key=lambda x: x[3], reverse=True))
+    index._build_search()
+    index._build_grid()
+    return index
+
+
+class GeoIndexTests(SimpleTestCase):
+    PLACES = [
+        ('İstanbul', 41.01, 28.97, 15000000, 'TR', 'İstanbul'),
+        ('Istanbul Airport', 41.26, 28.74, 0, 'TR', 'İstanbul'),
+        ('Iğdır', 39.92, 44.05, 90000, 'TR', 'Iğdır'),
+        ('İzmir', 38.42, 27.14, 3000000, 'TR', 'İzmir'),
+        ('New York City', 40.71, -74.01, 8000000, 'US', 'New York'),
+        ('York', 39.96, -76.73, 44000, 'US', 'Pennsylvania'),
+        ('Yorkville', 41.64, -88.45, 20000, 'US', 'Illinois'),
+        # Either side of the antimeridian
+        ('Levuka', -17.68, 178.84, 1000, 'FJ', 'Eastern'),
+        ('Lau', -17.70, -179.90, 100, 'FJ', 'Eastern'),
+        # Near both poles
+        ('Amundsen-Scott', -89.99, 139.27, 150, 'AQ', ''),
+        ('North Camp', 89.60, -10.00, 0, 'AQ', ''),
+    ]
+
+    def setUp(self):
+        self.index = _fixture_index(list(self.PLACES))
+
+    def _names(self, query, limit=10):
+        return [p[0] for p in self.index.search(query, limit=limit)]
+
+    def test_fold(self):
+        self.assertEqual(fold('İSTANBUL'), 'istanbul')
+        self.assertEqual(fold('Iğdır'), 'igdir')
+        self.assertEqual(fold("  Saint-Étienne  d'Orves "), 'saint etienne d orves')
+
+    def test_search_folds_case_and_accents(self):
+        for query in ('istanbul', 'ISTAN', 'İst', 'ıst'):
+            self.assertEqual(self._names(query), ['İstanbul', 'Istanbul Airport'], query)
+        self.assertEqual(self._names('igdir'), ['Iğdır'])
+        self.assertEqual(self._names('i', limit=3), ['İstanbul', 'İzmir', 'Iğdır'])
+
+    def test_search_matches_later_words_by_population(self):
+        # Short prefixes come from the build-time cache, long ones from bisect: same order
+        self.assertEqual(self._names('yor'), ['New York City', 'York', 'Yorkville'])
+        self.assertEqual(self._names('york'), ['New York City', 'York', 'Yorkville'])
+        self.assertEqual(self._names('york c'), ['New York City'])
+        self.assertEqual(self._names('airport'), ['Istanbul Airport'])
+
+    def test_search_limits(self):
+        self.assertEqual(self._names('york', limit=1), ['New York City'])
+        self.assertEqual(self._names('york', limit=0), [])
+        self.assertEqual(self._names(''), [])
+        self.assertEqual(self._names('zzz'), [])
+
+    def test_nearest_matches_brute_force(self):
+        rng = random.Random(18)
+        queries = [(rng.uniform(-90, 90), rng.uniform(-180, 180)) for _ in range(300)]
+        # Antimeridian and poles
+        queries += [(-17.7, 179.99), (-17.7, -179.99), (-17.7, 180.0), (-17.7, -180.0),
+                    (-90.0, 0.0), (-89.5, -40.0), (90.0, 0.0), (89.9, 170.0)]
+        for lat, lon in queries:
+            place, km = self.index.nearest(lat, lon)
+            expected = min(haversine_km(lat, lon, p[1], p[2]) for p in self.PLACES)
+            self.assertAlmostEqual(km, expected, places=6, msg=(lat, lon))
+
+    def test_nearest_across_antimeridian(self):
+        place, km = self.index.nearest(-17.7, 179.95)
+        self.assertEqual(place[0], 'Lau')
+        self.assertLess(km, 20)
+        # 179.6E: Lau (0.5 degrees across the line) beats Levuka (0.76 degrees on this side)
+        self.assertEqual(self.index.nearest(-17.69, 179.6)[0][0], 'Lau')
+        self.assertEqual(self.index.nearest(-17.68, 179.0)[0][0], 'Levuka')
+
+    def test_nearest_near_poles(self):
+        self.assertEqual(self.index.nearest(-89.9, -60.0, max_km=50)[0][0], 'Amundsen-Scott')
+        self.assertEqual(self.index.nearest(90.0, 100.0, max_km=50)[0][0], 'North Camp')
+
+    def test_nearest_max_km(self):
+        self.assertEqual(self.index.nearest(0.0, -30.0, max_km=150), (None, None))
+        place, km = self.index.nearest(41.0, 29.0, max_km=150)
+        self.assertEqual(place[0], 'İstanbul')
+
+    def test_cities_limit_and_min_pop(self):
+        names = lambda cities: [c[0] for c in cities]
+        self.assertEqual(names(self.index.cities('US')), ['New York City', 'York', 'Yorkville'])
+        # Largest N, returned in name order
+        self.assertEqual(names(self.index.cities('TR', limit=2)), ['İstanbul', 'İzmir'])
+        self.assertEqual(names(self.index.cities('US', min_pop=30000)), ['New York City', 'York'])
+        self.assertEqual(names(self.index.cities('US', limit=5, min_pop=30000)), ['New York City', 'York'])
+        self.assertEqual(self.index.cities('XX'), [])
+
+
+class PlaceViewTests(SimpleTestCase):
+    # The real geonames index, built once per process
+    def _get(self, view, **params):
+        response = view(RequestFactory().get('/', params))
+        return response.status_code, json.loads(response.content)
+
+    def test_search_places(self):
+        status, body = self._get(search_places, q='istanb', limit='3')
+        self.assertEqual(status, 200)
+        self.assertLessEqual(len(body['places']), 3)
+        self.assertEqual(fold(body['places'][0]['name']), 'istanbul')
+        self.assertEqual(body['places'][0]['country'], 'TR')
+
+    def test_nearest_place(self):
+        _bare_engine(self)
+        status, body = self._get(nearest_place, lat='41.01', lon='28.97')
+        self.assertEqual(status, 200)
+        self.assertEqual(body['place']['country'], 'TR')
+        self.assertLess(body['place']['distance_km'], 20)
+
+        status, body = self._get(nearest_place, lat='0', lon='-30')
+        self.assertEqual((status, body), (200, {'place': None}))
+        self.assertEqual(self._get(nearest_place, lat='north', lon='1')[0], 400)
+
+    def test_get_cities_limit(self):
+        status, body = self._get(get_cities, code='US', limit='5')
+        self.assertEqual(status, 200)
+        names = [c['name'] for c in body['cities']]
+        self.assertEqual(len(names), 5)
+        self.assertEqual(names, sorted(names))
+        self.assertIn('New York City', names)
+
+        status, body = self._get(get_cities, code='US', min_pop='2000000')
+        self.assertTrue(all(c['pop'] >= 2000000 for c in body['cities']))
+        self.assertEqual(self._get(get_cities)[0], 400)
+
+
+class ActivityRollupTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser('root', 'root@example.com', 'pw')
+        self.user = User.objects.create_user('ayse', 'ayse@example.com', 'pw')
+        logger = ActivityLogger(async_mode=False)
+        now = timezone.now()
+        events = [
+            (None, 'Page View', '10.0.0.1', 0), (None, 'Page View', '10.0.0.2', 0),
+            (self.user.pk, 'Calculated Chart', '10.0.0.1', 0), (self.user.pk, 'Calculated Chart', '10.0.0.3', 1),
+            (None, 'API Call', None, 1), (None, 'Page View', '10.0.0.4', 2),
+            # Superusers are left out of the rollups
+            (self.admin.pk, 'Page View', '10.0.0.9', 0), (self.admin.pk, 'API Call', '10.0.0.9', 1),
+        ]
+        for user_id, action, ip, days_ago in events:
+            logger.log(user_id=user_id, action=action, path='/', method='GET', ip_address=ip,
+                       timestamp=now - timedelta(days=days_ago))
+
+    def _from_logs(self):
+        from django.db.models import Count
+        from django.db.models.functions import TruncDate
+        rows = (UserActivityLog.objects.exclude(user__is_superuser=True).annotate(day=TruncDate('timestamp'))
+                .values_list('day', 'action').annotate(n=Count('id')))
+        return {(day, action): n for day, action, n in rows}
+
+    def _rollups(self):
+        return {(r.date, r.action): r.count for r in DailyActivityRollup.objects.all()}
+
+    def _assert_sketches_match_logs(self):
+        from django.db.models.functions import TruncDate
+        ips = {}
+        for day, ip in (UserActivityLog.objects.exclude(user__is_superuser=True).exclude(ip_address__isnull=True)
+                        .annotate(day=TruncDate('timestamp')).values_list('day', 'ip_address')):
+            ips.setdefault(day, set()).add(ip)
+        sketches = {row.date: HyperLogLog.from_bytes(bytes(row.sketch)).count()
+                    for row in DailyVisitorSketch.objects.all()}
+        # A handful of IPs is exact under linear counting
+        self.assertEqual(sketches, {day: len(v) for day, v in ips.items()})
+
+    def test_logging_keeps_rollups_in_step(self):
+        self.assertEqual(len(self._from_logs()), 5)
+        self.assertEqual(self._rollups(), self._from_logs())
+        self._assert_sketches_match_logs()
+
+    def test_rebuild_command(self):
+        # Drifted: a lost row, a wrong count, a stray sketch
+        DailyActivityRollup.objects.filter(action='API Call').delete()
+        DailyActivityRollup.objects.filter(action='Page View').update(count=99)
+        DailyVisitorSketch.objects.all().delete()
+        call_command('rebuild_activity_rollups', stdout=StringIO())
+        self.assertEqual(self._rollups(), self._from_logs())
+        self._assert_sketches_match_logs()
+
+    def test_rebuild_range_keeps_other_days(self):
+        today = timezone.localdate()
+        DailyActivityRollup.objects.update(count=99)
+        call_command('rebuild_activity_rollups', start=today.isoformat(), end=today.isoformat(), stdout=StringIO())
+        rollups = self._rollups()
+        for (day, action), n in self._from_logs().items():
+            self.assertEqual(rollups[(day, action)], n if day == today else 99)
+
+    def test_migration_backfill(self):
+        backfill = importlib.import_module('astrology.migrations.0008_activity_rollups_and_log_indexes')
+        DailyActivityRollup.objects.all().delete()
+        from django.apps import apps
+        backfill.backfill_rollups(apps, None)
+        self.assertEqual(self._rollups(), self._from_logs())
+
+    def test_dashboard_sums_rollups(self):
+        today = timezone.localdate().isoformat()
+        request = RequestFactory().get('/custom-admin/', {'start_date': today, 'end_date': today})
+        request.user = self.admin
+        html = custom_admin_dashboard(request).content.decode()
+        total = sum(n for (day, _), n in self._from_logs().items() if day.isoformat() == today)
+        self.assertEqual(total, 3)
+        self.assertIn(f'<div class="stat-value">{total}</div>', html)
+        # Exact distinct IPs for a one-day range: .1 and .2 (.9 is the superuser)
+        self.assertIn('<div class="stat-value">2</div>', html)
+
+
+@override_settings(ACTIVITY_EXPORT_CHUNK=3)
+class ActivityExportTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser('root', 'root@example.com', 'pw')
+        now = timezone.now()
+        self.logs = [
+            UserActivityLog.objects.create(action='Page View', path=f'/a,b/{i}', method='GET', ip_address='10.0.0.1',
+                                           details={'note': 'İstanbul, "quoted"', 'i': i},
+                                           timestamp=now - timedelta(days=i % 3))
+            for i in range(7)
+        ]
+        # Not exported: superuser activity
+        UserActivityLog.objects.create(user=self.admin, action='API Call', path='/', method='GET', timestamp=now)
+
+    def _export(self, **params):
+        request = RequestFactory().get('/custom-admin/export/', params)
+        request.user = self.admin
+        response = custom_admin_export(request)
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, body
+
+    def _rows(self, fmt, body):
+        text = body.decode('utf-8')
+        if fmt == 'csv':
+            rows = list(csv.reader(StringIO(text)))
+            self.assertEqual(tuple(rows[0]), EXPORT_COLUMNS)
+            return [dict(zip(EXPORT_COLUMNS, row)) for row in rows[1:]]
+        return [json.loads(line) for line in text.splitlines()]
+
+    def test_every_format(self):
+        for fmt in ('csv', 'ndjson'):
+            for compressed in (False, True):
+                params = {'format': fmt}
+                if compressed:
+                    params['gzip'] = '1'
+                response, body = self._export(**params)
+                self.assertEqual(response.status_code, 200)
+                if compressed:
+                    self.assertEqual(response['Content-Type'], 'application/gzip')
+                    self.assertTrue(response['Content-Disposition'].endswith(f'.{fmt}.gz"'))
+                    body = gzip.decompress(body)
+                rows = self._rows(fmt, body)
+                self.assertEqual(len(rows), len(self.logs), (fmt, compressed))
+                self.assertEqual(sorted(int(r['id']) for r in rows), sorted(log.id for log in self.logs))
+                details = rows[0]['details']
+                if fmt == 'csv':
+                    details = json.loads(details)
+                self.assertEqual(details['note'], 'İstanbul, "quoted"')
+
+    def test_ordered_oldest_first(self):
+        _, body = self._export(format='ndjson')
+        stamps = [row['timestamp'] for row in self._rows('ndjson', body)]
+        self.assertEqual(stamps, sorted(stamps))
+
+    def test_date_filter(self):
+        today = timezone.localdate().isoformat()
+        _, body = self._export(format='csv', start_date=today, end_date=today)
+        self.assertEqual(len(self._rows('csv', body)), 3) # i = 0, 3, 6
+
+    def test_empty_and_bad_format(self):
+        _, body = self._export(format='csv', start_date='2000-01-01', end_date='2000-01-02')
+        self.assertEqual(self._rows('csv', body), [])
+        response, _ = self._export(format='xml')
+        self.assertEqual(response.status_code, 400)
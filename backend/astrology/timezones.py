@@ -0,0 +1,191 @@
+"""
+Coordinate -> IANA timezone resolution shared by every engine entry point.
+
+TimezoneFinder loads its polygon data on construction, so we keep a single
+instance per process and put an LRU (keyed on rounded coordinates) in front of it.
+"""
+import threading
+from datetime import datetime
+from functools import lru_cache
+import numpy as np
+import pytz
+from timezonefinder import TimezoneFinder
+from django.conf import settings
+
+from .caching import LRUCache
+
+
+class TimezoneResolver:
+    def __init__(self, precision=4, maxsize=8192, in_memory=False):
+        # 4 decimals ~ 11 m, far below any zone boundary we care about
+        self.precision = precision
+        self.in_memory = in_memory
+        self._cache = LRUCache(maxsize=maxsize)
+        self._finder = None
+        self._lock = threading.Lock()
+
+    @property
+    def finder(self):
+        if self._finder is None:
+            with self._lock:
+                if self._finder is None:
+                    # in_memory=True keeps the polygons in RAM (faster, ~40 MB more per worker)
+                    self._finder = TimezoneFinder(in_memory=self.in_memory)
+        return self._finder
+
+    def _lookup(self, lat, lon):
+        finder = self.finder
+        with self._lock:
+            return finder.timezone_at(lng=lon, lat=lat)
+
+    def resolve(self, lat, lon):
+        """Returns the zone name (e.g. 'Europe/Istanbul') or None over oceans."""
+        key = (round(float(lat), self.precision), round(float(lon), self.precision))
+        return self._cache.get_or_set(key, lambda: self._lookup(*key))
+
+    def stats(self):
+        stats = self._cache.stats()
+        stats['in_memory'] = self.in_memory
+        return stats
+
+
+_resolver = None
+_resolver_lock = threading.Lock()
+
+
+def get_resolver():
+    global _resolver
+    if _resolver is None:
+        with _resolver_lock:
+            if _resolver is None:
+                _resolver = TimezoneResolver(
+                    precision=getattr(settings, 'TZ_RESOLVER_PRECISION', 4),
+                    maxsize=getattr(settings, 'TZ_RESOLVER_CACHE_SIZE', 8192),
+                    in_memory=getattr(settings, 'TZ_RESOLVER_IN_MEMORY', False),
+                )
+    return _resolver
+
+
+def resolve_timezone(lat, lon):
+    return get_resolver().resolve(lat, lon)
+
+
+# --- Vectorized local time -> UTC ---
+
+_EPOCH = datetime(1970, 1, 1)
+_HOUR = 3600.0
+
+
+class ZoneTable:
+    """
+    A zone's UTC transition list extracted from pytz once, so arrays of naive
+    local times can be converted with numpy.searchsorted instead of localize().
+
+    Local times inside a DST overlap/gap follow the same policy as
+    AstroEngine.calculate_natal:
+      - ambiguous (clock set back)  -> standard time, like localize(is_dst=False)
+      - non-existent (clock jumped) -> +1 hour, like localize(dt + 1h, is_dst=True)
+    """
+
+    def __init__(self, tz_name):
+        tz = pytz.timezone(tz_name)
+        transitions = getattr(tz, '_utc_transition_times', None)
+
+        if transitions:
+            starts = [(d - _EPOCH).total_seconds() for d in transitions]
+            starts[0] = -np.inf # pytz uses datetime(1, 1, 1) as "since forever"
+            info = tz._transition_info
+            offsets = [i[0].total_seconds() for i in info]
+            dst = [bool(i[1]) for i in info]
+        else:
+            # UTC / fixed offset zones
+            starts = [-np.inf]
+            offsets = [tz.utcoffset(_EPOCH).total_seconds()]
+            dst = [False]
+
+        self.name = tz_name
+        self.offsets = np.array(offsets)
+        self.dst = np.array(dst)
+        utc_starts = np.array(starts)
+        # Each period expressed in local wall-clock seconds: [local_starts, local_ends)
+        self.local_starts = utc_starts + self.offsets
+        self.local_ends = np.append(utc_starts[1:] + self.offsets[:-1], np.inf)
+
+    def _offsets(self, local_s, is_dst):
+        k = np.maximum(np.searchsorted(self.local_starts, local_s, side='right') - 1, 0)
+        prev = np.maximum(k - 1, 0)
+        offsets = self.offsets[k]
+
+        # Wall time jumped over (start of DST)
+        gap = local_s >= self.local_ends[k]
+
+        # Wall time occurs twice: both prev and k are valid
+        overlap = (k > 0) & (local_s < self.local_ends[prev])
+        if overlap.any():
+            match_prev = self.dst[prev] == is_dst
+            match_k = self.dst[k] == is_dst
+            # Same tie-break as pytz: is_dst=False -> latest UTC (smaller offset)
+            if is_dst:
+                prefer_prev = self.offsets[prev] > self.offsets[k]
+            else:
+                prefer_prev = self.offsets[prev] < self.offsets[k]
+            pick_prev = overlap & ((match_prev & ~match_k) | ((match_prev == match_k) & prefer_prev))
+            offsets = np.where(pick_prev, self.offsets[prev], offsets)
+
+        return offsets, gap
+
+    def to_utc_seconds(self, local_s):
+        """Local wall-clock seconds since 1970 (array) -> UTC seconds since 1970."""
+        local_s = np.asarray(local_s, dtype=float)
+        offsets, gap = self._offsets(local_s, is_dst=False)
+        utc_s = local_s - offsets
+
+        if gap.any():
+            # Clock jumped fwd -> Add 1 hour and take the summer side
+            shifted = local_s[gap] + _HOUR
+            gap_offsets, still_gap = self._offsets(shifted, is_dst=True)
+
+            # Gap longer than an hour (e.g. Apia 2011 skipped a day):
+            # pytz keeps winding forward 6h until it finds a valid zone
+            probe = shifted.copy()
+            for _ in range(8):
+                if not still_gap.any():
+                    break
+                idx = np.nonzero(still_gap)[0]
+                probe[idx] += 6 * _HOUR
+                gap_offsets[idx], still_gap[idx] = self._offsets(probe[idx], is_dst=True)
+
+            utc_s[gap] = shifted - gap_offsets
+
+        return utc_s
+
+
+@lru_cache(maxsize=512)
+def get_zone_table(tz_name):
+    return ZoneTable(tz_name)
+
+
+def naive_to_seconds(local_datetimes):
+    """Naive datetimes (list or datetime64 array) -> float seconds since 1970."""
+    arr = np.asarray(local_datetimes, dtype='datetime64[s]')
+    return arr.astype(np.int64).astype(float)
+
+
+def seconds_to_time(ts, utc_s):
+    """UTC seconds since 1970 -> Skyfield Time array (day/second split keeps leap seconds right)."""
+    utc_s = np.asarray(utc_s, dtype=float)
+    days = np.floor(utc_s / 86400.0)
+    return ts.utc(1970, 1, 1 + days, 0, 0, utc_s - days * 86400.0)
+
+
+def local_to_utc(ts, tz_name, local_datetimes, lon=None):
+    """
+    Converts an array of naive local datetimes in tz_name to a Skyfield Time array.
+    With tz_name=None (ocean/unknown) falls back to LMT from lon, like calculate_natal.
+    """
+    local_s = naive_to_seconds(local_datetimes)
+    if tz_name:
+        utc_s = get_zone_table(tz_name).to_utc_seconds(local_s)
+    else:
+        utc_s = local_s - (np.asarray(lon, dtype=float) / 15.0) * _HOUR
+    return seconds_to_time(ts, utc_s)
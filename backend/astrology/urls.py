@@ -4,6 +4,7 @@ from . import views
 urlpatterns = [
     path('', views.index, name='index'),
     path('calculate-chart/', views.calculate_chart, name='calculate_chart'),
+    path('calculate-charts/', views.calculate_charts, name='calculate_charts'),
     path('calculate-synastry/', views.calculate_synastry_view, name='calculate_synastry'),
     path('daily-planner/', views.get_daily_planner, name='daily_planner'),
     path('weekly-forecast/', views.get_weekly_forecast, name='weekly_forecast'),
@@ -13,6 +14,8 @@ urlpatterns = [
     path('countries/', views.get_countries, name='get_countries'),
     path('provinces/', views.get_provinces, name='get_provinces'),
     path('cities/', views.get_cities, name='get_cities'),
+    path('places/search/', views.search_places, name='search_places'),
+    path('places/nearest/', views.nearest_place, name='nearest_place'),
     path('daily-horoscopes/', views.get_daily_horoscopes_api, name='daily_horoscopes'),
     
     # Auth
@@ -23,4 +26,5 @@ urlpatterns = [
     path('check-auth/', views.check_auth_api, name='check_auth'),
     path('update-profile/', views.update_profile_api, name='update_profile'),
     path('custom-admin/', views.custom_admin_dashboard, name='custom_admin'),
+    path('custom-admin/export/', views.custom_admin_export, name='custom_admin_export'),
 ]
@@ -1,22 +1,27 @@
 from django.shortcuts import render
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 
 import json
 import random
 from .engine import AstroEngine
+from .caching import LRUCache
+from .interpretations import get_interpretation_store
+from .interpretation_data import natal_texts, draconic_texts, LUCKY_GEMS
+from django.conf import settings
 import datetime
 from datetime import datetime as dt
 import geonamescache
 from .tarot_data import tarot_deck
 from .horoscope_data import SENTENCES, SIGNS_TR, SIGNS_EN
 from django.db.models import Q
-from .models import PlanetInterpretation, AspectInterpretation, DailyTip, DailyHoroscope, UserProfile, UserActivityLog
-from django.db.models import Count, Max, Min
+from .models import PlanetInterpretation, AspectInterpretation, DailyTip, DailyHoroscope, UserProfile, UserActivityLog, DailyActivityRollup
+from django.db.models import Count, Max, Min, Sum
+from .activity_log import (timestamp_range, filter_timestamp, filter_dates, keyset_page, unique_visitors,
+                           export_lines, gzip_stream)
 from django.contrib.auth.decorators import user_passes_test
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.models import User
-from django.core.paginator import Paginator
 
 # Try to import flatlib, handle error if not installed
 try:
@@ -28,6 +33,91 @@ try:
 except ImportError:
     FLATLIB_AVAILABLE = False
 
+def _chart_response(engine, natal_data, date_str, lat, lon, lang):
+    """calculate_natal output -> the calculate-chart payload (texts, metrics, draconic)."""
+    store = get_interpretation_store()
+
+    # 2. Enrich with Interpretations (Smart Generator)
+    # We use a generative approach to ensure rich, long descriptions without massive DB seeding
+    
+    planets_enriched = []
+    for p in natal_data['planets']:
+        # Both languages, precomputed in interpretation_data
+        texts = natal_texts(p['name'], p['sign'])
+        p['interpretations'] = texts
+        # Fallback for old API consumers
+        p['interpretation'] = texts['tr'] if lang == 'tr' else texts['en']
+
+        # Imported house-specific texts (import_data), when we have them
+        house_texts = store.planet_texts(p['name'], p['sign'], p.get('house', 0))
+        if house_texts:
+            p['house_interpretations'] = house_texts
+        
+        planets_enriched.append(p)
+        
+    # 3. Aspects
+    aspects_raw = engine.calculate_aspects(planets_enriched)
+    aspects_enriched = []
+    
+    for a in aspects_raw:
+         # In-memory lookup, no query per aspect
+         texts = store.aspect_texts(a['p1'], a['p2'], a['type'])
+         
+         text = texts.get(lang, f"{a['type']} aspect") if texts else f"{a['p1']} {a['type']} {a['p2']}"
+         
+         aspects_enriched.append({
+             "p1": a['p1'], "p2": a['p2'], "type": a['type'],
+             "orb": a['orb'], "interpretation": text
+         })
+
+    # 4. Advanced Metrics
+    birth_year = int(date_str.split('/')[0])
+    current_year = datetime.now().year
+    
+    # Profection (Simple Modulo)
+    profection = (current_year - birth_year) % 12 + 1
+    
+    # Dominants
+    dominants = engine.calculate_dominants(planets_enriched)
+    
+    # Lucky Gem
+    sun_sign = next((p['sign'] for p in planets_enriched if p['name'] == 'Sun'), 'Aries')
+    lucky = LUCKY_GEMS.get(sun_sign, {'color': 'White', 'stone': 'Diamond'})
+    
+    # Draconic Calculation & Enrichment
+    draconic_data = engine.calculate_draconic(natal_data['planets'], natal_data['north_node'])
+    draconic_enriched = []
+    for p in draconic_data:
+        texts = draconic_texts(p['name'], p['sign'])
+        p['interpretations'] = texts
+        # Fallback for older frontend logic if needed
+        p['interpretation'] = texts['tr'] if lang == 'tr' else texts['en']
+        draconic_enriched.append(p)
+
+    response = {
+        "planets": planets_enriched,
+        "houses": [h['lon'] for h in natal_data['houses']], 
+        "aspects": aspects_enriched,
+            "meta": {
+                "profection_house": profection,
+                "dominants": dominants,
+                "lucky_color": lucky['color'],
+                "lucky_stone": lucky['stone'],
+                "sun_sign": sun_sign,
+                "rising_sign": natal_data['ascendant'],
+                "sun_lon_exact": next((p['lon'] for p in planets_enriched if p['name'] == 'Sun'), 0.0),
+                "calc_utc": natal_data.get('utc_time', 'Unknown'),
+                "local_timezone": natal_data.get('timezone', 'Unknown'),
+                "birth_place": engine.nearest_place(lat, lon),
+                "planetary_hours": [],
+                "draconic_chart": draconic_enriched,
+                "celebrity_match": {"name": "TBD", "score": 0},
+                "acg_lines": []
+            }
+    }
+    return response
+
+
 @csrf_exempt
 def calculate_chart(request):
     if request.method != 'POST':
@@ -47,189 +137,94 @@ def calculate_chart(request):
         # 1. Main Calculation (Skyfield)
         natal_data = engine.calculate_natal(date_str, time_str, lat, lon)
         
-        # 2. Enrich with Interpretations (Smart Generator)
-        # We use a generative approach to ensure rich, long descriptions without massive DB seeding
-        
-        # Archetypes (Data could be moved to a separate file, but kept here for stability)
-        ARCHETYPES = {
-            'en': {
-                'Sun': "The Sun represents your ego, core identity, and life force. It is the 'Hero' within you.",
-                'Moon': "The Moon governs your emotions, instincts, and the subconscious. It represents your inner world.",
-                'Mercury': "Mercury rules communication, intellect, and how you process information.",
-                'Venus': "Venus is the planet of love, beauty, values, and how you attract relationships.",
-                'Mars': "Mars represents your drive, action, passion, and how you assert yourself.",
-                'Jupiter': "Jupiter is the seeker of expansion, luck, philosophy, and abundance.",
-                'Saturn': "Saturn represents discipline, structure, karma, and life's hard lessons.",
-                'Uranus': "Uranus acts as the awakener, ruling innovation, rebellion, and sudden change.",
-                'Neptune': "Neptune involves dreams, intuition, illusion, and spiritual transcendence.",
-                'Pluto': "Pluto governs transformation, power, regeneration, and the cycle of rebirth.",
-                'North Node': "The North Node points to your karmic destiny and the qualities you must develop."
-            },
-            'tr': {
-                'Sun': "Güneş, egonuzu, temel kimliğinizi ve yaşam gücünüzü temsil eder. O, içinizdeki 'Kahraman'dır.",
-                'Moon': "Ay, duygularınızı, içgüdülerinizi ve bilinçaltınızı yönetir. İç dünyanızın aynasıdır.",
-                'Mercury': "Merkür, iletişimi, zekayı ve bilgiyi nasıl işlediğinizi yönetir.",
-                'Venus': "Venüs aşkın, güzelliğin, değerlerin ve ilişkileri nasıl çektiğinizin gezegenidir.",
-                'Mars': "Mars, dürtülerinizi, eylemlerinizi, tutkunuzu ve kendinizi nasıl ortaya koyduğunuzu temsil eder.",
-                'Jupiter': "Jüpiter, genişlemenin, şansın, felsefenin ve bolluğun arayıcısıdır.",
-                'Saturn': "Satürn, disiplini, yapıyı, karmayı ve hayatın zorlu derslerini temsil eder.",
-                'Uranus': "Uranüs, yeniliği, isyanı ve ani değişimleri yöneten uyanışçıdır.",
-                'Neptune': "Neptün hayalleri, sezgiyi, illüzyonu ve ruhsal aşkınlığı içerir.",
-                'Pluto': "Plüton, dönüşümü, gücü, yenilenmeyi ve yeniden doğuş döngüsünü yönetir.",
-                'North Node': "Kuzey Ay Düğümü, karmik kaderinizi ve bu hayatta geliştirmeniz gereken nitelikleri işaret eder."
-            }
-        }
+        response = _chart_response(engine, natal_data, date_str, lat, lon, lang)
+        return JsonResponse(response)
 
-        SIGNS_MEANING = {
-            'en': {
-                'Aries': "In Aries, this energy is expressed impulsively, dynamically, and with great courage. You take initiative and lead with fire.",
-                'Taurus': "In Taurus, this energy is grounded, seeking stability, comfort, and tangible results. You move with deliberate patience.",
-                'Gemini': "In Gemini, this energy manifests through curiosity, adaptability, and social connection. You thrive on variety and intellect.",
-                'Cancer': "In Cancer, this energy is filtered through deep emotion, protection, and nurturing sensitivity. You value security above all.",
-                'Leo': "In Leo, this energy shines dramatically. You express it with warmth, creativity, and a need for recognition or applause.",
-                'Virgo': "In Virgo, this energy is analytical and service-oriented. You seek perfection, order, and practical utility in this area.",
-                'Libra': "In Libra, this energy seeks balance, harmony, and relationship. You express it through diplomacy and an aesthetic eye.",
-                'Scorpio': "In Scorpio, this energy is intense, magnetic, and transformative. You seek depth and are not afraid of the shadows.",
-                'Sagittarius': "In Sagittarius, this energy is adventurous and philosophical. You express it through a quest for truth and freedom.",
-                'Capricorn': "In Capricorn, this energy is disciplined and ambitious. You express it through hard work, structure, and long-term goals.",
-                'Aquarius': "In Aquarius, this energy is unconventional and innovative. You express it through rebellion against the norm and humanitarian ideals.",
-                'Pisces': "In Pisces, this energy is compassionate and mystical. You express it through boundaries mental expansion and spiritual connection."
-            },
-            'tr': {
-                'Aries': "Koç burcunda bu enerji dürtüsel, dinamik ve büyük bir cesaretle ifade edilir. İnisiyatif alır ve ateşle liderlik edersiniz.",
-                'Taurus': "Boğa burcunda bu enerji topraklanmıştır; istikrar, konfor ve somut sonuçlar arar. Kasıtlı bir sabırla hareket edersiniz.",
-                'Gemini': "İkizler burcunda bu enerji merak, uyum yeteneği ve sosyal bağlantı yoluyla tezahür eder. Çeşitlilik ve zeka ile beslenirsiniz.",
-                'Cancer': "Yengeç burcunda bu enerji derin duygu, koruma ve besleyici hassasiyetle filtrelenir. Güvenliğe her şeyden çok değer verirsiniz.",
-                'Leo': "Aslan burcunda bu enerji dramatik bir şekilde parlar. Onu sıcaklık, yaratıcılık ve takdir edilme ihtiyacıyla ifade edersiniz.",
-                'Virgo': "Başak burcunda bu enerji analitik ve hizmet odaklıdır. Bu alanda mükemmellik, düzen ve pratik yarar ararsınız.",
-                'Libra': "Terazi burcunda bu enerji denge, uyum ve ilişki arar. Onu diplomasi ve estetik bir gözle ifade edersiniz.",
-                'Scorpio': "Akrep burcunda bu enerji yoğun, manyetik ve dönüştürücüdür. Derinlik ararsınız ve gölgelerden korkmazsınız.",
-                'Sagittarius': "Yay burcunda bu enerji maceracı ve felsefidir. Onu hakikat ve özgürlük arayışıyla ifade edersiniz.",
-                'Capricorn': "Oğlak burcunda bu enerji disiplinli ve hırslıdır. Onu çok çalışmak, yapı kurmak ve uzun vadeli hedeflerle ifade edersiniz.",
-                'Aquarius': "Kova burcunda bu enerji gelenek dışı ve yenilikçidir. Onu norma isyan ve insani ideallerle ifade edersiniz.",
-                'Pisces': "Balık burcunda bu enerji şefkatli ve mistiktir. Onu sınırsız zihinsel genişleme ve ruhsal bağlantı ile ifade edersiniz."
-            }
-        }
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return JsonResponse({'error': str(e)}, status=500)
 
-        # Sign Translations for Synthesis
-        SIGN_NAMES_TR = {
-            'Aries': 'Koç', 'Taurus': 'Boğa', 'Gemini': 'İkizler', 'Cancer': 'Yengeç',
-            'Leo': 'Aslan', 'Virgo': 'Başak', 'Libra': 'Terazi', 'Scorpio': 'Akrep',
-            'Sagittarius': 'Yay', 'Capricorn': 'Oğlak', 'Aquarius': 'Kova', 'Pisces': 'Balık'
-        }
+@csrf_exempt
+def calculate_charts(request):
+    """
+    Batch version of calculate-chart for partner integrations.
+    Body: {"records": [{date, time, lat, lon[, lang]}, ...], "lang": "en"} (or just the list),
+    at most CHART_BATCH_MAX_RECORDS records. Records are computed in chunks of
+    CHART_BATCH_CHUNK_SIZE, one vectorized pass each (AstroEngine.calculate_natal_batch),
+    and every chunk is streamed back as NDJSON as soon as it is done, one line
+    per record in input order:
+      {"index": 0, "chart": {...}}  or  {"index": 1, "error": "..."}
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'POST request required'}, status=405)
 
-        planets_enriched = []
-        for p in natal_data['planets']:
-            # Generate English
-            base_en = ARCHETYPES['en'].get(p['name'], "")
-            mod_en = SIGNS_MEANING['en'].get(p['sign'], "")
-            synth_en = f"{base_en} {mod_en} This placement suggests that this aspect of your personality is colored by the qualities of {p['sign']}."
-            
-            # Generate Turkish
-            base_tr = ARCHETYPES['tr'].get(p['name'], "")
-            mod_tr = SIGNS_MEANING['tr'].get(p['sign'], "")
-            sign_tr = SIGN_NAMES_TR.get(p['sign'], p['sign'])
-            synth_tr = f"{base_tr} {mod_tr} Bu yerleşim, karakterinizin bu yönünün {sign_tr} burcunun özellikleriyle şekillendiğini gösterir."
-
-            # Store both
-            p['interpretations'] = {
-                'en': synth_en,
-                'tr': synth_tr
-            }
-            # Fallback for old API consumers
-            p['interpretation'] = synth_tr if lang == 'tr' else synth_en
-            
-            planets_enriched.append(p)
-            
-        # 3. Aspects
-        aspects_raw = engine.calculate_aspects(planets_enriched)
-        aspects_enriched = []
-        from .models import AspectInterpretation
-        
-        for a in aspects_raw:
-             interp = AspectInterpretation.objects.filter(
-                Q(planet_1=a['p1'], planet_2=a['p2'], aspect_type=a['type']) |
-                Q(planet_1=a['p2'], planet_2=a['p1'], aspect_type=a['type'])
-             ).first()
-             
-             text = getattr(interp, f'text_{lang}', f"{a['type']} aspect") if interp else f"{a['p1']} {a['type']} {a['p2']}"
-             
-             aspects_enriched.append({
-                 "p1": a['p1'], "p2": a['p2'], "type": a['type'],
-                 "orb": a['orb'], "interpretation": text
-             })
-
-        # 4. Advanced Metrics
-        birth_year = int(date_str.split('/')[0])
-        current_year = datetime.now().year
-        
-        # Profection (Simple Modulo)
-        profection = (current_year - birth_year) % 12 + 1
-        
-        # Dominants
-        dominants = engine.calculate_dominants(planets_enriched)
-        
-        # Lucky Gem
-        sun_sign = next((p['sign'] for p in planets_enriched if p['name'] == 'Sun'), 'Aries')
-        # We can implement get_lucky_gems in engine or here. 
-        # Engine has it? No, I removed it in replacement. Let's add simple dict here.
-        gems = {
-            'Aries': {'color': 'Red', 'stone': 'Ruby'}, 'Taurus': {'color': 'Green', 'stone': 'Emerald'},
-            'Gemini': {'color': 'Yellow', 'stone': 'Agate'}, 'Cancer': {'color': 'Silver', 'stone': 'Moonstone'},
-            'Leo': {'color': 'Gold', 'stone': 'Peridot'}, 'Virgo': {'color': 'Navy', 'stone': 'Sapphire'},
-            'Libra': {'color': 'Blue', 'stone': 'Opal'}, 'Scorpio': {'color': 'Black', 'stone': 'Topaz'},
-            'Sagittarius': {'color': 'Purple', 'stone': 'Turquoise'}, 'Capricorn': {'color': 'Brown', 'stone': 'Garnet'},
-            'Aquarius': {'color': 'Cyan', 'stone': 'Amethyst'}, 'Pisces': {'color': 'Sea Green', 'stone': 'Aquamarine'}
-        }
-        lucky = gems.get(sun_sign, {'color': 'White', 'stone': 'Diamond'})
-        
-        # Draconic Calculation & Enrichment
-        draconic_data = engine.calculate_draconic(natal_data['planets'], natal_data['north_node'])
-        draconic_enriched = []
-        for p in draconic_data:
-            # English
-            base_en = ARCHETYPES['en'].get(p['name'], "")
-            mod_en = SIGNS_MEANING['en'].get(p['sign'], "")
-            synth_en = f"In your Draconic Soul Chart: {base_en} {mod_en} This indicates your higher self's intent."
-            
-            # Turkish
-            base_tr = ARCHETYPES['tr'].get(p['name'], "")
-            mod_tr = SIGNS_MEANING['tr'].get(p['sign'], "")
-            sign_tr = SIGN_NAMES_TR.get(p['sign'], p['sign'])
-            synth_tr = f"Drakonik Ruh Haritanızda: {base_tr} {mod_tr} Bu, yüksek benliğinizin niyetini gösterir."
-            
-            p['interpretations'] = {'en': synth_en, 'tr': synth_tr}
-            # Fallback for older frontend logic if needed
-            p['interpretation'] = synth_tr if lang == 'tr' else synth_en
-            draconic_enriched.append(p)
-
-        response = {
-            "planets": planets_enriched,
-            "houses": [h['lon'] for h in natal_data['houses']], 
-            "aspects": aspects_enriched,
-                "meta": {
-                    "profection_house": profection,
-                    "dominants": dominants,
-                    "lucky_color": lucky['color'],
-                    "lucky_stone": lucky['stone'],
-                    "sun_sign": sun_sign,
-                    "rising_sign": natal_data['ascendant'],
-                    "sun_lon_exact": next((p['lon'] for p in planets_enriched if p['name'] == 'Sun'), 0.0),
-                    "calc_utc": natal_data.get('utc_time', 'Unknown'),
-                    "local_timezone": natal_data.get('timezone', 'Unknown'),
-                    "planetary_hours": [],
-                    "draconic_chart": draconic_enriched,
-                    "celebrity_match": {"name": "TBD", "score": 0},
-                    "acg_lines": []
-                }
-        }
-        return JsonResponse(response)
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid JSON'}, status=400)
+    records = data.get('records') if isinstance(data, dict) else data
+    lang = data.get('lang', 'en') if isinstance(data, dict) else 'en'
+    if not isinstance(records, list):
+        return JsonResponse({'error': 'records list required'}, status=400)
+
+    max_records = getattr(settings, 'CHART_BATCH_MAX_RECORDS', 100)
+    if len(records) > max_records:
+        return JsonResponse({'error': f'At most {max_records} records per request'}, status=413)
+
+    # Per-record input problems become that record's error line
+    parsed, langs, errors = [], [], {}
+    for i, r in enumerate(records):
+        try:
+            date_str = r.get('date').replace('-', '/') if r.get('date') else None
+            # No default place: a partner record without coordinates is an error, not an Istanbul chart
+            if r.get('lat') is None or r.get('lon') is None:
+                raise ValueError("lat and lon are required")
+            parsed.append((date_str, r.get('time'), float(r['lat']), float(r['lon'])))
+            langs.append(r.get('lang', lang))
+        except (AttributeError, TypeError, ValueError) as e:
+            parsed.append(None)
+            langs.append(lang)
+            errors[i] = f"Invalid record: {e}"
+
+    chunk_size = max(1, getattr(settings, 'CHART_BATCH_CHUNK_SIZE', 25))
+
+    def compute(start):
+        idx = [i for i in range(start, min(start + chunk_size, len(records))) if parsed[i] is not None]
+        return dict(zip(idx, engine.calculate_natal_batch([parsed[i] for i in idx])))
 
+    try:
+        engine = AstroEngine()
+        # First chunk up front: a batch-wide failure (ephemeris missing...) is still a JSON 500
+        first = compute(0)
     except Exception as e:
         import traceback
         traceback.print_exc()
         return JsonResponse({'error': str(e)}, status=500)
 
+    def lines():
+        for start in range(0, len(records), chunk_size):
+            try:
+                charts = first if start == 0 else compute(start)
+            except Exception as e:
+                # Headers are gone, so later chunk failures become error lines
+                charts = {i: e for i in range(start, min(start + chunk_size, len(records))) if parsed[i] is not None}
+            for i in range(start, min(start + chunk_size, len(records))):
+                result = charts.get(i)
+                if isinstance(result, Exception):
+                    errors[i] = str(result)
+                elif result is not None:
+                    try:
+                        date_str, _, lat, lon = parsed[i]
+                        line = {'index': i, 'chart': _chart_response(engine, result, date_str, lat, lon, langs[i])}
+                        yield json.dumps(line) + '\n'
+                        continue
+                    except Exception as e:
+                        errors[i] = str(e)
+                yield json.dumps({'index': i, 'error': errors[i]}) + '\n'
+
+    return StreamingHttpResponse(lines(), content_type='application/x-ndjson')
+
 @csrf_exempt
 def calculate_synastry_view(request):
     if request.method != 'POST':
@@ -278,11 +273,18 @@ def calculate_synastry_view(request):
 from datetime import datetime, timedelta
 from .models import DailyTip
 
+# get_weekly_forecast: longest range one request may ask for, and results per (date, lang, days)
+FORECAST_MAX_DAYS = 62
+# get_daily_planner: longest planetary hours range per request
+PLANNER_MAX_DAYS = 31
+_forecast_cache = LRUCache(maxsize=512)
+
 @csrf_exempt
 @csrf_exempt
 def get_weekly_forecast(request):
     """
-    Returns a 7-day Multi-Dimensional Transit Forecast ("Fortune Telling Mode").
+    Returns a Multi-Dimensional Transit Forecast ("Fortune Telling Mode").
+    ?days=N (default 7, max FORECAST_MAX_DAYS) for longer ranges, e.g. a month.
     """
     if request.method != 'GET':
         return JsonResponse({'error': 'GET request required'}, status=405)
@@ -301,15 +303,26 @@ def get_weekly_forecast(request):
     else:
         start_date = datetime.now()
 
-    # Check Skyfield availability
+    # Range
+    try:
+        days = int(request.GET.get('days', 7))
+    except ValueError:
+        days = 7
+    days = max(1, min(FORECAST_MAX_DAYS, days))
+
+    # Same answer for every user -> cache per (start date, lang, range)
+    cache_key = (start_date.date(), lang, days)
+    forecast = _forecast_cache.get(cache_key)
+    if forecast is not None:
+        return JsonResponse({"forecast": forecast})
+
+    # Shared engine ephemeris, all days x bodies in one array
     try:
-        from skyfield.api import load
-        from skyfield.framelib import ecliptic_frame
-        eph = load('de421.bsp')
-        ts = load.timescale()
-        has_skyfield = True
-    except:
-        has_skyfield = False
+        scores = AstroEngine().calculate_forecast_scores(
+            start_date, days=days, backend=getattr(settings, 'FORECAST_EPHEMERIS_BACKEND', None) or None)
+    except Exception as e:
+        print(f"Forecast calculation failed: {e}")
+        scores = None
         
     forecast = []
     
@@ -332,7 +345,7 @@ def get_weekly_forecast(request):
     }
     msgs = MSGS_TR if lang == 'tr' else MSGS_EN
 
-    for i in range(7):
+    for i in range(days):
         target_date = start_date + timedelta(days=i)
         
         # Default Baselines
@@ -341,61 +354,10 @@ def get_weekly_forecast(request):
         career = 50
         comment = msgs['mid']
 
-        if has_skyfield:
-            t = ts.utc(target_date.year, target_date.month, target_date.day, 12, 0, 0)
-            planets = {
-                'Sun': eph['sun'], 'Moon': eph['moon'], 'Mars': eph['mars'], 
-                'Saturn': eph['saturn barycenter'], 'Jupiter': eph['jupiter barycenter'], 
-                'Venus': eph['venus']
-            }
-            pos = {}
-            earth = eph['earth']
-            for name, body in planets.items():
-                astrometric = earth.at(t).observe(body)
-                lat, lon, dist = astrometric.apparent().frame_latlon(ecliptic_frame)
-                pos[name] = lon.degrees
-
-            # Aspect Logic
-            aspect_score = 0
-            love_boost = 0
-            career_boost = 0
-            
-            # Simple Transit Logic
-            # Venus Aspects (Love)
-            v_lon = pos['Venus']
-            for p, l in pos.items():
-                if p == 'Venus': continue
-                diff = abs(v_lon - l) % 360
-                if diff > 180: diff = 360 - diff
-                if abs(diff - 120) < 5 or abs(diff - 60) < 4: love_boost += 15 # Trine/Sextile
-                if abs(diff - 90) < 5 or abs(diff - 180) < 5: love_boost -= 10 # Square/Opp
-            
-            # Saturn/Jupiter Aspects (Career)
-            s_lon = pos['Saturn']
-            j_lon = pos['Jupiter']
-             # Check Saturn aspects
-            for p, l in pos.items():
-                if p == 'Saturn': continue
-                diff = abs(s_lon - l) % 360
-                if diff > 180: diff = 360 - diff
-                if abs(diff - 120) < 5 or abs(diff - 60) < 4: career_boost += 10
-                if abs(diff - 90) < 5: career_boost -= 15 # Saturn squares depend hard work
-            
-            # General Aspects
-            p_names = list(pos.keys())
-            for idx1 in range(len(p_names)):
-                for idx2 in range(idx1+1, len(p_names)):
-                    p1 = p_names[idx1]; p2 = p_names[idx2]
-                    d = abs(pos[p1] - pos[p2]) % 360
-                    if d > 180: d = 360 - d
-                    if abs(d-120)<5: aspect_score += 8
-                    if abs(d-60)<4: aspect_score += 4
-                    if abs(d-90)<5: aspect_score -= 8
-                    if abs(d-180)<5: aspect_score -= 6
-            
-            total = 50 + aspect_score
-            love = 50 + love_boost
-            career = 50 + career_boost
+        if scores is not None:
+            total = int(scores['total'][i])
+            love = int(scores['love'][i])
+            career = int(scores['career'][i])
             
             # Smart Commentary
             if love > 70: comment = msgs['love_high']
@@ -418,6 +380,10 @@ def get_weekly_forecast(request):
             "comment": comment
         })
 
+    # Failed runs (fallback baselines) are not cached
+    if scores is not None:
+        _forecast_cache.set(cache_key, forecast)
+
     return JsonResponse({"forecast": forecast})
 
 
@@ -425,6 +391,7 @@ def get_weekly_forecast(request):
 def get_daily_planner(request):
     """
     Returns daily tips and planetary hours.
+    ?days=N returns N days of hours (max PLANNER_MAX_DAYS), each hour tagged with its 'date'.
     """
     # Ensure engine is available
     engine = AstroEngine()
@@ -436,6 +403,10 @@ def get_daily_planner(request):
         date_param = request.GET.get('date', None)
         lat = float(request.GET.get('lat', 41.0))
         lon = float(request.GET.get('lon', 28.0))
+        try:
+            days = max(1, min(PLANNER_MAX_DAYS, int(request.GET.get('days', 1))))
+        except ValueError:
+            days = 1
         
         now = datetime.utcnow()
         if date_param:
@@ -448,14 +419,21 @@ def get_daily_planner(request):
             date_str = now.strftime("%Y-%m-%d")
 
         # Get Hours
-        hours_data = engine.calculate_planetary_hours(date_str, lat, lon)
+        hours_data = engine.calculate_planetary_hours(date_str, lat, lon, days=days)
         
         # ... existing transit logic ...
         
-        data = {'hours': hours_data}
+        data = {'hours': hours_data, 'timezone': engine.timezone_label(lat, lon)}
         
+        # Retrogrades at noon UTC of the requested date (speed sign from the batched pass)
+        day = datetime.strptime(date_str, "%Y-%m-%d")
+        try:
+            data['retrogrades'] = engine.retrograde_bodies(engine.ts.utc(day.year, day.month, day.day, 12))
+        except Exception as e:
+            print(f"Retrograde check failed: {e}")
+            data['retrogrades'] = []
+
         # Mock other data for now to prevent errors, since we focused on Hours
-        data['retrogrades'] = []
         data['phase'] = 'Waxing Gibbous'
         data['daily_summary'] = "Focus on the planetary hours to guide your day."
 
@@ -702,118 +680,51 @@ def rectify_birth_time(request):
         # Engine
         engine = AstroEngine()
         
-        # 1. Pre-calculate Transits for each Event (at Noon)
-        # We only need the positions of heavy planets: Jupiter, Saturn, Uranus, Neptune, Pluto, Nodes
-        heavy_planets = ['Jupiter', 'Saturn', 'Uranus', 'Neptune', 'Pluto', 'North Node']
-        event_transits = []
-        
+        # 1. Event dates (transits are taken at local noon of each one)
+        event_dates = []
+        event_labels = []
         for e in events:
             edate = e.get('date', '').replace('-', '/')
-            etype = e.get('type', 'general')
             if not edate: continue
-            
-            # calculate chart for event
             try:
-                t_chart = engine.calculate_natal(edate, "12:00", lat, lon)
-                t_planets = [p for p in t_chart['planets'] if p['name'] in heavy_planets]
-                event_transits.append({'type': etype, 'planets': t_planets, 'date': edate})
-            except:
+                event_dates.append(datetime.strptime(edate, "%Y/%m/%d"))
+                event_labels.append(edate)
+            except ValueError:
                 continue
-                
-        # 2. Iterate through 24 hours (Step: 10 minutes = 144 steps)
-        # 10 min step approx 2.5 degrees of Ascendant. Acceptable for rough rectification.
-        scores = []
-        
-        start_time = datetime.strptime(birth_date + " 00:00", "%Y/%m/%d %H:%M")
-        
-        # Weights
-        W_CONJ = 10
-        W_OPP = 8
-        W_SQR = 5
-        W_TRINE = 3 # Trines are soft, but good for validation
-        
-        valid_candidates = []
 
-        # Optimization: We loop 0..144
-        for i in range(144): 
-            minutes = i * 10
-            candidate_dt = start_time + timedelta(minutes=minutes)
-            time_str = candidate_dt.strftime("%H:%M")
-            
-            # Calculate Candidate Angles
-            # We use engine.calculate_natal but it might be heavy to do 144 times if it calls API or deep math?
-            # It uses Skyfield (local binary). Should be fast enough (< 2 sec for 144 calls).
-            candidate = engine.calculate_natal(birth_date, time_str, lat, lon)
-            
-            asc = candidate.get('ascendant_deg', 0.0)
-            mc = candidate.get('midheaven_deg', 0.0)
-            asc_sign = candidate.get('ascendant', 'Aries')
-            
-            score = 0
+        # 2. Score the whole day in one vectorized pass (10 min), refined to 1 min and 10 s
+        # Heavy planets + North Node vs ASC (conj/opp/square) and MC (conj/opp), 4 deg orb
+        candidates = engine.rectify_birth_time(birth_date, lat, lon, event_dates, top=3)
+
+        ASPECT_LABELS = {
+            'conj_asc': ("Conjunction AC", "AC ile Kavuşum"),
+            'opp_asc': ("Opposition AC", "AC ile Karşıt"),
+            'sqr_asc': ("Square AC", "AC ile Kare"),
+            'conj_mc': ("Conj MC", "MC ile Kavuşum"),
+            'opp_mc': ("Opp MC", "MC ile Karşıt"),
+        }
+
+        top_candidates = []
+        for c in candidates:
             hits = []
-            
-            # Check against Events
-            for et in event_transits:
-                for p in et['planets']:
-                    p_lon = p['lon']
-                    p_name = p['name']
-                    
-                    # Check Ascendant
-                    diff_asc = abs(p_lon - asc) % 180 # Mod 180 covers Conj (0) and Opp (180) near 0 
-                    if diff_asc > 90: diff_asc = 180 - diff_asc
-                    
-                    # Actually standard distance
-                    d = abs(p_lon - asc) % 360
-                    if d > 180: d = 360 - d
-                    
-                    aspect = ""
-                    points = 0
-                    
-                    p_name_display = p_name
-                    if lang == 'tr':
-                        p_name_display = p_name.replace("Jupiter", "Jüpiter").replace("Saturn", "Satürn").replace("Uranus", "Uranüs").replace("Neptune", "Neptün").replace("Pluto", "Plüton").replace("North Node", "Kuzey Düğüm")
-
-                    if d < 4: 
-                        aspect = "Conjunction AC" if lang != 'tr' else "AC ile Kavuşum"
-                        points = W_CONJ
-                    elif abs(d - 180) < 4:
-                        aspect = "Opposition AC" if lang != 'tr' else "AC ile Karşıt"
-                        points = W_OPP
-                    elif abs(d - 90) < 4:
-                        aspect = "Square AC" if lang != 'tr' else "AC ile Kare"
-                        points = W_SQR
-                    
-                    if points > 0:
-                        score += points
-                        hits.append(f"{et['date']} {p_name_display} {aspect}")
-                        
-                    # Check MC
-                    d_mc = abs(p_lon - mc) % 360
-                    if d_mc > 180: d_mc = 360 - d_mc
-                    
-                    if d_mc < 4:
-                        score += W_CONJ
-                        aspect = "Conj MC" if lang != 'tr' else "MC ile Kavuşum"
-                        hits.append(f"{et['date']} {p_name_display} {aspect}")
-                    elif abs(d_mc - 180) < 4:
-                        score += W_OPP
-                        aspect = "Opp MC" if lang != 'tr' else "MC ile Karşıt"
-                        hits.append(f"{et['date']} {p_name_display} {aspect}")
-            
-            if score > 0:
-                scores.append({
-                    'time': time_str,
-                    'score': score,
-                    'asc_sign': asc_sign,
-                    'hits': hits
-                })
-        
-        # Sort by score
-        scores.sort(key=lambda x: x['score'], reverse=True)
-        
-        # Filter top 3 distinct Ascendant Signs if possible, or just top 3 times
-        top_candidates = scores[:3]
-        
+            for event_idx, p_name, aspect_key in c['hits']:
+                p_name_display = p_name
+                if lang == 'tr':
+                    p_name_display = p_name.replace("Jupiter", "Jüpiter").replace("Saturn", "Satürn").replace("Uranus", "Uranüs").replace("Neptune", "Neptün").replace("Pluto", "Plüton").replace("North Node", "Kuzey Düğüm")
+                en, tr = ASPECT_LABELS[aspect_key]
+                aspect = tr if lang == 'tr' else en
+                hits.append(f"{event_labels[event_idx]} {p_name_display} {aspect}")
+
+            # The form only takes HH:MM -> nearest minute (never past 23:59)
+            rounded = min(c['dt'] + timedelta(seconds=30), c['dt'].replace(hour=23, minute=59))
+            top_candidates.append({
+                'time': rounded.strftime("%H:%M"),
+                'time_exact': c['dt'].strftime("%H:%M:%S"),
+                'score': c['score'],
+                'asc_sign': c['ascendant'],
+                'hits': hits
+            })
+
         return JsonResponse({'candidates': top_candidates})
 
     except Exception as e:
@@ -866,24 +777,28 @@ def _mock_chart_data():
 @csrf_exempt
 def get_countries(request):
     """Returns a list of all countries sorted by name."""
-    gc = geonamescache.GeonamesCache()
-    countries = gc.get_countries()
-    # Format: { 'TR': 'Turkey', 'US': 'United States' }
-    data = []
-    for code, details in countries.items():
-        data.append({'code': code, 'name': details['name']})
-    
-    # Sort by name
-    data.sort(key=lambda x: x['name'])
-    return JsonResponse({'countries': data})
+    # Prebuilt at startup (geo_index), already sorted by name
+    return JsonResponse({'countries': get_geo_index().countries})
 
 
 
 from .turkey_data import TR_DATA, PROVINCE_NAMES
+from .geo_index import get_geo_index, city_dict
+
+
+def _int_param(request, name, default=None):
+    try:
+        return max(0, int(request.GET[name]))
+    except (KeyError, ValueError):
+        return default
+
 
 @csrf_exempt
 def get_cities(request):
-    """Returns cities/districts. Uses curated TR_DATA for Turkey."""
+    """
+    Returns cities/districts. Uses curated TR_DATA for Turkey.
+    Optional ?limit= and ?min_pop= trim big countries to their largest places.
+    """
     country_code = request.GET.get('code')
     admin_code = request.GET.get('admin_code')
     
@@ -894,28 +809,12 @@ def get_cities(request):
     if country_code == 'TR' and admin_code and admin_code in TR_DATA:
         return JsonResponse({'cities': TR_DATA[admin_code]['districts']})
         
-    gc = geonamescache.GeonamesCache()
-    cities = gc.get_cities()
-    
-    filtered = []
-    
-    # Priority 2: Standard Geonames Fetch
+    # Priority 2: Standard Geonames Fetch from the prebuilt index
     # If it's TR but not in our TR_DATA, we still fetch from Geonames.
-    for cid, c in cities.items():
-        if c['countrycode'] == country_code:
-            if admin_code and c.get('admin1code') != admin_code:
-                continue
-            
-            # For Turkey, geonames might list a district.
-            filtered.append({
-                'name': c['name'],
-                'lat': c['latitude'],
-                'lon': c['longitude'],
-                'pop': c.get('population', 0)
-            })
-            
-    filtered.sort(key=lambda x: x['name'])
-    return JsonResponse({'cities': filtered})
+    # ?limit=N keeps the N most populated places, ?min_pop=P drops smaller ones
+    limit, min_pop = _int_param(request, 'limit'), _int_param(request, 'min_pop', 0)
+    cities = get_geo_index().cities(country_code, admin_code, limit=limit, min_pop=min_pop)
+    return JsonResponse({'cities': [city_dict(c) for c in cities]})
 
 @csrf_exempt
 def get_provinces(request):
@@ -924,38 +823,35 @@ def get_provinces(request):
     if not country_code:
         return JsonResponse({'error': 'Country code required'}, status=400)
 
-    # Priority: TR Official List
-    if country_code == 'TR':
-        provinces = []
-        for code, name in PROVINCE_NAMES.items():
-            provinces.append({'code': code, 'name': name})
-            
-        provinces.sort(key=lambda x: x['name'])
-        return JsonResponse({'provinces': provinces})
+    # Precomputed per country (TR uses the official PROVINCE_NAMES list)
+    return JsonResponse({'provinces': get_geo_index().province_list(country_code)})
 
+@csrf_exempt
+def search_places(request):
+    """
+    Autocomplete for the birth-place box: ?q= prefix (accent/case-insensitive,
+    any word of the name), ?limit= up to 20. Most populated places first.
+    """
+    index = get_geo_index()
+    places = index.search(request.GET.get('q', ''), limit=_int_param(request, 'limit', 10))
+    return JsonResponse({'places': [index.place_dict(p) for p in places]})
 
-    # Standard Logic for other countries
-    gc = geonamescache.GeonamesCache()
-    cities = gc.get_cities()
-    admin_groups = {}
-    
-    for cid, c in cities.items():
-        if c['countrycode'] == country_code:
-            ac = c.get('admin1code', '')
-            if not ac: continue
-            if ac not in admin_groups: admin_groups[ac] = []
-            admin_groups[ac].append(c)
-            
-    provinces = []
-    for ac, city_list in admin_groups.items():
-        city_list.sort(key=lambda x: x.get('population', 0), reverse=True)
-        # Fallback: limit province name length to avoid some garbage
-        pname = city_list[0]['name']
-        provinces.append({'code': ac, 'name': pname})
-        
-    provinces.sort(key=lambda x: x['name'])
-    
-    return JsonResponse({'provinces': provinces})
+@csrf_exempt
+def nearest_place(request):
+    """
+    Reverse geocoding for GPS input: ?lat=&lon= -> closest city/district.
+    Optional ?max_km= (default NEAREST_PLACE_MAX_KM); place is null past it.
+    """
+    try:
+        lat = float(request.GET['lat'])
+        lon = float(request.GET['lon'])
+        max_km = float(request.GET['max_km']) if 'max_km' in request.GET else None
+    except (KeyError, ValueError):
+        return JsonResponse({'error': 'lat and lon required'}, status=400)
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return JsonResponse({'error': 'Coordinates out of range'}, status=400)
+
+    return JsonResponse({'place': AstroEngine().nearest_place(lat, lon, max_km=max_km)})
 
 # --- AUTHENTICATION & PROFILE API ---
 
@@ -1070,40 +966,50 @@ def update_profile_api(request):
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
-@user_passes_test(lambda u: u.is_superuser)
-def custom_admin_dashboard(request):
+def _admin_log_filters(request):
+    """Non-admin logs in the ?start_date/?end_date range, shared by the dashboard and the export."""
     # Base Queryset: Exclude Superusers (Admins)
     base_qs = UserActivityLog.objects.exclude(user__is_superuser=True)
 
-    # Date Filtering
+    # Date Filtering (timestamp range, so the index is used)
+    start, end = timestamp_range(request.GET.get('start_date'), request.GET.get('end_date'))
+    return filter_timestamp(base_qs, start, end), start, end
+
+
+@user_passes_test(lambda u: u.is_superuser)
+def custom_admin_dashboard(request):
     start_date_str = request.GET.get('start_date')
     end_date_str = request.GET.get('end_date')
+    base_qs, start, end = _admin_log_filters(request)
+
+    # 1. Logs: keyset pages of 20 on (timestamp, id), no COUNT/OFFSET
+    logs, newer, older = keyset_page(
+        base_qs.select_related('user'), size=20,
+        after=request.GET.get('after'), before=request.GET.get('before'),
+        oldest=request.GET.get('oldest') == '1')
     
-    if start_date_str:
-        base_qs = base_qs.filter(timestamp__date__gte=start_date_str)
-    if end_date_str:
-        base_qs = base_qs.filter(timestamp__date__lte=end_date_str)
-
-    # 1. Logs (Paginated)
-    log_list = base_qs.select_related('user').order_by('-timestamp')
-    paginator = Paginator(log_list, 20) # Show 20 logs per page
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    
-    # 2. Daily Stats (Based on Filtered Data)
-    action_counts = base_qs.values('action').annotate(total=Count('action')).order_by('-total')
+    # 2. Daily Stats: summed from the per-day rollups, not the log table
+    rollups = filter_dates(DailyActivityRollup.objects.all(), start, end)
+    action_counts = rollups.values('action').annotate(total=Sum('count')).order_by('-total')
     
     # 3. Stats Summary (Filtered)
-    unique_visitors = base_qs.values('ip_address').distinct().count()
-    total_requests = base_qs.count()
+    # Distinct IPs don't add up across days: exact for short ranges (or ?exact_visitors=1),
+    # otherwise merged from the daily HyperLogLog sketches
+    exact_visitors = request.GET.get('exact_visitors') == '1'
+    visitors, visitors_exact = unique_visitors(base_qs, start, end, exact=exact_visitors)
+    total_requests = rollups.aggregate(total=Sum('count'))['total'] or 0
     
     # 4. Active Known Users (In the filtered period)
     active_users = base_qs.filter(user__isnull=False).values('user__username').distinct()
 
     context = {
-        'page_obj': page_obj, # Use page_obj for the loop
+        'logs': logs,
+        'newer_cursor': newer,
+        'older_cursor': older,
         'action_counts': action_counts,
-        'unique_visitors': unique_visitors,
+        'unique_visitors': visitors,
+        'unique_visitors_exact': visitors_exact,
+        'exact_visitors': exact_visitors,
         'total_requests': total_requests,
         'active_users': [u['user__username'] for u in active_users],
         'total_users_count': User.objects.exclude(is_superuser=True).count(), # Total registered users (non-admin)
@@ -1114,6 +1020,30 @@ def custom_admin_dashboard(request):
     
     return render(request, 'astrology/custom_admin.html', context)
 
+
+@user_passes_test(lambda u: u.is_superuser)
+def custom_admin_export(request):
+    """
+    Streams the filtered logs as ?format=csv (default) or ndjson, gzipped with ?gzip=1.
+    Constant memory: keyset chunks of ACTIVITY_EXPORT_CHUNK rows.
+    """
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in ('csv', 'ndjson'):
+        return JsonResponse({'error': 'format must be csv or ndjson'}, status=400)
+
+    base_qs, start, end = _admin_log_filters(request)
+    stream = export_lines(base_qs, fmt, chunk_size=getattr(settings, 'ACTIVITY_EXPORT_CHUNK', 2000))
+    filename = f"activity-{request.GET.get('start_date') or 'all'}-{request.GET.get('end_date') or 'now'}.{fmt}"
+    content_type = 'text/csv; charset=utf-8' if fmt == 'csv' else 'application/x-ndjson'
+    if request.GET.get('gzip') == '1':
+        stream = gzip_stream(stream)
+        filename += '.gz'
+        content_type = 'application/gzip'
+
+    response = StreamingHttpResponse(stream, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
 @csrf_exempt
 def get_daily_horoscopes_api(request):
     lang = request.GET.get('lang', 'tr')